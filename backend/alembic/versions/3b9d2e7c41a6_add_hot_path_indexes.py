@@ -0,0 +1,71 @@
+"""add hot path indexes
+
+Revision ID: 3b9d2e7c41a6
+Revises: f657e979f922
+Create Date: 2026-10-18 10:12:40.512301
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3b9d2e7c41a6"
+down_revision: Union[str, None] = "f657e979f922"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, covering columns)
+INDEXES = [
+    (
+        "ix_courses_created_by_created_at",
+        "courses",
+        ["created_by", "created_at", "id"],
+        [],
+    ),
+    ("ix_lessons_course_id_order", "lessons", ["course_id", "order"], []),
+    (
+        "ix_cohort_enrollments_cohort_id_student_id",
+        "cohort_enrollments",
+        ["cohort_id", "student_id"],
+        [],
+    ),
+    (
+        "ix_progress_student_id_lesson_id",
+        "progress",
+        ["student_id", "lesson_id"],
+        ["status", "completed_at"],
+    ),
+    (
+        "ix_content_blocks_lesson_id_order",
+        "content_blocks",
+        ["lesson_id", "order"],
+        [],
+    ),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, include in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_include=include,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
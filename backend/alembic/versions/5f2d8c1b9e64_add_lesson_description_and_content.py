@@ -0,0 +1,28 @@
+"""add lesson description and content
+
+Revision ID: 5f2d8c1b9e64
+Revises: 9a4c2e7b5d08
+Create Date: 2026-10-18 21:06:43.518207
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5f2d8c1b9e64"
+down_revision: Union[str, None] = "9a4c2e7b5d08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("lessons", sa.Column("description", sa.String(), nullable=True))
+    op.add_column("lessons", sa.Column("content", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("lessons", "content")
+    op.drop_column("lessons", "description")
@@ -0,0 +1,69 @@
+"""add activity rollups
+
+Revision ID: 6e0b9d4a7f15
+Revises: d2f87a1c6e03
+Create Date: 2026-10-18 15:02:11.417309
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6e0b9d4a7f15"
+down_revision: Union[str, None] = "d2f87a1c6e03"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Bucket scans of the rollup job
+INDEXES = [
+    ("ix_cohort_enrollments_created_at", "cohort_enrollments", ["created_at"]),
+    ("ix_progress_created_at", "progress", ["created_at"]),
+    ("ix_progress_completed_at", "progress", ["completed_at"]),
+    ("ix_progress_last_modified", "progress", ["last_modified"]),
+]
+
+
+def upgrade() -> None:
+    # Buckets are filled by the rollup job's first pass (or
+    # `pdm run rollups backfill`), which finds no rollup_state row
+    op.create_table(
+        "activity_rollups",
+        sa.Column("granularity", sa.String(), nullable=False),
+        sa.Column("bucket_start", sa.Date(), nullable=False),
+        sa.Column("metric", sa.String(), nullable=False),
+        sa.Column("value", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("granularity", "bucket_start", "metric"),
+    )
+    op.create_table(
+        "rollup_state",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("processed_through", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
+    op.drop_table("rollup_state")
+    op.drop_table("activity_rollups")
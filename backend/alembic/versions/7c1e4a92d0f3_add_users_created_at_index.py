@@ -0,0 +1,38 @@
+"""add users created_at index for keyset pagination
+
+Revision ID: 7c1e4a92d0f3
+Revises: 3b9d2e7c41a6
+Create Date: 2026-10-18 11:02:17.208846
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1e4a92d0f3"
+down_revision: Union[str, None] = "3b9d2e7c41a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_created_at_id",
+            "users",
+            ["created_at", "id"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_users_created_at_id",
+            table_name="users",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,52 @@
+"""add media uploads
+
+Revision ID: 9a4c2e7b5d08
+Revises: e61f0b8a2c59
+Create Date: 2026-10-18 19:42:17.305128
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4c2e7b5d08"
+down_revision: Union[str, None] = "e61f0b8a2c59"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "media_uploads",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("created_by", sa.UUID(), nullable=False),
+        sa.Column("content_type", sa.String(), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("chunk_size", sa.Integer(), nullable=False),
+        sa.Column("content_block_id", sa.UUID(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("last_modified", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["content_block_id"], ["content_blocks.id"]),
+        sa.ForeignKeyConstraint(["created_by"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_media_uploads_last_modified", "media_uploads", ["last_modified"]
+    )
+    op.create_table(
+        "media_upload_chunks",
+        sa.Column("upload_id", sa.UUID(), nullable=False),
+        sa.Column("index", sa.Integer(), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.ForeignKeyConstraint(["upload_id"], ["media_uploads.id"]),
+        sa.PrimaryKeyConstraint("upload_id", "index"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("media_upload_chunks")
+    op.drop_index("ix_media_uploads_last_modified", table_name="media_uploads")
+    op.drop_table("media_uploads")
@@ -0,0 +1,46 @@
+"""add stats counters
+
+Revision ID: a5c3f18e9b27
+Revises: 7c1e4a92d0f3
+Create Date: 2026-10-18 12:40:05.318274
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a5c3f18e9b27"
+down_revision: Union[str, None] = "7c1e4a92d0f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Initial values, counted from the existing rows
+SEED_COUNTS = {
+    "users": "SELECT count(*) FROM users",
+    "courses": "SELECT count(*) FROM courses",
+    "cohorts": "SELECT count(*) FROM cohorts",
+    "active_enrollments": (
+        "SELECT count(*) FROM cohort_enrollments WHERE status = 'active'"
+    ),
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stats_counters",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("value", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    for name, count in SEED_COUNTS.items():
+        op.execute(
+            f"INSERT INTO stats_counters (name, value) SELECT '{name}', ({count})"
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("stats_counters")
@@ -0,0 +1,89 @@
+"""unique cohort enrollments and cohort listing indexes
+
+Revision ID: b84e2f9c3d17
+Revises: 6e0b9d4a7f15
+Create Date: 2026-10-18 16:11:37.206514
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b84e2f9c3d17"
+down_revision: Union[str, None] = "6e0b9d4a7f15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Keep one enrollment per cohort and student, preferring an active one and
+# then the earliest. The stats reconciler corrects active_enrollments.
+DELETE_DUPLICATES = """
+DELETE FROM cohort_enrollments WHERE id IN (
+    SELECT id FROM (
+        SELECT id, row_number() OVER (
+            PARTITION BY cohort_id, student_id
+            ORDER BY CASE status WHEN 'active' THEN 0 ELSE 1 END, created_at
+        ) AS position
+        FROM cohort_enrollments
+    ) ranked
+    WHERE position > 1
+)
+"""
+
+COHORT_INDEXES = [
+    ("ix_cohorts_created_at_id", ["created_at", "id"]),
+    ("ix_cohorts_teacher_id_created_at", ["teacher_id", "created_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    op.execute(DELETE_DUPLICATES)
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "uq_cohort_enrollments_cohort_student",
+            "cohort_enrollments",
+            ["cohort_id", "student_id"],
+            unique=True,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_cohort_enrollments_cohort_id_student_id",
+            table_name="cohort_enrollments",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+        for name, columns in COHORT_INDEXES:
+            op.create_index(
+                name,
+                "cohorts",
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in COHORT_INDEXES:
+            op.drop_index(
+                name,
+                table_name="cohorts",
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
+        op.create_index(
+            "ix_cohort_enrollments_cohort_id_student_id",
+            "cohort_enrollments",
+            ["cohort_id", "student_id"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "uq_cohort_enrollments_cohort_student",
+            table_name="cohort_enrollments",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,53 @@
+"""sparse lesson and content block ordering keys
+
+Revision ID: c3a7e5d91f42
+Revises: b84e2f9c3d17
+Create Date: 2026-10-18 17:03:52.118406
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3a7e5d91f42"
+down_revision: Union[str, None] = "b84e2f9c3d17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# backend.ordering.ORDER_GAP at the time of this migration
+ORDER_GAP = 1024
+
+# (table, parent column) of each ordered table
+ORDERED = [("lessons", "course_id"), ("content_blocks", "lesson_id")]
+
+# Renumber each parent's items by rank, keeping their current order
+RENUMBER = """
+UPDATE {table} SET "order" = ({position}) * {step}
+FROM (
+    SELECT id, row_number() OVER (
+        PARTITION BY {parent} ORDER BY "order", id
+    ) AS position
+    FROM {table}
+) AS ranked
+WHERE {table}.id = ranked.id
+"""
+
+
+def upgrade() -> None:
+    for table, parent in ORDERED:
+        op.execute(
+            RENUMBER.format(
+                table=table, parent=parent, position="ranked.position", step=ORDER_GAP
+            )
+        )
+
+
+def downgrade() -> None:
+    for table, parent in ORDERED:
+        op.execute(
+            RENUMBER.format(
+                table=table, parent=parent, position="ranked.position - 1", step=1
+            )
+        )
@@ -0,0 +1,75 @@
+"""unique progress per student and lesson
+
+Revision ID: d2f87a1c6e03
+Revises: a5c3f18e9b27
+Create Date: 2026-10-18 13:25:48.901733
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d2f87a1c6e03"
+down_revision: Union[str, None] = "a5c3f18e9b27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Keep the furthest-along, most recently modified row per student and lesson
+DELETE_DUPLICATES = """
+DELETE FROM progress WHERE id IN (
+    SELECT id FROM (
+        SELECT id, row_number() OVER (
+            PARTITION BY student_id, lesson_id
+            ORDER BY CASE status
+                WHEN 'completed' THEN 2
+                WHEN 'in_progress' THEN 1
+                WHEN 'not_started' THEN 0
+                ELSE -1
+            END DESC, last_modified DESC
+        ) AS position
+        FROM progress
+    ) ranked
+    WHERE position > 1
+)
+"""
+
+
+def upgrade() -> None:
+    op.execute(DELETE_DUPLICATES)
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "uq_progress_student_lesson",
+            "progress",
+            ["student_id", "lesson_id"],
+            unique=True,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+            postgresql_include=["status", "completed_at"],
+        )
+        op.drop_index(
+            "ix_progress_student_id_lesson_id",
+            table_name="progress",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_progress_student_id_lesson_id",
+            "progress",
+            ["student_id", "lesson_id"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+            postgresql_include=["status", "completed_at"],
+        )
+        op.drop_index(
+            "uq_progress_student_lesson",
+            table_name="progress",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,65 @@
+"""add media blobs
+
+Revision ID: e61f0b8a2c59
+Revises: c3a7e5d91f42
+Create Date: 2026-10-18 18:20:44.730916
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e61f0b8a2c59"
+down_revision: Union[str, None] = "c3a7e5d91f42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "media_blobs",
+        sa.Column("digest", sa.String(length=64), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("content_type", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("last_modified", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("digest"),
+    )
+    op.add_column(
+        "content_blocks",
+        sa.Column("blob_digest", sa.String(length=64), nullable=True),
+    )
+    op.create_foreign_key(
+        "content_blocks_blob_digest_fkey",
+        "content_blocks",
+        "media_blobs",
+        ["blob_digest"],
+        ["digest"],
+    )
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_content_blocks_blob_digest",
+            "content_blocks",
+            ["blob_digest"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_content_blocks_blob_digest",
+            table_name="content_blocks",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+    op.drop_constraint(
+        "content_blocks_blob_digest_fkey", "content_blocks", type_="foreignkey"
+    )
+    op.drop_column("content_blocks", "blob_digest")
+    op.drop_table("media_blobs")
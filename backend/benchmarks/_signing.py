@@ -0,0 +1,51 @@
+"""Local RS256 signing key wired into `backend.auth` for benchmarks."""
+
+import time
+import uuid
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from backend import auth
+
+KID = "bench-key"
+DOMAIN = "bench.example.com"
+AUDIENCE = "https://bench-api"
+
+
+def install_signing_key():
+    """Point `backend.auth` at a freshly generated key and return its PEM."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = (
+        private_key.public_key()
+        .public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode()
+    )
+    public_jwk = jwk.construct(public_pem, "RS256").to_dict()
+    public_jwk.update({"kid": KID, "use": "sig"})
+
+    auth.AUTH0_DOMAIN = DOMAIN
+    auth.API_AUDIENCE = AUDIENCE
+    auth.jwks_keyring.load({"keys": [public_jwk]})
+    return private_pem
+
+
+def make_token(private_pem: str, sub: str = None, ttl: int = 3600) -> str:
+    now = int(time.time())
+    claims = {
+        "sub": sub or f"auth0|{uuid.uuid4()}",
+        "aud": AUDIENCE,
+        "iss": f"https://{DOMAIN}/",
+        "iat": now,
+        "exp": now + ttl,
+    }
+    return jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": KID})
@@ -0,0 +1,130 @@
+"""Bulk enrollment latency: one lookup and insert per email vs. enroll_emails.
+
+Seeds a throwaway database with `--students` users and enrolls all of them
+in a fresh cohort, after pre-enrolling `--existing` of them so the skip path
+is exercised. "per email" looks up the user and any existing enrollment
+and adds the row for each email, committing once; "bulk" is
+`enroll_emails`, the function behind `POST /api/v1/cohorts/{id}/enrollments`.
+
+    pdm run python benchmarks/bulk_enroll.py --students 5000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import uuid
+
+database_dir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{database_dir}/bench.db")
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from backend.database import async_session, engine, init_db  # noqa: E402
+from backend.enums import UserRole  # noqa: E402
+from backend.models import Cohort, CohortEnrollment, User  # noqa: E402
+from backend.routes.cohorts import enroll_emails  # noqa: E402
+
+
+async def seed(students: int) -> tuple[uuid.UUID, list]:
+    teacher_id = uuid.uuid4()
+    users = [
+        {
+            "id": id,
+            "sub": f"auth0|{id}",
+            "email": f"{id}@example.com",
+            "role": UserRole.student,
+        }
+        for id in [uuid.uuid4() for _ in range(students)] + [teacher_id]
+    ]
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), users)
+    return teacher_id, users[:-1]
+
+
+async def new_cohort(teacher_id: uuid.UUID, existing: list) -> uuid.UUID:
+    cohort_id = uuid.uuid4()
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(Cohort).values(id=cohort_id, name="bench", teacher_id=teacher_id)
+        )
+        if existing:
+            await conn.execute(
+                insert(CohortEnrollment),
+                [
+                    {"cohort_id": cohort_id, "student_id": user["id"]}
+                    for user in existing
+                ],
+            )
+    return cohort_id
+
+
+async def per_email(cohort_id: uuid.UUID, emails: list) -> None:
+    async with async_session() as session:
+        for email in emails:
+            result = await session.execute(select(User.id).where(User.email == email))
+            student_id = result.scalar_one_or_none()
+            if student_id is None:
+                continue
+            result = await session.execute(
+                select(CohortEnrollment.id).where(
+                    CohortEnrollment.cohort_id == cohort_id,
+                    CohortEnrollment.student_id == student_id,
+                )
+            )
+            if result.scalar_one_or_none() is None:
+                session.add(
+                    CohortEnrollment(
+                        cohort_id=cohort_id, student_id=student_id, status="active"
+                    )
+                )
+        await session.commit()
+
+
+async def bulk(cohort_id: uuid.UUID, emails: list) -> None:
+    async with async_session() as session:
+        await enroll_emails(session, cohort_id, emails)
+        await session.commit()
+
+
+async def measure(label: str, enroll, teacher_id, users: list, existing: int) -> None:
+    cohort_id = await new_cohort(teacher_id, users[:existing])
+    emails = [user["email"] for user in users]
+    start = time.perf_counter()
+    await enroll(cohort_id, emails)
+    elapsed = (time.perf_counter() - start) * 1000
+    async with async_session() as session:
+        enrolled = (
+            await session.execute(
+                select(func.count())
+                .select_from(CohortEnrollment)
+                .where(CohortEnrollment.cohort_id == cohort_id)
+            )
+        ).scalar_one()
+    print(f"{label:10} {elapsed:9.1f} ms  ({enrolled} enrolled)")
+
+
+async def run(students: int, existing: int) -> None:
+    await init_db()
+    teacher_id, users = await seed(students)
+    await measure("per email", per_email, teacher_id, users, existing)
+    await measure("bulk", bulk, teacher_id, users, existing)
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument(
+        "--existing", type=int, default=500, help="students already enrolled"
+    )
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args.students, args.existing))
+
+
+if __name__ == "__main__":
+    main()
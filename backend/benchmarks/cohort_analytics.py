@@ -0,0 +1,149 @@
+"""Cohort analytics report latency: full build, cached and stale reads.
+
+Seeds a throwaway database with one cohort of `--students` students and
+`--courses` courses of `--lessons` lessons each. Every student has
+completed a random prefix of each course, so most progress rows are
+completions and every course has a drop-off lesson.
+
+    pdm run python benchmarks/cohort_analytics.py --students 10000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+database_dir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{database_dir}/bench.db")
+
+from sqlalchemy import insert  # noqa: E402
+
+from backend import analytics  # noqa: E402
+from backend.database import async_session, engine, init_db  # noqa: E402
+from backend.enums import UserRole  # noqa: E402
+from backend.models import (  # noqa: E402
+    Cohort,
+    CohortEnrollment,
+    Course,
+    Lesson,
+    Progress,
+    User,
+)
+
+BATCH = 5000
+
+
+async def insert_batched(conn, model, rows: list) -> None:
+    for start in range(0, len(rows), BATCH):
+        await conn.execute(insert(model), rows[start : start + BATCH])
+
+
+async def seed(students: int, courses: int, lessons: int) -> uuid.UUID:
+    cohort_id, teacher_id = uuid.uuid4(), uuid.uuid4()
+    student_ids = [uuid.uuid4() for _ in range(students)]
+    start = datetime(2026, 1, 1)
+    users, enrollments, lesson_rows, progress = [], [], [], []
+
+    for id in student_ids + [teacher_id]:
+        users.append(
+            {
+                "id": id,
+                "sub": f"auth0|{id}",
+                "email": f"{id}@example.com",
+                "role": UserRole.student,
+            }
+        )
+    for id in student_ids:
+        enrollments.append(
+            {
+                "cohort_id": cohort_id,
+                "student_id": id,
+                "status": "active",
+                "enrolled_at": start,
+            }
+        )
+    course_rows = [
+        {
+            "id": uuid.uuid4(),
+            "cohort_id": cohort_id,
+            "name": f"course {c}",
+            "created_by": teacher_id,
+        }
+        for c in range(courses)
+    ]
+    for course in course_rows:
+        course_lessons = [uuid.uuid4() for _ in range(lessons)]
+        lesson_rows.extend(
+            {"id": id, "course_id": course["id"], "title": f"lesson {i}", "order": i}
+            for i, id in enumerate(course_lessons)
+        )
+        for student_id in student_ids:
+            finished = random.choices(
+                [lessons, random.randrange(lessons)], weights=[2, 1]
+            )[0]
+            for i, lesson_id in enumerate(course_lessons[:finished]):
+                progress.append(
+                    {
+                        "student_id": student_id,
+                        "lesson_id": lesson_id,
+                        "status": "completed",
+                        "completed_at": start + timedelta(hours=i * random.random()),
+                    }
+                )
+
+    async with engine.begin() as conn:
+        await insert_batched(conn, User, users)
+        await conn.execute(
+            insert(Cohort).values(id=cohort_id, name="bench", teacher_id=teacher_id)
+        )
+        await insert_batched(conn, CohortEnrollment, enrollments)
+        await insert_batched(conn, Course, course_rows)
+        await insert_batched(conn, Lesson, lesson_rows)
+        await insert_batched(conn, Progress, progress)
+    print(f"seeded {students} students, {len(progress)} completed progress rows")
+    return cohort_id
+
+
+async def timed(label: str, build) -> None:
+    start = time.perf_counter()
+    report = await build
+    elapsed = (time.perf_counter() - start) * 1000
+    print(
+        f"{label:12} {elapsed:8.1f} ms  completion {report.completion_rate:.1%}"
+        f"  median {report.median_hours_to_complete:.1f} h"
+        f"  p90 {report.p90_hours_to_complete:.1f} h"
+    )
+
+
+async def run(students: int, courses: int, lessons: int) -> None:
+    await init_db()
+    cohort_id = await seed(students, courses, lessons)
+    async with async_session() as session:
+        await timed("build", analytics.compute_cohort_report(session, cohort_id))
+    await timed("first read", analytics.cohort_report(cohort_id))
+    await timed("cached", analytics.cohort_report(cohort_id))
+    # After a progress write the stale report is served while it rebuilds
+    analytics.invalidate_cohorts([cohort_id])
+    await timed("stale read", analytics.cohort_report(cohort_id))
+    await asyncio.gather(*analytics.report_inflight.values())
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--courses", type=int, default=2)
+    parser.add_argument("--lessons", type=int, default=20, help="lessons per course")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args.students, args.courses, args.lessons))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Course and lesson reads: full responses vs. If-None-Match revalidation.
+
+Seeds a throwaway SQLite database with a `--lessons`-lesson course whose
+first lesson has `--blocks` content blocks, then times `--requests` reads
+of each endpoint twice: without a validator (full query and
+serialization), and revalidating with the ETag from the first response
+(a validator query and a 304).
+
+    pdm run python benchmarks/conditional_get.py --lessons 100 --blocks 300
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+import httpx
+
+database_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{database_dir}/bench.db"
+
+from _signing import install_signing_key, make_token  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from backend import ordering  # noqa: E402
+from backend.database import engine, init_db  # noqa: E402
+from backend.enums import UserRole  # noqa: E402
+from backend.main import app  # noqa: E402
+from backend.models import Cohort, ContentBlock, Course, Lesson, User  # noqa: E402
+
+
+async def seed(lessons: int, blocks: int) -> tuple[str, uuid.UUID, uuid.UUID]:
+    teacher_id, cohort_id, course_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    lesson_ids = [uuid.uuid4() for _ in range(lessons)]
+    sub = f"auth0|{teacher_id}"
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User).values(
+                id=teacher_id,
+                sub=sub,
+                email="teacher@example.com",
+                role=UserRole.teacher,
+            )
+        )
+        await conn.execute(
+            insert(Cohort).values(id=cohort_id, name="bench", teacher_id=teacher_id)
+        )
+        await conn.execute(
+            insert(Course).values(
+                id=course_id,
+                cohort_id=cohort_id,
+                name="bench",
+                description="A course with many lessons",
+                created_by=teacher_id,
+            )
+        )
+        await conn.execute(
+            insert(Lesson),
+            [
+                {
+                    "id": id,
+                    "course_id": course_id,
+                    "title": f"Lesson {position}",
+                    "order": ordering.spaced(position),
+                    "structure": {"objectives": ["open", "discover", "close"]},
+                }
+                for position, id in enumerate(lesson_ids)
+            ],
+        )
+        await conn.execute(
+            insert(ContentBlock),
+            [
+                {
+                    "lesson_id": lesson_ids[0],
+                    "order": ordering.spaced(position),
+                    "type": "text",
+                    "content": {"text": "Handle the objection, then ask. " * 8},
+                }
+                for position in range(blocks)
+            ],
+        )
+    return sub, course_id, lesson_ids[0]
+
+
+async def timed(client: httpx.AsyncClient, url: str, headers: dict) -> float:
+    start = time.perf_counter()
+    response = await client.get(url, headers=headers)
+    assert response.status_code in (200, 304), response.text
+    return (time.perf_counter() - start) * 1000
+
+
+async def measure(client, label: str, url: str, requests: int, auth: dict) -> None:
+    first = await client.get(url, headers=auth)
+    first.raise_for_status()
+    revalidate = {**auth, "If-None-Match": first.headers["ETag"]}
+    assert (await client.get(url, headers=revalidate)).status_code == 304
+
+    full = [await timed(client, url, auth) for _ in range(requests)]
+    cached = [await timed(client, url, revalidate) for _ in range(requests)]
+    print(
+        f"{label:20} 200 mean {statistics.mean(full):6.2f} ms"
+        f" ({len(first.content) / 1024:6.1f} KiB)"
+        f"  304 mean {statistics.mean(cached):6.2f} ms"
+        f"  {statistics.mean(full) / statistics.mean(cached):4.1f}x"
+    )
+
+
+async def run(lessons: int, blocks: int, requests: int) -> None:
+    await init_db()
+    sub, course_id, lesson_id = await seed(lessons, blocks)
+    token = make_token(install_signing_key(), sub=sub, ttl=3600)
+    auth = {"Authorization": f"Bearer {token}"}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+        base = f"/api/v1/courses/{course_id}"
+        await measure(client, "course", base, requests, auth)
+        await measure(
+            client, "course + lessons", f"{base}?include=lessons", requests, auth
+        )
+        await measure(
+            client, "lessons page", f"{base}/lessons?limit=100", requests, auth
+        )
+        await measure(
+            client, "lesson + blocks", f"{base}/lessons/{lesson_id}", requests, auth
+        )
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lessons", type=int, default=100)
+    parser.add_argument("--blocks", type=int, default=300)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args.lessons, args.blocks, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Course build latency: one request per course and lesson vs. one import.
+
+"per call" replays what the course editor does today against a throwaway
+database: for the course and then for each lesson and content block, a
+principal lookup, an ownership check, an insert, a commit and a refresh.
+"import" is `import_course`, the function behind
+`POST /api/v1/courses/import`, followed by its single commit.
+
+    pdm run python benchmarks/course_import.py --lessons 40 --blocks 4
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import uuid
+
+database_dir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{database_dir}/bench.db")
+
+from sqlalchemy import event, insert, select  # noqa: E402
+
+from backend.database import async_session, engine, init_db  # noqa: E402
+from backend.enums import ContentType, UserRole  # noqa: E402
+from backend.models import Cohort, ContentBlock, Course, Lesson, User  # noqa: E402
+from backend.routes.courses import import_course  # noqa: E402
+from backend.schemas import (  # noqa: E402
+    ContentBlockImport,
+    CourseImport,
+    LessonImport,
+)
+
+statements = 0
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _count(*_):
+    global statements
+    statements += 1
+
+
+def document(cohort_id: uuid.UUID, lessons: int, blocks: int) -> CourseImport:
+    return CourseImport(
+        cohort_id=cohort_id,
+        name="bench",
+        lessons=[
+            LessonImport(
+                title=f"lesson {i}",
+                content_blocks=[
+                    ContentBlockImport(type=ContentType.text, content={"text": "x"})
+                    for _ in range(blocks)
+                ],
+            )
+            for i in range(lessons)
+        ],
+    )
+
+
+async def seed() -> tuple[uuid.UUID, str, uuid.UUID]:
+    teacher_id, cohort_id = uuid.uuid4(), uuid.uuid4()
+    sub = f"auth0|{teacher_id}"
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User).values(
+                id=teacher_id,
+                sub=sub,
+                email="teacher@example.com",
+                role=UserRole.teacher,
+            )
+        )
+        await conn.execute(
+            insert(Cohort).values(id=cohort_id, name="bench", teacher_id=teacher_id)
+        )
+    return teacher_id, sub, cohort_id
+
+
+async def lookup_principal(session, sub: str) -> uuid.UUID:
+    result = await session.execute(select(User.id).where(User.sub == sub))
+    return result.scalar_one()
+
+
+async def per_call(sub: str, doc: CourseImport) -> None:
+    async with async_session() as session:
+        user_id = await lookup_principal(session, sub)
+        course = Course(cohort_id=doc.cohort_id, name=doc.name, created_by=user_id)
+        session.add(course)
+        await session.commit()
+        await session.refresh(course)
+        course_id = course.id
+
+    for order, lesson_doc in enumerate(doc.lessons):
+        async with async_session() as session:
+            user_id = await lookup_principal(session, sub)
+            await session.execute(
+                select(Course).where(
+                    Course.id == course_id, Course.created_by == user_id
+                )
+            )
+            lesson = Lesson(course_id=course_id, title=lesson_doc.title, order=order)
+            session.add(lesson)
+            await session.commit()
+            await session.refresh(lesson)
+            lesson_id = lesson.id
+
+        for block_order, block_doc in enumerate(lesson_doc.content_blocks):
+            async with async_session() as session:
+                user_id = await lookup_principal(session, sub)
+                await session.execute(
+                    select(Lesson)
+                    .join(Course)
+                    .where(Lesson.id == lesson_id, Course.created_by == user_id)
+                )
+                block = ContentBlock(
+                    lesson_id=lesson_id,
+                    order=block_order,
+                    type=block_doc.type.value,
+                    content=block_doc.content,
+                )
+                session.add(block)
+                await session.commit()
+                await session.refresh(block)
+
+
+async def bulk(sub: str, doc: CourseImport) -> None:
+    async with async_session() as session:
+        user_id = await lookup_principal(session, sub)
+        await import_course(session, doc, user_id)
+        await session.commit()
+
+
+async def measure(label: str, build, repeat: int) -> None:
+    global statements
+    statements = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await build()
+    elapsed = (time.perf_counter() - start) * 1000 / repeat
+    print(f"{label:9} {elapsed:8.1f} ms/course  {statements / repeat:6.0f} statements")
+
+
+async def run(lessons: int, blocks: int, repeat: int) -> None:
+    await init_db()
+    _, sub, cohort_id = await seed()
+    doc = document(cohort_id, lessons, blocks)
+    await measure("per call", lambda: per_call(sub, doc), repeat)
+    await measure("import", lambda: bulk(sub, doc), repeat)
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lessons", type=int, default=40)
+    parser.add_argument("--blocks", type=int, default=4, help="blocks per lesson")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args.lessons, args.blocks, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Userinfo latency through a fresh client per call vs the shared pooled client.
+
+Starts a local HTTPS stand-in for the Auth0 `/userinfo` endpoint with a
+self-signed certificate, so every fresh client pays a real TCP+TLS handshake.
+
+    pdm run python benchmarks/idp_client.py --requests 500
+"""
+
+import argparse
+import asyncio
+import datetime
+import logging
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from backend import auth
+
+PORT = 8443
+
+
+async def userinfo(request):
+    return JSONResponse({"sub": "auth0|bench", "email": "bench@example.com"})
+
+
+def write_self_signed_cert(directory: Path) -> tuple[Path, Path]:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False
+        )
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = directory / "cert.pem", directory / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    return cert_path, key_path
+
+
+def start_idp(cert_path: Path, key_path: Path) -> uvicorn.Server:
+    app = Starlette(routes=[Route("/userinfo", userinfo)])
+    config = uvicorn.Config(
+        app,
+        port=PORT,
+        ssl_certfile=str(cert_path),
+        ssl_keyfile=str(key_path),
+        log_level="error",
+    )
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def fresh_client_call(base_url: str, verify: str) -> None:
+    async with httpx.AsyncClient(base_url=base_url, verify=verify) as client:
+        (await client.get("/userinfo")).raise_for_status()
+
+
+async def shared_client_call() -> None:
+    (await auth.get_idp_client().get("/userinfo")).raise_for_status()
+
+
+async def measure(call, requests: int) -> list[float]:
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list[float]) -> None:
+    p99 = statistics.quantiles(timings, n=100, method="inclusive")[98]
+    print(
+        f"{label:14} mean {statistics.mean(timings):6.2f} ms"
+        f"  p50 {statistics.median(timings):6.2f} ms  p99 {p99:6.2f} ms"
+    )
+
+
+async def run(requests: int, cert_path: Path) -> None:
+    base_url = f"https://localhost:{PORT}"
+    # Same pool settings as get_idp_client, but trusting the local certificate
+    auth.idp_client = httpx.AsyncClient(
+        base_url=base_url,
+        verify=str(cert_path),
+        timeout=httpx.Timeout(auth.idp_timeout, connect=auth.idp_connect_timeout),
+        limits=httpx.Limits(
+            max_connections=auth.idp_max_connections,
+            max_keepalive_connections=auth.idp_max_keepalive_connections,
+            keepalive_expiry=auth.idp_keepalive_expiry,
+        ),
+    )
+
+    fresh = await measure(lambda: fresh_client_call(base_url, str(cert_path)), requests)
+    pooled = await measure(shared_client_call, requests)
+    await auth.close_idp_client()
+
+    report("fresh client", fresh)
+    report("shared client", pooled)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = write_self_signed_cert(Path(directory))
+        server = start_idp(cert_path, key_path)
+        try:
+            asyncio.run(run(args.requests, cert_path))
+        finally:
+            server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Image variant rendering: bytes saved, and its cost to the event loop.
+
+Renders thumbnail/mobile/desktop variants of `--images` photo-like JPEG
+slides (`--width` x 3/4 of it) with `render_variants`, the function the
+derivative process pool runs. "inline" calls it on the event loop, the way
+a request handler resizing on the fly would; "process pool" goes through
+`schedule_derivatives`. A ticker measures how late the loop wakes up while
+the images render: the stall every other request on the worker sees.
+
+    pdm run python benchmarks/image_variants.py --images 8 --width 4032
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+import time
+
+os.environ["MEDIA_ROOT"] = tempfile.mkdtemp()
+
+from PIL import Image, ImageFilter  # noqa: E402
+
+from backend import derivatives  # noqa: E402
+from backend.media import blob_path  # noqa: E402
+
+TICK = 0.005
+
+
+def slide(width: int, seed: int) -> bytes:
+    height = width * 3 // 4
+    noise = Image.effect_noise((width // 8, height // 8), 64 + seed)
+    base = Image.merge(
+        "RGB",
+        [
+            noise.resize((width, height), Image.Resampling.BICUBIC),
+            Image.linear_gradient("L").resize((width, height)),
+            noise.transpose(Image.Transpose.FLIP_LEFT_RIGHT).resize((width, height)),
+        ],
+    )
+    detail = Image.effect_noise((width, height), 24).convert("RGB")
+    image = Image.blend(base, detail, 0.15).filter(ImageFilter.GaussianBlur(1))
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=92)
+    return buffer.getvalue()
+
+
+def store(data: bytes) -> str:
+    digest = hashlib.sha256(data).hexdigest()
+    path = blob_path(digest)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return digest
+
+
+def clear_variants(digests) -> None:
+    for digest in digests:
+        for size in derivatives.VARIANTS.values():
+            derivatives.variant_path(digest, size).unlink(missing_ok=True)
+
+
+async def ticker(lags: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def measure(label: str, digests, render) -> None:
+    lags, stop = [], asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(TICK * 2)
+    start = time.perf_counter()
+    await render(digests)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    print(
+        f"{label:13} {elapsed * 1000:8.1f} ms total"
+        f"  max loop stall {max(lags) * 1000:8.1f} ms"
+    )
+
+
+async def inline(digests) -> None:
+    for digest in digests:
+        derivatives.render_variants(
+            str(blob_path(digest)),
+            derivatives.missing_variants(digest),
+            derivatives.variant_quality,
+        )
+        # Give the ticker a turn between images, as between requests
+        await asyncio.sleep(0)
+
+
+async def pooled(digests) -> None:
+    await asyncio.gather(
+        *(derivatives.schedule_derivatives(digest, "image/jpeg") for digest in digests)
+    )
+
+
+async def run(images: int, width: int) -> None:
+    sources = [slide(width, seed) for seed in range(images)]
+    digests = [store(data) for data in sources]
+
+    # Start the worker processes outside the measurement
+    await asyncio.gather(
+        *(
+            asyncio.get_running_loop().run_in_executor(
+                derivatives.get_derivative_executor(), time.sleep, 0.1
+            )
+            for _ in range(derivatives.derivative_max_workers)
+        )
+    )
+
+    await measure("inline", digests, inline)
+    clear_variants(digests)
+    await measure("process pool", digests, pooled)
+
+    original = sum(len(data) for data in sources) / images
+    print(f"\n{'original':13} {original / 1024:8.1f} KiB mean")
+    for name, size in derivatives.VARIANTS.items():
+        mean = (
+            sum(derivatives.variant_path(d, size).stat().st_size for d in digests)
+            / images
+        )
+        print(
+            f"{name:13} {mean / 1024:8.1f} KiB mean  ({original / mean:5.1f}x smaller)"
+        )
+    derivatives.shutdown_derivative_executor()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=int, default=8)
+    parser.add_argument("--width", type=int, default=4032)
+    args = parser.parse_args()
+    asyncio.run(run(args.images, args.width))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Lesson reorder latency on a large course: dense renumbering vs. sparse keys.
+
+Seeds a throwaway database with two `--lessons`-lesson courses and applies
+the same `--moves` random drags to each. "dense" keeps orders 0..n-1 and
+renumbers every lesson between the old and new position with one
+`update_lesson`-style request each (fetch, update, commit, refresh).
+"sparse" is `move_item`, the function behind
+`POST /api/v1/courses/{id}/lessons/{id}/move`, in one transaction per move.
+"hot spot" keeps moving the last lesson to second place, so the same gap is
+halved every move and triggers background rebalances.
+
+    pdm run python benchmarks/lesson_reorder.py --lessons 500 --moves 50
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+database_dir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{database_dir}/bench.db")
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from backend import ordering  # noqa: E402
+from backend.database import async_session, engine, init_db  # noqa: E402
+from backend.enums import UserRole  # noqa: E402
+from backend.models import Cohort, Course, Lesson, User  # noqa: E402
+
+
+async def seed(lessons: int) -> tuple[uuid.UUID, uuid.UUID]:
+    teacher_id, cohort_id = uuid.uuid4(), uuid.uuid4()
+    dense_id, sparse_id = uuid.uuid4(), uuid.uuid4()
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User).values(
+                id=teacher_id,
+                sub=f"auth0|{teacher_id}",
+                email="teacher@example.com",
+                role=UserRole.teacher,
+            )
+        )
+        await conn.execute(
+            insert(Cohort).values(id=cohort_id, name="bench", teacher_id=teacher_id)
+        )
+        await conn.execute(
+            insert(Course),
+            [
+                {
+                    "id": id,
+                    "cohort_id": cohort_id,
+                    "name": "bench",
+                    "created_by": teacher_id,
+                }
+                for id in (dense_id, sparse_id)
+            ],
+        )
+        for course_id, key in ((dense_id, lambda i: i), (sparse_id, ordering.spaced)):
+            await conn.execute(
+                insert(Lesson),
+                [
+                    {"course_id": course_id, "title": f"lesson {i}", "order": key(i)}
+                    for i in range(lessons)
+                ],
+            )
+    return dense_id, sparse_id
+
+
+async def lesson_ids(course_id: uuid.UUID) -> list:
+    async with async_session() as session:
+        result = await session.execute(
+            select(Lesson.id)
+            .where(Lesson.course_id == course_id)
+            .order_by(Lesson.order, Lesson.id)
+        )
+        return list(result.scalars())
+
+
+async def update_order(lesson_id: uuid.UUID, order: int) -> None:
+    async with async_session() as session:
+        result = await session.execute(select(Lesson).where(Lesson.id == lesson_id))
+        lesson = result.scalar_one()
+        lesson.order = order
+        await session.commit()
+        await session.refresh(lesson)
+
+
+async def dense_move(ids: list, source: int, target: int) -> int:
+    """Move ids[source] to index `target`, renumbering everything between."""
+    ids.insert(target, ids.pop(source))
+    low, high = sorted((source, target))
+    for position in range(low, high + 1):
+        await update_order(ids[position], position)
+    return high - low + 1
+
+
+async def sparse_move(course_id: uuid.UUID, ids: list, source: int, target: int) -> int:
+    lesson_id = ids.pop(source)
+    ids.insert(target, lesson_id)
+    after_id = ids[target - 1] if target else None
+    async with async_session() as session:
+        await ordering.lock_parent(session, ordering.LESSONS, course_id)
+        moved = await ordering.move_item(
+            session, ordering.LESSONS, course_id, lesson_id, after_id
+        )
+        await session.commit()
+    if moved.narrow:
+        ordering.schedule_rebalance(ordering.LESSONS, course_id)
+    return len(ids) if moved.rebalanced else 1
+
+
+async def measure(label: str, course_id: uuid.UUID, moves: list, move) -> None:
+    ids = await lesson_ids(course_id)
+    timings, written = [], 0
+    for source, target in moves:
+        start = time.perf_counter()
+        written += await move(ids, source, target)
+        timings.append((time.perf_counter() - start) * 1000)
+    rebalances = len(ordering.rebalance_inflight)
+    await asyncio.gather(*ordering.rebalance_inflight.values())
+    assert await lesson_ids(course_id) == ids, f"{label}: order mismatch"
+    p95 = statistics.quantiles(timings, n=20)[-1]
+    print(
+        f"{label:9} mean {statistics.mean(timings):8.2f} ms  p95 {p95:8.2f} ms"
+        f"  {written / len(moves):6.1f} rows written/move"
+        + (f"  {rebalances} rebalances pending at end" if rebalances else "")
+    )
+
+
+async def run(lessons: int, moves: int) -> None:
+    await init_db()
+    dense_id, sparse_id = await seed(lessons)
+    drags = [
+        (random.randrange(lessons), random.randrange(lessons)) for _ in range(moves)
+    ]
+    await measure("dense", dense_id, drags, dense_move)
+    await measure(
+        "sparse", sparse_id, drags, lambda ids, s, t: sparse_move(sparse_id, ids, s, t)
+    )
+
+    rebalances = 0
+    original = ordering._rebalance_later
+
+    async def counted(*args):
+        nonlocal rebalances
+        rebalances += 1
+        await original(*args)
+
+    ordering._rebalance_later = counted
+    hot = [(lessons - 1, 1)] * moves
+    await measure(
+        "hot spot", sparse_id, hot, lambda ids, s, t: sparse_move(sparse_id, ids, s, t)
+    )
+    print(f"{'':9} {rebalances} background rebalances over {moves} hot-spot moves")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lessons", type=int, default=500)
+    parser.add_argument("--moves", type=int, default=50)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args.lessons, args.moves))
+
+
+if __name__ == "__main__":
+    main()
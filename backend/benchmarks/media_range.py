@@ -0,0 +1,171 @@
+"""Media upload and seek cost: whole-file handling vs. the blob store.
+
+Uploads a `--size` MiB file through `POST /api/v1/media`, then seeks to
+`--seeks` random offsets with 1 MiB Range requests against
+`GET /api/v1/media/{digest}`. The baselines buffer the whole upload body
+(`await request.body()`) and answer a seek by reading the file and slicing
+it, the way a handler without a media path would. Reports time and
+tracemalloc peak for each.
+
+    pdm run python benchmarks/media_range.py --size 256
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+database_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{database_dir}/bench.db"
+os.environ["MEDIA_ROOT"] = f"{database_dir}/media"
+
+from _signing import install_signing_key, make_token  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from backend.database import engine, init_db  # noqa: E402
+from backend.enums import UserRole  # noqa: E402
+from backend.main import app  # noqa: E402
+from backend.media import blob_path  # noqa: E402
+from backend.models import User  # noqa: E402
+
+CHUNK = 64 * 2**10
+SEEK_LENGTH = 2**20
+
+
+async def call(token: str, method: str, path: str, headers=(), body_chunks=()):
+    # Drive the ASGI app directly: httpx's ASGITransport buffers bodies on
+    # both sides, which would swamp the memory profile
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"authorization", f"Bearer {token}".encode()), *headers],
+        "server": ("app", 80),
+        "client": ("bench", 1),
+    }
+    chunks = iter(body_chunks)
+    done = asyncio.Event()
+    status, size, body = None, 0, bytearray()
+
+    async def receive():
+        chunk = next(chunks, None)
+        if chunk is not None:
+            return {"type": "http.request", "body": chunk, "more_body": True}
+        if not done.is_set():
+            done.set()
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+            if status != 206 and size < 4096:
+                body.extend(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, size, bytes(body)
+
+
+def file_chunks(path: str):
+    with open(path, "rb") as file:
+        while chunk := file.read(CHUNK):
+            yield chunk
+
+
+async def measure(label: str, coro):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = await coro
+    elapsed = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:20} {elapsed:9.1f} ms  peak {peak / 2**20:8.1f} MiB")
+    return result
+
+
+async def buffered_upload(source: str) -> None:
+    body = bytearray()
+    for chunk in file_chunks(source):
+        body.extend(chunk)
+    with open(os.path.join(database_dir, "buffered"), "wb") as file:
+        file.write(body)
+
+
+async def sliced_seeks(path, offsets) -> None:
+    for offset in offsets:
+        with open(path, "rb") as file:
+            data = file.read()
+        _ = data[offset : offset + SEEK_LENGTH]
+
+
+async def range_seeks(token, digest, offsets) -> None:
+    for offset in offsets:
+        header = f"bytes={offset}-{offset + SEEK_LENGTH - 1}".encode()
+        status, size, _ = await call(
+            token, "GET", f"/api/v1/media/{digest}", [(b"range", header)]
+        )
+        assert status == 206 and size == SEEK_LENGTH, (status, size)
+
+
+async def run(size_mib: int, seeks: int) -> None:
+    await init_db()
+    sub = f"auth0|{uuid.uuid4()}"
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User).values(
+                sub=sub, email="teacher@example.com", role=UserRole.teacher
+            )
+        )
+    token = make_token(install_signing_key(), sub=sub, ttl=3600)
+
+    source = os.path.join(database_dir, "source.mp4")
+    with open(source, "wb") as file:
+        for _ in range(size_mib):
+            file.write(os.urandom(2**20))
+
+    await measure("upload (buffered)", buffered_upload(source))
+    status, _, body = await measure(
+        "upload (streamed)",
+        call(
+            token,
+            "POST",
+            "/api/v1/media",
+            [(b"content-type", b"video/mp4")],
+            file_chunks(source),
+        ),
+    )
+    assert status == 200, body
+    digest = body.split(b'"digest":"')[1][:64].decode()
+
+    offsets = [random.randrange(size_mib * 2**20 - SEEK_LENGTH) for _ in range(seeks)]
+    await measure(f"{seeks} seeks (sliced)", sliced_seeks(blob_path(digest), offsets))
+    await measure(f"{seeks} seeks (range)", range_seeks(token, digest, offsets))
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=256, help="file size in MiB")
+    parser.add_argument("--seeks", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args.size, args.seeks))
+
+
+if __name__ == "__main__":
+    main()
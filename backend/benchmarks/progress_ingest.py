@@ -0,0 +1,148 @@
+"""Progress-event ingestion throughput: one row per request vs. batched upserts.
+
+Seeds a throwaway database with lessons and students, then has every
+student report random progress events concurrently. "per event" does a
+SELECT followed by an INSERT or UPDATE and a commit for each event, the way a
+single-event endpoint would; "batched" sends `--batch` events at a time
+through `upsert_progress`, the function behind `POST /api/v1/progress`.
+
+    pdm run python benchmarks/progress_ingest.py --students 50 --events 400
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+import uuid
+
+database_dir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{database_dir}/bench.db")
+
+from sqlalchemy import delete, func, insert, select  # noqa: E402
+
+from backend.database import async_session, engine, init_db  # noqa: E402
+from backend.enums import UserRole  # noqa: E402
+from backend.models import Cohort, Course, Lesson, Progress, User  # noqa: E402
+from backend.routes.progress import STATUS_RANK, upsert_progress  # noqa: E402
+from backend.schemas import ProgressEvent  # noqa: E402
+
+
+async def seed(students: int, lessons: int) -> tuple[list, list]:
+    student_ids = [uuid.uuid4() for _ in range(students)]
+    lesson_ids = [uuid.uuid4() for _ in range(lessons)]
+    teacher_id, cohort_id, course_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User),
+            [
+                {
+                    "id": id,
+                    "sub": f"auth0|{id}",
+                    "email": f"{id}@example.com",
+                    "role": UserRole.student,
+                }
+                for id in student_ids + [teacher_id]
+            ],
+        )
+        await conn.execute(
+            insert(Cohort).values(id=cohort_id, name="bench", teacher_id=teacher_id)
+        )
+        await conn.execute(
+            insert(Course).values(
+                id=course_id, cohort_id=cohort_id, name="bench", created_by=teacher_id
+            )
+        )
+        await conn.execute(
+            insert(Lesson),
+            [
+                {"id": id, "course_id": course_id, "title": f"lesson {i}", "order": i}
+                for i, id in enumerate(lesson_ids)
+            ],
+        )
+    return student_ids, lesson_ids
+
+
+def random_events(lesson_ids: list, count: int) -> list[ProgressEvent]:
+    return [
+        ProgressEvent(
+            lesson_id=random.choice(lesson_ids), status=random.choice(list(STATUS_RANK))
+        )
+        for _ in range(count)
+    ]
+
+
+async def per_event(student_id, events) -> None:
+    for event in events:
+        async with async_session() as session:
+            result = await session.execute(
+                select(Progress).where(
+                    Progress.student_id == student_id,
+                    Progress.lesson_id == event.lesson_id,
+                )
+            )
+            progress = result.scalar_one_or_none()
+            if progress is None:
+                session.add(
+                    Progress(
+                        student_id=student_id,
+                        lesson_id=event.lesson_id,
+                        status=event.status.value,
+                    )
+                )
+            elif STATUS_RANK[event.status] > STATUS_RANK[progress.status]:
+                progress.status = event.status.value
+            await session.commit()
+
+
+async def batched(student_id, events, batch: int) -> None:
+    for start in range(0, len(events), batch):
+        async with async_session() as session:
+            await upsert_progress(session, student_id, events[start : start + batch])
+            await session.commit()
+
+
+async def measure(label: str, runs) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(delete(Progress))
+    total = sum(len(events) for _, events in runs)
+    start = time.perf_counter()
+    await asyncio.gather(*(coro for coro, _ in runs))
+    elapsed = time.perf_counter() - start
+    async with async_session() as session:
+        rows = (await session.execute(select(func.count(Progress.id)))).scalar_one()
+    print(f"{label:10} {total / elapsed:9.0f} events/s  ({rows} progress rows)")
+
+
+async def run(students: int, events: int, lessons: int, batch: int) -> None:
+    await init_db()
+    student_ids, lesson_ids = await seed(students, lessons)
+    workload = {id: random_events(lesson_ids, events) for id in student_ids}
+
+    await measure(
+        "per event",
+        [(per_event(id, evts), evts) for id, evts in workload.items()],
+    )
+    await measure(
+        "batched",
+        [(batched(id, evts, batch), evts) for id, evts in workload.items()],
+    )
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=50)
+    parser.add_argument("--events", type=int, default=400, help="events per student")
+    parser.add_argument("--lessons", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=100)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args.students, args.events, args.lessons, args.batch))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Fail if a hot-path query's plan falls back to a full table scan.
+
+Runs EXPLAIN for each hot query against DATABASE_URL (SQLite or Postgres)
+and exits non-zero if any of them scans instead of using an index. On
+Postgres, sequential scans are disabled for the check so small test tables
+don't hide a missing index. tests/test_query_plans.py runs the same check
+under pytest.
+
+DATABASE_URL=sqlite+aiosqlite:///./plans.db pdm run python benchmarks/query_plans.py
+"""
+
+import asyncio
+import json
+import logging
+import sys
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import select
+
+from backend.database import engine, init_db
+from backend.enums import RollupGranularity
+from backend.models import (
+    ActivityRollup,
+    Base,
+    Cohort,
+    CohortEnrollment,
+    ContentBlock,
+    Course,
+    Lesson,
+    MediaBlob,
+    Progress,
+    User,
+)
+from backend.rollups import metric_queries
+from backend.routes.courses import child_validators
+from backend.routes.media import blob_visible_to
+
+ID = uuid.UUID(int=1)
+DIGEST = "0" * 64
+
+HOT_QUERIES = {
+    "user by sub": select(User.id, User.role).where(User.sub == "auth0|x"),
+    "users page": select(User).order_by(User.created_at, User.id).limit(100),
+    "courses by owner": select(Course)
+    .where(Course.created_by == ID)
+    .order_by(Course.created_at, Course.id),
+    "lessons by course": select(Lesson)
+    .where(Lesson.course_id == ID)
+    .order_by(Lesson.order),
+    "enrollment lookup": select(CohortEnrollment.id).where(
+        CohortEnrollment.cohort_id == ID, CohortEnrollment.student_id == ID
+    ),
+    "cohorts by teacher": select(Cohort)
+    .where(Cohort.teacher_id == ID)
+    .order_by(Cohort.created_at, Cohort.id),
+    "cohort roster page": select(CohortEnrollment.student_id, User.email)
+    .join(User, User.id == CohortEnrollment.student_id)
+    .where(CohortEnrollment.cohort_id == ID)
+    .order_by(CohortEnrollment.student_id)
+    .limit(100),
+    "enrollments by email": select(User.email, User.id).where(
+        User.email.in_(["a@example.com", "b@example.com"])
+    ),
+    "progress lookup": select(Progress.status).where(
+        Progress.student_id == ID, Progress.lesson_id == ID
+    ),
+    "content blocks by lesson": select(ContentBlock)
+    .where(ContentBlock.lesson_id == ID)
+    .order_by(ContentBlock.order),
+    "lessons page validators": select(
+        Course.id, *child_validators(Lesson, Lesson.course_id, ID)
+    ).where(Course.id == ID, Course.created_by == ID),
+    "lesson validators": select(
+        Lesson.last_modified,
+        *child_validators(ContentBlock, ContentBlock.lesson_id, ID),
+    )
+    .join(Course)
+    .where(Course.id == ID, Lesson.id == ID, Course.created_by == ID),
+    "media access": select(MediaBlob.content_type).where(
+        MediaBlob.digest == DIGEST, blob_visible_to(DIGEST, ID)
+    ),
+    "activity rollup range": select(ActivityRollup)
+    .where(
+        ActivityRollup.granularity == RollupGranularity.day.value,
+        ActivityRollup.bucket_start >= date(2026, 1, 1),
+        ActivityRollup.bucket_start <= date(2026, 3, 31),
+    )
+    .order_by(ActivityRollup.bucket_start),
+    **{
+        f"rollup {metric}": query
+        for metric, query in metric_queries(
+            datetime(2026, 1, 1), datetime(2026, 1, 2)
+        ).items()
+    },
+}
+
+
+def _postgres_scans(plan: dict) -> list[str]:
+    scans = []
+    if plan["Node Type"] == "Seq Scan":
+        scans.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        scans.extend(_postgres_scans(child))
+    return scans
+
+
+async def table_scans(conn, sql: str) -> list[str]:
+    if conn.dialect.name == "postgresql":
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+        plan = result.scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        return _postgres_scans(plan[0]["Plan"])
+
+    result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")
+    # Scans of subqueries and CTEs are fine; only whole tables count
+    return [
+        detail
+        for *_, detail in result
+        if detail.startswith("SCAN")
+        and "USING" not in detail
+        and detail.split()[1] in Base.metadata.tables
+    ]
+
+
+async def check() -> int:
+    await init_db()
+    failures = 0
+    async with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            await conn.exec_driver_sql("SET enable_seqscan = off")
+        for name, query in HOT_QUERIES.items():
+            sql = str(
+                query.compile(
+                    dialect=conn.dialect, compile_kwargs={"literal_binds": True}
+                )
+            )
+            scans = await table_scans(conn, sql)
+            status = "table scan: " + ", ".join(scans) if scans else "ok"
+            print(f"{name:26} {status}")
+            failures += bool(scans)
+    await engine.dispose()
+    return failures
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    sys.exit(1 if asyncio.run(check()) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Cost of an interrupted upload: single request vs. resumable chunks.
+
+Uploads a `--size` MiB file whose connection drops after `--fail-at` of its
+bytes, then retries. A single-request upload (`POST /api/v1/media`) has to
+start over. A resumable one (`POST /api/v1/media/uploads`) asks which
+chunks were committed and sends only the rest, in any order. Reports bytes
+sent, time, and the tracemalloc peak across the whole exchange.
+
+    pdm run python benchmarks/resumable_upload.py --size 256 --fail-at 0.6
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+database_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{database_dir}/bench.db"
+os.environ["MEDIA_ROOT"] = f"{database_dir}/media"
+
+from _signing import install_signing_key, make_token  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from backend.database import engine, init_db  # noqa: E402
+from backend.enums import UserRole  # noqa: E402
+from backend.main import app  # noqa: E402
+from backend.models import User  # noqa: E402
+
+PIECE = 64 * 2**10
+
+
+class Client:
+    """Drives the ASGI app directly, streaming request bodies, and counts
+    the body bytes it sends."""
+
+    def __init__(self, token: str):
+        self.token = token
+        self.sent = 0
+
+    async def call(self, method, path, headers=(), body=b"", drop_after=None):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [
+                (b"authorization", f"Bearer {self.token}".encode()),
+                *headers,
+            ],
+            "server": ("app", 80),
+            "client": ("bench", 1),
+        }
+        view = memoryview(body)
+        limit = len(body) if drop_after is None else drop_after
+        offset, finished = 0, False
+        status, response = None, bytearray()
+
+        async def receive():
+            nonlocal offset, finished
+            if offset < limit:
+                piece = bytes(view[offset : min(offset + PIECE, limit)])
+                offset += len(piece)
+                self.sent += len(piece)
+                return {"type": "http.request", "body": piece, "more_body": True}
+            if drop_after is not None:
+                return {"type": "http.disconnect"}
+            if not finished:
+                finished = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Event().wait()
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response.extend(message.get("body", b""))
+
+        try:
+            await app(scope, receive, send)
+        except Exception:
+            if drop_after is None:
+                raise
+        return status, bytes(response)
+
+
+def content_digest(chunk: bytes) -> bytes:
+    return b"sha-256=:" + base64.b64encode(hashlib.sha256(chunk).digest()) + b":"
+
+
+async def single_request(client: Client, data: bytes, fail_at: float) -> str:
+    headers = [(b"content-type", b"video/mp4")]
+    await client.call(
+        "POST", "/api/v1/media", headers, data, drop_after=int(len(data) * fail_at)
+    )
+    status, body = await client.call("POST", "/api/v1/media", headers, data)
+    assert status == 200, body
+    return json.loads(body)["digest"]
+
+
+async def put_chunk(client, upload, index, data, drop_after=None):
+    size = upload["chunk_size"]
+    chunk = data[index * size : (index + 1) * size]
+    return await client.call(
+        "PUT",
+        f"/api/v1/media/uploads/{upload['id']}/chunks/{index}",
+        [(b"content-digest", content_digest(chunk))],
+        chunk,
+        drop_after=drop_after,
+    )
+
+
+async def resumable(client: Client, data: bytes, fail_at: float, chunk_mib: int):
+    document = {
+        "content_type": "video/mp4",
+        "size": len(data),
+        "chunk_size": chunk_mib * 2**20,
+    }
+    status, body = await client.call(
+        "POST",
+        "/api/v1/media/uploads",
+        [(b"content-type", b"application/json")],
+        json.dumps(document).encode(),
+    )
+    assert status == 200, body
+    upload = json.loads(body)
+
+    # Send chunks in random order until the connection drops mid-chunk
+    order = list(range(upload["chunk_count"]))
+    random.shuffle(order)
+    budget = int(len(data) * fail_at)
+    for index in order:
+        size = min(upload["chunk_size"], len(data) - index * upload["chunk_size"])
+        if budget < size:
+            await put_chunk(client, upload, index, data, drop_after=budget)
+            break
+        budget -= size
+        await put_chunk(client, upload, index, data)
+
+    status, body = await client.call("GET", f"/api/v1/media/uploads/{upload['id']}")
+    received = set(json.loads(body)["received"])
+    for index in order:
+        if index not in received:
+            status, body = await put_chunk(client, upload, index, data)
+            assert status == 200, body
+    status, body = await client.call(
+        "POST", f"/api/v1/media/uploads/{upload['id']}/complete"
+    )
+    assert status == 200, body
+    return json.loads(body)["digest"]
+
+
+async def measure(label: str, data: bytes, client: Client, coro) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    digest = await coro
+    elapsed = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert digest == hashlib.sha256(data).hexdigest(), label
+    print(
+        f"{label:15} {elapsed:9.1f} ms  sent {client.sent / len(data):5.2f}x"
+        f"  peak {peak / 2**20:7.1f} MiB"
+    )
+
+
+async def run(size_mib: int, fail_at: float, chunk_mib: int) -> None:
+    await init_db()
+    sub = f"auth0|{uuid.uuid4()}"
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User).values(
+                sub=sub, email="teacher@example.com", role=UserRole.teacher
+            )
+        )
+    token = make_token(install_signing_key(), sub=sub, ttl=3600)
+    data = os.urandom(size_mib * 2**20)
+
+    # The file itself is held by the benchmark, so peaks exclude it
+    client = Client(token)
+    await measure("single request", data, client, single_request(client, data, fail_at))
+    client = Client(token)
+    await measure(
+        "resumable", data, client, resumable(client, data, fail_at, chunk_mib)
+    )
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=256, help="file size in MiB")
+    parser.add_argument(
+        "--fail-at", type=float, default=0.6, help="fraction sent before the drop"
+    )
+    parser.add_argument("--chunk", type=int, default=8, help="chunk size in MiB")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args.size, args.fail_at, args.chunk))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Mixed read/write throughput on a SQLite file, before and after single-writer mode.
+
+"before" is a plain `create_async_engine(url)` as the app used to build it;
+"after" is the WAL-tuned single writer plus reader pool from
+`backend.database`.
+
+pdm run python benchmarks/sqlite_mixed.py --workers 32 --ops 200 --writes 0.2
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import DatabaseSettings, create_engine
+from backend.enums import UserRole
+from backend.models import Base, User
+
+
+async def worker(write_session, read_session, ops, write_ratio, subs, errors):
+    for _ in range(ops):
+        try:
+            if random.random() < write_ratio:
+                sub = f"auth0|{uuid.uuid4()}"
+                async with write_session() as session:
+                    # Read-then-write, like the route handlers do
+                    await session.execute(select(User.id).where(User.sub == subs[0]))
+                    session.add(
+                        User(
+                            sub=sub,
+                            email=f"{sub[6:]}@example.com",
+                            role=UserRole.student,
+                        )
+                    )
+                    await session.commit()
+                subs.append(sub)
+            else:
+                async with read_session() as session:
+                    await session.execute(
+                        select(User.id, User.role).where(
+                            User.sub == random.choice(subs)
+                        )
+                    )
+        except OperationalError:
+            errors.append(1)
+
+
+async def run(writer, reader, workers, ops, write_ratio) -> tuple[float, int]:
+    async with writer.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    write_session = sessionmaker(writer, class_=AsyncSession, expire_on_commit=False)
+    read_session = sessionmaker(reader, class_=AsyncSession, expire_on_commit=False)
+    subs = ["auth0|seed"]
+    errors: list[int] = []
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            worker(write_session, read_session, ops, write_ratio, subs, errors)
+            for _ in range(workers)
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    await writer.dispose()
+    await reader.dispose()
+    return workers * ops / elapsed, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--ops", type=int, default=200, help="operations per worker")
+    parser.add_argument("--writes", type=float, default=0.2, help="write ratio")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{directory}/before.db"
+        engine = create_async_engine(url)
+        before = asyncio.run(run(engine, engine, args.workers, args.ops, args.writes))
+
+        url = f"sqlite+aiosqlite:///{directory}/after.db"
+        settings = DatabaseSettings(database_url=url)
+        writer = create_engine(settings, sqlite_writer=True)
+        reader = create_engine(settings)
+        after = asyncio.run(run(writer, reader, args.workers, args.ops, args.writes))
+
+    print(f"before: {before[0]:8.0f} ops/s  {before[1]} 'database is locked' errors")
+    print(f"after:  {after[0]:8.0f} ops/s  {after[1]} 'database is locked' errors")
+
+
+if __name__ == "__main__":
+    main()
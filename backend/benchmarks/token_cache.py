@@ -0,0 +1,47 @@
+"""Requests per second through `requires_auth` with the token cache on and off.
+
+pdm run python benchmarks/token_cache.py --requests 5000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from _signing import install_signing_key, make_token
+
+from backend import auth
+
+
+async def run(requests: int, tokens: int) -> float:
+    private_pem = install_signing_key()
+    pool = [make_token(private_pem) for _ in range(tokens)]
+
+    start = time.perf_counter()
+    for i in range(requests):
+        await auth.requires_auth(pool[i % tokens])
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--tokens", type=int, default=20, help="distinct tokens")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    cache = auth.token_cache
+
+    auth.token_cache = None
+    uncached = asyncio.run(run(args.requests, args.tokens))
+
+    auth.token_cache = cache
+    cached = asyncio.run(run(args.requests, args.tokens))
+
+    print(f"cache off: {uncached:10.0f} req/s")
+    print(f"cache on:  {cached:10.0f} req/s  ({cached / uncached:.1f}x)")
+    print(f"counters:  {auth.token_cache_stats.as_dict()}")
+
+
+if __name__ == "__main__":
+    main()
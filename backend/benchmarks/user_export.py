@@ -0,0 +1,154 @@
+"""Peak memory of exporting every user: streamed export vs. loading the list.
+
+Seeds a throwaway SQLite database with synthetic users, then measures the
+tracemalloc peak and time-to-first-byte of `GET /api/v1/users/export`
+against building the whole `UserRead` list the way `/all` used to.
+
+    pdm run python benchmarks/user_export.py --users 200000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+database_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{database_dir}/bench.db"
+
+from _signing import install_signing_key, make_token  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from backend.database import async_session, engine, init_db  # noqa: E402
+from backend.enums import UserRole  # noqa: E402
+from backend.main import app  # noqa: E402
+from backend.models import User  # noqa: E402
+from backend.schemas import UserRead  # noqa: E402
+
+BATCH = 10_000
+
+
+async def seed(users: int) -> str:
+    admin_sub = f"auth0|{uuid.uuid4()}"
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User),
+            [
+                {
+                    "sub": admin_sub,
+                    "email": "admin@example.com",
+                    "role": UserRole.admin,
+                }
+            ],
+        )
+        for start in range(0, users, BATCH):
+            await conn.execute(
+                insert(User),
+                [
+                    {
+                        "sub": f"auth0|{uuid.uuid4()}",
+                        "email": f"user{i}@example.com",
+                        "role": UserRole.student,
+                    }
+                    for i in range(start, min(start + BATCH, users))
+                ],
+            )
+    return admin_sub
+
+
+async def materialized() -> tuple[int, None]:
+    async with async_session() as session:
+        result = await session.execute(select(User))
+        users = [UserRead.model_validate(user) for user in result.scalars().all()]
+        body = "".join(user.model_dump_json() + "\n" for user in users)
+    return len(body), None
+
+
+async def streamed(token: str, fmt: str) -> tuple[int, float]:
+    # Drive the ASGI app directly: httpx's ASGITransport buffers the whole
+    # body, which would hide both the first byte and the memory profile.
+    start = time.perf_counter()
+    first_byte = None
+    size = 0
+    status = None
+    disconnected = asyncio.Event()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/v1/users/export",
+        "raw_path": b"/api/v1/users/export",
+        "root_path": "",
+        "query_string": f"format={fmt}".encode(),
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "server": ("app", 80),
+        "client": ("bench", 1),
+    }
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal first_byte, size, status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            size += len(message["body"])
+
+    await app(scope, receive, send)
+    disconnected.set()
+    if status != 200:
+        raise RuntimeError(f"export returned {status}")
+    return size, first_byte
+
+
+async def measure(label: str, coro) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    size, first_byte = await coro
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    ttfb = f"  first byte {first_byte * 1000:7.1f} ms" if first_byte else ""
+    print(
+        f"{label:12} {size / 2**20:7.1f} MiB out  peak {peak / 2**20:7.1f} MiB"
+        f"  total {elapsed:6.2f} s{ttfb}"
+    )
+
+
+async def run(users: int) -> None:
+    await init_db()
+    admin_sub = await seed(users)
+    token = make_token(install_signing_key(), sub=admin_sub, ttl=3600)
+
+    # Warm the auth and principal caches outside the measurement
+    await streamed(token, "ndjson")
+    await measure("materialized", materialized())
+    await measure("ndjson", streamed(token, "ndjson"))
+    await measure("csv", streamed(token, "csv"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200_000)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args.users))
+
+
+if __name__ == "__main__":
+    main()
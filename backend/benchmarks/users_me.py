@@ -0,0 +1,91 @@
+"""Latency of `GET /api/v1/users/me` for existing and first-time users.
+
+Runs the app in-process against a throwaway SQLite database. The userinfo
+endpoint is a local stand-in with a configurable delay that plays the part
+of the Auth0 round-trip.
+
+    pdm run python benchmarks/users_me.py --requests 300 --idp-latency-ms 80
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+
+database_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{database_dir}/bench.db"
+
+from _signing import install_signing_key, make_token  # noqa: E402
+
+from backend import auth  # noqa: E402
+from backend.database import init_db  # noqa: E402
+from backend.main import app  # noqa: E402
+
+
+def install_idp(latency: float) -> None:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        token = request.headers["Authorization"].split()[1]
+        return httpx.Response(200, json={"email": f"{token[-12:]}@example.com"})
+
+    auth.idp_client = httpx.AsyncClient(
+        base_url="https://idp.local", transport=httpx.MockTransport(handler)
+    )
+
+
+async def timed_get(client: httpx.AsyncClient, token: str) -> float:
+    start = time.perf_counter()
+    response = await client.get(
+        "/api/v1/users/me", headers={"Authorization": f"Bearer {token}"}
+    )
+    response.raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+
+def report(label: str, timings: list[float]) -> None:
+    p99 = statistics.quantiles(timings, n=100, method="inclusive")[98]
+    print(
+        f"{label:14} mean {statistics.mean(timings):7.2f} ms"
+        f"  p50 {statistics.median(timings):7.2f} ms  p99 {p99:7.2f} ms"
+    )
+
+
+async def run(requests: int, idp_latency: float) -> None:
+    await init_db()
+    private_pem = install_signing_key()
+    install_idp(idp_latency)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+        new_user_tokens = [make_token(private_pem) for _ in range(requests)]
+        for token in new_user_tokens:
+            await auth.requires_auth(token)  # only measure the /me work
+        new_users = [await timed_get(client, token) for token in new_user_tokens]
+
+        existing = new_user_tokens[: min(20, requests)]
+        existing_users = [
+            await timed_get(client, existing[i % len(existing)])
+            for i in range(requests)
+        ]
+
+    report("new user", new_users)
+    report("existing user", existing_users)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--idp-latency-ms", type=float, default=80)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args.requests, args.idp_latency_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
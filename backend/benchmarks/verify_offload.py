@@ -0,0 +1,78 @@
+"""`/healthz` latency while a burst of distinct tokens is being verified.
+
+Compares verifying on the event loop with AUTH_VERIFY_IN_THREAD-style
+offloading to the verification thread pool.
+
+    pdm run python benchmarks/verify_offload.py --tokens 1000
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+import httpx
+from _signing import install_signing_key, make_token
+
+from backend import auth
+from backend.main import app
+
+
+async def probe_healthz(client: httpx.AsyncClient, stop: asyncio.Event) -> list[float]:
+    timings = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        (await client.get("/healthz")).raise_for_status()
+        timings.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.001)
+    return timings
+
+
+async def run(tokens: list[str], in_thread: bool) -> tuple[list[float], float]:
+    auth.verify_in_thread = in_thread
+    auth.token_cache.clear()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_healthz(client, stop))
+        await asyncio.sleep(0.05)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(auth.requires_auth(token) for token in tokens))
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        timings = await probe
+    return timings, elapsed
+
+
+def report(label: str, timings: list[float], elapsed: float, tokens: int) -> None:
+    p99 = statistics.quantiles(timings, n=100, method="inclusive")[98]
+    print(
+        f"{label:10} healthz p50 {statistics.median(timings):7.2f} ms"
+        f"  p99 {p99:7.2f} ms  max {max(timings):7.2f} ms"
+        f"  | {tokens / elapsed:7.0f} verifications/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    private_pem = install_signing_key()
+    tokens = [make_token(private_pem) for _ in range(args.tokens)]
+
+    inline = asyncio.run(run(tokens, in_thread=False))
+    threaded = asyncio.run(run(tokens, in_thread=True))
+    auth.shutdown_verify_executor()
+
+    report("inline", *inline, args.tokens)
+    report("threaded", *threaded, args.tokens)
+
+
+if __name__ == "__main__":
+    main()
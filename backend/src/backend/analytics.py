@@ -0,0 +1,281 @@
+"""Cohort completion analytics.
+
+Reports are built from columnar result sets (enrollments, the cohort's
+lessons in course order, and completed progress rows) that are aggregated
+with NumPy over a students x lessons completion matrix.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from itertools import chain
+from typing import Dict, Iterable, Sequence, Set
+
+import numpy as np
+from cachetools import TTLCache
+from sqlalchemy import Float, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from backend.database import routed_session
+from backend.models import CohortEnrollment, Course, Lesson, Progress
+from backend.schemas import (
+    CohortAnalytics,
+    CompletionStats,
+    CourseAnalytics,
+    DropOffLesson,
+)
+
+logger = logging.getLogger(__name__)
+
+# Cached reports (cohort_id -> (report, built_at)). A report is rebuilt in
+# the background once progress is written for its cohort or it is older
+# than analytics_cache_ttl, and is served meanwhile; after
+# analytics_stale_ttl it is dropped and the next read waits for a rebuild.
+# Invalidation is per process, so the TTL bounds staleness across workers.
+analytics_cache_size = int(os.getenv("ANALYTICS_CACHE_SIZE", "1024"))
+analytics_cache_ttl = int(os.getenv("ANALYTICS_CACHE_TTL", "300"))  # 5 minutes
+analytics_stale_ttl = int(os.getenv("ANALYTICS_STALE_TTL", "3600"))  # 1 hour
+report_cache = TTLCache(maxsize=analytics_cache_size, ttl=analytics_stale_ttl)
+
+# Cohorts with progress written since their cached or in-flight report
+# started building
+stale_cohorts: Set[uuid.UUID] = set()
+
+# In-flight rebuilds by cohort, shared by concurrent readers
+report_inflight: Dict[uuid.UUID, asyncio.Task] = {}
+
+
+class epoch(FunctionElement):
+    """Seconds since the epoch of a naive UTC timestamp, computed in SQL so
+    result rows carry floats rather than parsed datetimes."""
+
+    type = Float()
+    inherit_cache = True
+
+
+@compiles(epoch)
+def _compile_epoch(element, compiler, **kw):
+    return f"EXTRACT(EPOCH FROM {compiler.process(element.clauses, **kw)})"
+
+
+@compiles(epoch, "sqlite")
+def _compile_epoch_sqlite(element, compiler, **kw):
+    column = compiler.process(element.clauses, **kw)
+    return f"((julianday({column}) - 2440587.5) * 86400.0)"
+
+
+def summarize(
+    done: np.ndarray,
+    finished_at: np.ndarray,
+    enrolled_at: np.ndarray,
+    lessons: Sequence,
+) -> CompletionStats:
+    """Completion statistics for the lessons (columns) of `done`.
+
+    `done` is a students x lessons boolean matrix in lesson order,
+    `finished_at` each student's latest completion time over those lessons
+    and `enrolled_at` their enrollment time, both in epoch seconds.
+    """
+    students, lesson_count = done.shape
+    stats = CompletionStats(students=students, lessons=lesson_count, completed=0)
+    if students == 0 or lesson_count == 0:
+        return stats
+
+    completed = done.all(axis=1)
+    stats.completed = int(completed.sum())
+    stats.completion_rate = float(completed.mean())
+
+    hours = (finished_at[completed] - enrolled_at[completed]) / 3600
+    hours = np.clip(hours[~np.isnan(hours)], 0, None)
+    if hours.size:
+        median, p90 = np.percentile(hours, [50, 90])
+        stats.median_hours_to_complete = float(median)
+        stats.p90_hours_to_complete = float(p90)
+
+    # Each unfinished student's first incomplete lesson
+    stuck = np.argmin(done[~completed], axis=1)
+    if stuck.size:
+        counts = np.bincount(stuck, minlength=lesson_count)
+        position = int(counts.argmax())
+        lesson = lessons[position]
+        stats.drop_off_lesson = DropOffLesson(
+            lesson_id=lesson.id,
+            title=lesson.title,
+            order=lesson.order,
+            students=int(counts[position]),
+        )
+    return stats
+
+
+async def compute_cohort_report(
+    session: AsyncSession, cohort_id: uuid.UUID
+) -> CohortAnalytics:
+    """Build a cohort's completion report, overall and per course.
+
+    Students and lessons are numbered in SQL, so the large progress result
+    set is plain integer and float columns that load straight into arrays.
+    """
+    students = (
+        select(
+            CohortEnrollment.student_id,
+            epoch(
+                func.min(
+                    func.coalesce(
+                        CohortEnrollment.enrolled_at, CohortEnrollment.created_at
+                    )
+                )
+            ).label("enrolled_at"),
+            (func.row_number().over(order_by=CohortEnrollment.student_id) - 1).label(
+                "position"
+            ),
+        )
+        .where(CohortEnrollment.cohort_id == cohort_id)
+        .group_by(CohortEnrollment.student_id)
+        .cte("students")
+    )
+    lesson_order = (Course.created_at, Course.id, Lesson.order, Lesson.id)
+    lessons = (
+        select(
+            Lesson.id,
+            Lesson.title,
+            Lesson.order,
+            Lesson.course_id,
+            Course.name.label("course_name"),
+            (func.row_number().over(order_by=lesson_order) - 1).label("position"),
+        )
+        .join(Course, Lesson.course_id == Course.id)
+        .where(Course.cohort_id == cohort_id)
+        .cte("cohort_lessons")
+    )
+
+    # Plain Core rows: the ORM result machinery adds nothing for columns
+    connection = await session.connection()
+    result = await connection.execute(
+        select(students.c.enrolled_at).order_by(students.c.position)
+    )
+    enrolled_at = np.array(result.scalars().all(), dtype=float)
+    result = await connection.execute(select(lessons).order_by(lessons.c.position))
+    lesson_rows = result.all()
+    # Driven from the enrollments so progress is read through its
+    # (student_id, lesson_id) index
+    result = await connection.execute(
+        select(students.c.position, lessons.c.position, epoch(Progress.completed_at))
+        .select_from(students)
+        .join(Progress, Progress.student_id == students.c.student_id)
+        .join(lessons, lessons.c.id == Progress.lesson_id)
+        .where(Progress.status == "completed")
+    )
+    completions = np.fromiter(chain.from_iterable(result), float).reshape(-1, 3)
+
+    course_ids = list(dict.fromkeys(lesson.course_id for lesson in lesson_rows))
+    course_index = {course_id: i for i, course_id in enumerate(course_ids)}
+    lesson_course = np.array(
+        [course_index[lesson.course_id] for lesson in lesson_rows], dtype=np.intp
+    )
+
+    rows = completions[:, 0].astype(np.intp)
+    cols = completions[:, 1].astype(np.intp)
+    done = np.zeros((len(enrolled_at), len(lesson_rows)), dtype=bool)
+    done[rows, cols] = True
+    finished_at = np.full((len(enrolled_at), len(course_ids)), np.nan)
+    # fmax ignores NaN, so rows without a completion time don't count
+    np.fmax.at(finished_at, (rows, lesson_course[cols]), completions[:, 2])
+
+    courses = []
+    for course, course_id in enumerate(course_ids):
+        columns = np.flatnonzero(lesson_course == course)
+        stats = summarize(
+            done[:, columns],
+            finished_at[:, course],
+            enrolled_at,
+            [lesson_rows[column] for column in columns],
+        )
+        courses.append(
+            CourseAnalytics(
+                course_id=course_id,
+                name=lesson_rows[columns[0]].course_name,
+                **stats.model_dump(),
+            )
+        )
+
+    overall = summarize(
+        done,
+        np.fmax.reduce(finished_at, axis=1, initial=np.nan),
+        enrolled_at,
+        lesson_rows,
+    )
+    return CohortAnalytics(
+        cohort_id=cohort_id,
+        generated_at=datetime.utcnow(),
+        courses=courses,
+        **overall.model_dump(),
+    )
+
+
+def invalidate_cohorts(cohort_ids: Iterable[uuid.UUID]) -> None:
+    """Mark reports stale after progress is written for their cohorts.
+
+    Cached reports are rebuilt on their next read, and builds in flight are
+    run again once they finish, since they may have missed the write.
+    """
+    stale_cohorts.update(
+        cohort_id
+        for cohort_id in cohort_ids
+        if cohort_id in report_cache or cohort_id in report_inflight
+    )
+
+
+async def _rebuild_report(cohort_id: uuid.UUID) -> CohortAnalytics:
+    # Writes from here on mark the report stale again
+    stale_cohorts.discard(cohort_id)
+    async with routed_session(read_only=True) as session:
+        report = await compute_cohort_report(session, cohort_id)
+    report_cache[cohort_id] = (report, time.time())
+    return report
+
+
+def _rebuild_done(cohort_id: uuid.UUID, task: asyncio.Task) -> None:
+    if report_inflight.get(cohort_id) is task:
+        del report_inflight[cohort_id]
+    if task.cancelled():
+        return
+    if task.exception() is not None:
+        logger.error(
+            f"Error rebuilding analytics for cohort {cohort_id}",
+            exc_info=task.exception(),
+        )
+    elif cohort_id in stale_cohorts:
+        # Progress was written while the report was building
+        _rebuild(cohort_id)
+
+
+def _rebuild(cohort_id: uuid.UUID) -> asyncio.Task:
+    task = report_inflight.get(cohort_id)
+    if task is None or task.done():
+        task = asyncio.create_task(_rebuild_report(cohort_id))
+        task.add_done_callback(lambda t: _rebuild_done(cohort_id, t))
+        report_inflight[cohort_id] = task
+    return task
+
+
+async def cohort_report(cohort_id: uuid.UUID) -> CohortAnalytics:
+    """A cohort's completion report, served stale-while-revalidate.
+
+    A cached report is returned immediately, starting a background rebuild
+    if it is stale; otherwise concurrent callers share a single build. So a
+    read right after a progress write may still get the report from before
+    it, until the rebuild the write triggered has finished.
+    """
+    cached = report_cache.get(cohort_id)
+    if cached is None:
+        return await asyncio.shield(_rebuild(cohort_id))
+
+    report, built_at = cached
+    if cohort_id in stale_cohorts or time.time() - built_at > analytics_cache_ttl:
+        _rebuild(cohort_id)
+    return report
@@ -1,16 +1,30 @@
+import asyncio
+import hashlib
 import logging
+import math
 import os
 import time
-from typing import Dict, Optional, Tuple
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 import httpx
+from cachetools import TLRUCache, TTLCache
 from dotenv import load_dotenv
-from fastapi import Depends, FastAPI, HTTPException, Request
-from jose import JWTError, jwt
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from jose import JWTError, jwk, jwt
+from jose.exceptions import JWKError
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.database import get_db_session
+from backend.database import (
+    READ_YOUR_WRITES_WINDOW,
+    WROTE_AT_COOKIE,
+    async_read_session,
+    async_session,
+    routed_session,
+)
 from backend.models import User, UserRole
 
 load_dotenv()
@@ -28,13 +42,145 @@ logger.debug(f"API Audience: {API_AUDIENCE}")
 
 app = FastAPI()
 
-# Cache for JWKS response (data, timestamp)
-jwks_cache: Optional[Tuple[Dict, float]] = None
+# Shared HTTP client for Auth0 calls, opened and closed by the app lifespan
+AUTH0_BASE_URL = os.getenv("AUTH0_BASE_URL") or f"https://{AUTH0_DOMAIN}"
+idp_timeout = float(os.getenv("AUTH0_HTTP_TIMEOUT", "5"))
+idp_connect_timeout = float(os.getenv("AUTH0_HTTP_CONNECT_TIMEOUT", "2"))
+idp_max_connections = int(os.getenv("AUTH0_HTTP_MAX_CONNECTIONS", "20"))
+idp_max_keepalive_connections = int(os.getenv("AUTH0_HTTP_MAX_KEEPALIVE", "10"))
+idp_keepalive_expiry = float(os.getenv("AUTH0_HTTP_KEEPALIVE_EXPIRY", "60"))
+idp_client: Optional[httpx.AsyncClient] = None
+
+# JWKS keyring timings
 jwks_cache_ttl = 600  # 10 minutes
+jwks_refresh_ahead = 60  # start a background refresh this long before expiry
+jwks_min_refetch_interval = 30  # floor between refetches for unknown kids
 
-# Cache for user info (dict of sub -> (data, timestamp))
-user_info_cache: Dict[str, Tuple[Dict, float]] = {}
+# Cache for user info (sub -> (data, timestamp)). Entries are fresh for
+# user_info_cache_ttl and are kept until user_info_stale_ttl so they can be
+# served while Auth0 is rate limiting us or failing.
+user_info_cache_size = int(os.getenv("AUTH_USERINFO_CACHE_SIZE", "10000"))
 user_info_cache_ttl = 300  # 5 minutes
+user_info_stale_ttl = int(os.getenv("AUTH_USERINFO_STALE_TTL", "3600"))  # 1 hour
+
+# Cache for verified token claims (sha256 of raw token -> claims). Entries
+# never outlive the token's own `exp` claim. A size of 0 disables the cache.
+token_cache_size = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
+token_cache_ttl = int(os.getenv("AUTH_TOKEN_CACHE_TTL", "300"))  # 5 minutes
+
+# Optionally run signature verification in a bounded thread pool so bursts of
+# uncached tokens don't block the event loop; cryptography releases the GIL.
+verify_in_thread = os.getenv("AUTH_VERIFY_IN_THREAD", "false").lower() == "true"
+verify_max_workers = int(os.getenv("AUTH_VERIFY_THREADS", "4"))
+verify_executor: Optional[ThreadPoolExecutor] = None
+
+
+class CacheStats:
+    """Hit/miss/eviction counters for an in-process cache."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_hits = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "stale_hits": self.stale_hits,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class _EvictionCounting:
+    """Mixin for cachetools caches that counts entries evicted to make room."""
+
+    def __init__(self, *args, stats: CacheStats, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = stats
+
+    def popitem(self):
+        item = super().popitem()
+        self.stats.evictions += 1
+        return item
+
+
+class CountingTLRUCache(_EvictionCounting, TLRUCache):
+    pass
+
+
+class CountingTTLCache(_EvictionCounting, TTLCache):
+    pass
+
+
+def _token_cache_expiry(_key: str, claims: Dict, now: float) -> float:
+    """Expire cached claims after the TTL or at the token's `exp`, if sooner."""
+    expires_at = now + token_cache_ttl
+    exp = claims.get("exp")
+    if isinstance(exp, (int, float)):
+        expires_at = min(expires_at, exp)
+    return expires_at
+
+
+token_cache_stats = CacheStats()
+token_cache: Optional[TLRUCache] = (
+    CountingTLRUCache(
+        maxsize=token_cache_size,
+        ttu=_token_cache_expiry,
+        timer=time.time,
+        stats=token_cache_stats,
+    )
+    if token_cache_size > 0
+    else None
+)
+
+user_info_cache_stats = CacheStats()
+user_info_cache = CountingTTLCache(
+    maxsize=user_info_cache_size,
+    ttl=user_info_stale_ttl,
+    timer=time.time,
+    stats=user_info_cache_stats,
+)
+# In-flight userinfo fetches by sub, so concurrent misses share one request
+user_info_inflight: Dict[str, asyncio.Task] = {}
+
+# In-flight threaded verifications by token hash, shared by concurrent requests
+verify_inflight: Dict[str, asyncio.Future] = {}
+
+# Short-lived cache of resolved principals (sub -> Principal)
+principal_cache_size = int(os.getenv("AUTH_PRINCIPAL_CACHE_SIZE", "10000"))
+principal_cache_ttl = int(os.getenv("AUTH_PRINCIPAL_CACHE_TTL", "30"))
+principal_cache_stats = CacheStats()
+principal_cache = CountingTTLCache(
+    maxsize=principal_cache_size,
+    ttl=principal_cache_ttl,
+    stats=principal_cache_stats,
+)
+
+
+def auth_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of the auth cache counters."""
+    return {
+        "token_cache": {
+            **token_cache_stats.as_dict(),
+            "size": len(token_cache) if token_cache is not None else 0,
+            "maxsize": token_cache_size,
+        },
+        "user_info_cache": {
+            **user_info_cache_stats.as_dict(),
+            "size": len(user_info_cache),
+            "maxsize": user_info_cache_size,
+            "inflight": len(user_info_inflight),
+        },
+        "principal_cache": {
+            **principal_cache_stats.as_dict(),
+            "size": len(principal_cache),
+            "maxsize": principal_cache_size,
+        },
+    }
 
 
 # Exception for Auth errors
@@ -89,24 +235,36 @@ def get_token_auth_header(request: Request) -> str:
     return parts[1]
 
 
-async def get_jwks():
-    """Fetch the JWKS from the Auth0 domain and cache it."""
-    global jwks_cache
+def get_idp_client() -> httpx.AsyncClient:
+    """Return the shared keep-alive client for Auth0, creating it if needed."""
+    global idp_client
+    if idp_client is None:
+        idp_client = httpx.AsyncClient(
+            base_url=AUTH0_BASE_URL,
+            timeout=httpx.Timeout(idp_timeout, connect=idp_connect_timeout),
+            limits=httpx.Limits(
+                max_connections=idp_max_connections,
+                max_keepalive_connections=idp_max_keepalive_connections,
+                keepalive_expiry=idp_keepalive_expiry,
+            ),
+        )
+    return idp_client
+
+
+async def close_idp_client() -> None:
+    """Close the shared Auth0 client and its pooled connections."""
+    global idp_client
+    if idp_client is not None:
+        await idp_client.aclose()
+        idp_client = None
+
+
+async def fetch_jwks() -> Dict:
+    """Fetch the JWKS from the Auth0 domain."""
     try:
-        # Return cached JWKS if available and not expired
-        current_time = time.time()
-        if jwks_cache is not None:
-            cache_data, cache_time = jwks_cache
-            if current_time - cache_time < jwks_cache_ttl:
-                return cache_data
-
-        # Fetch new JWKS
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"https://{AUTH0_DOMAIN}/.well-known/jwks.json")
-            response.raise_for_status()
-            jwks_data = response.json()
-            jwks_cache = (jwks_data, current_time)
-            return jwks_data
+        response = await get_idp_client().get("/.well-known/jwks.json")
+        response.raise_for_status()
+        return response.json()
     except Exception as e:
         logger.error(f"Failed to fetch JWKS: {str(e)}")
         raise AuthError(
@@ -115,78 +273,95 @@ async def get_jwks():
         )
 
 
-async def get_user_info(token: Dict) -> Dict:
-    """Fetch user info from Auth0's userinfo endpoint with caching."""
+class JWKSKeyring:
+    """Parsed JWKS public keys indexed by `kid`.
+
+    Keys are refreshed in the background once they are within `refresh_ahead`
+    seconds of `ttl`, and the current keys keep being served while that
+    refresh runs. At most one fetch is in flight at a time. An unknown `kid`
+    (key rotation) triggers an early refetch, rate-limited to one every
+    `min_refetch_interval` seconds so bogus kids cannot stampede the IdP.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[Dict]],
+        ttl: float = jwks_cache_ttl,
+        refresh_ahead: float = jwks_refresh_ahead,
+        min_refetch_interval: float = jwks_min_refetch_interval,
+    ):
+        self._fetch = fetch
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.min_refetch_interval = min_refetch_interval
+        self.keys: Dict[str, jwk.Key] = {}
+        self.fetched_at: Optional[float] = None
+        self._last_fetch_started = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def load(self, jwks: Dict) -> None:
+        """Replace the keyring with the signing keys in a JWKS document."""
+        keys = {}
+        for key in jwks.get("keys", []):
+            kid = key.get("kid")
+            if not kid or key.get("kty") != "RSA" or key.get("use", "sig") != "sig":
+                continue
+            try:
+                keys[kid] = jwk.construct(key, ALGORITHMS[0])
+            except JWKError as e:
+                logger.warning(f"Skipping unparseable JWKS key {kid}: {e}")
+        self.keys = keys
+        self.fetched_at = time.time()
+
+    async def _refetch(self) -> None:
+        self.load(await self._fetch())
+        logger.debug(f"JWKS refreshed with {len(self.keys)} keys")
+
+    def _on_refresh_done(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"JWKS refresh failed: {task.exception()}")
+
+    def refresh(self) -> asyncio.Task:
+        """Start a refresh unless one is already running, and return it."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._last_fetch_started = time.time()
+            self._refresh_task = asyncio.create_task(self._refetch())
+            self._refresh_task.add_done_callback(self._on_refresh_done)
+        return self._refresh_task
+
+    async def get_key(self, kid: str) -> Optional[jwk.Key]:
+        """Return the public key for `kid`, fetching or refreshing as needed."""
+        if self.fetched_at is None:
+            await asyncio.shield(self.refresh())
+            return self.keys.get(kid)
+
+        now = time.time()
+        key = self.keys.get(kid)
+        if key is not None:
+            if now - self.fetched_at >= self.ttl - self.refresh_ahead:
+                self.refresh()
+            return key
+
+        refreshing = self._refresh_task is not None and not self._refresh_task.done()
+        if refreshing or now - self._last_fetch_started >= self.min_refetch_interval:
+            logger.debug(f"Unknown kid {kid}, refetching JWKS")
+            try:
+                await asyncio.shield(self.refresh())
+            except AuthError:
+                return None
+        return self.keys.get(kid)
+
+
+jwks_keyring = JWKSKeyring(fetch_jwks)
+
+
+async def _fetch_user_info(sub: str, raw_token: str) -> Dict:
+    """Fetch user info from Auth0's userinfo endpoint and cache it."""
     try:
-        sub = token.get("sub")
-        if not sub:
-            raise AuthError(
-                {
-                    "code": "invalid_token",
-                    "description": "No sub claim found in token",
-                },
-                401,
-            )
-
-        # Check cache first
-        current_time = time.time()
-        if sub in user_info_cache:
-            cached_info, timestamp = user_info_cache[sub]
-            if current_time - timestamp < user_info_cache_ttl:
-                logger.debug("Returning cached user info")
-                return cached_info
-
-        # Get the raw token from the Authorization header
-        raw_token = token.get("raw_token")
-        if not raw_token:
-            logger.error("No raw token found in token dict")
-            raise AuthError(
-                {
-                    "code": "invalid_token",
-                    "description": "No raw token found for userinfo request",
-                },
-                401,
-            )
-
-        # Fetch user info from Auth0
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://{AUTH0_DOMAIN}/userinfo",
-                headers={"Authorization": f"Bearer {raw_token}"},
-            )
-
-            if response.status_code == 200:
-                user_info = response.json()
-                logger.debug(f"User info fetched successfully: {user_info}")
-                # Cache the result
-                user_info_cache[sub] = (user_info, current_time)
-                return user_info
-            elif response.status_code == 429:  # Rate limit hit
-                # Try to use cached data even if expired
-                if sub in user_info_cache:
-                    logger.warning("Rate limit hit, using expired cache data")
-                    return user_info_cache[sub][0]
-                else:
-                    logger.error(
-                        f"Rate limit hit and no cache available: {response.text}"
-                    )
-                    raise AuthError(
-                        {
-                            "code": "rate_limit",
-                            "description": "Rate limit exceeded and no cached data available",
-                        },
-                        429,
-                    )
-            else:
-                logger.error(f"Failed to fetch user info: {response.text}")
-                raise AuthError(
-                    {
-                        "code": "userinfo_error",
-                        "description": f"Failed to fetch user info: {response.text}",
-                    },
-                    response.status_code,
-                )
-
+        response = await get_idp_client().get(
+            "/userinfo",
+            headers={"Authorization": f"Bearer {raw_token}"},
+        )
     except Exception as e:
         logger.error(f"Error fetching user info: {str(e)}")
         raise AuthError(
@@ -197,6 +372,127 @@ async def get_user_info(token: Dict) -> Dict:
             500,
         )
 
+    if response.status_code == 200:
+        user_info = response.json()
+        logger.debug(f"User info fetched successfully: {user_info}")
+        user_info_cache[sub] = (user_info, time.time())
+        return user_info
+    elif response.status_code == 429:  # Rate limit hit
+        logger.error(f"Rate limit hit fetching user info: {response.text}")
+        raise AuthError(
+            {"code": "rate_limit", "description": "Rate limit exceeded"},
+            429,
+        )
+    else:
+        logger.error(f"Failed to fetch user info: {response.text}")
+        raise AuthError(
+            {
+                "code": "userinfo_error",
+                "description": f"Failed to fetch user info: {response.text}",
+            },
+            response.status_code,
+        )
+
+
+def _user_info_fetch_done(sub: str, task: asyncio.Task) -> None:
+    if user_info_inflight.get(sub) is task:
+        del user_info_inflight[sub]
+    if not task.cancelled():
+        task.exception()  # mark retrieved even if every waiter went away
+
+
+async def get_user_info(token: Dict) -> Dict:
+    """Fetch user info from Auth0's userinfo endpoint with caching.
+
+    Concurrent misses for the same `sub` share a single upstream request. If
+    Auth0 rate limits us or fails, an expired entry is served when we have one.
+    """
+    sub = token.get("sub")
+    if not sub:
+        raise AuthError(
+            {
+                "code": "invalid_token",
+                "description": "No sub claim found in token",
+            },
+            401,
+        )
+
+    # Check cache first
+    cached = user_info_cache.get(sub)
+    if cached is not None and time.time() - cached[1] < user_info_cache_ttl:
+        user_info_cache_stats.hits += 1
+        logger.debug("Returning cached user info")
+        return cached[0]
+    user_info_cache_stats.misses += 1
+
+    # Get the raw token from the Authorization header
+    raw_token = token.get("raw_token")
+    if not raw_token:
+        logger.error("No raw token found in token dict")
+        raise AuthError(
+            {
+                "code": "invalid_token",
+                "description": "No raw token found for userinfo request",
+            },
+            401,
+        )
+
+    task = user_info_inflight.get(sub)
+    if task is None or task.done():
+        task = asyncio.create_task(_fetch_user_info(sub, raw_token))
+        task.add_done_callback(lambda t: _user_info_fetch_done(sub, t))
+        user_info_inflight[sub] = task
+
+    try:
+        return await asyncio.shield(task)
+    except AuthError as e:
+        if e.status_code != 429 and e.status_code < 500:
+            raise
+        stale = user_info_cache.get(sub)
+        if stale is None:
+            raise
+        logger.warning(f"Serving expired user info after {e.error['code']}")
+        user_info_cache_stats.stale_hits += 1
+        return stale[0]
+
+
+def shutdown_verify_executor() -> None:
+    """Stop the verification thread pool, if one was started."""
+    global verify_executor
+    if verify_executor is not None:
+        verify_executor.shutdown(wait=False, cancel_futures=True)
+        verify_executor = None
+
+
+def _decode_token(token: str, key: jwk.Key) -> Dict:
+    return jwt.decode(
+        token,
+        key,
+        algorithms=ALGORITHMS,
+        audience=API_AUDIENCE,
+        issuer=f"https://{AUTH0_DOMAIN}/",
+    )
+
+
+async def _verify_token(token: str, token_hash: str, key: jwk.Key) -> Dict:
+    """Verify signature and claims, in the thread pool when enabled."""
+    global verify_executor
+    if not verify_in_thread:
+        return _decode_token(token, key)
+
+    future = verify_inflight.get(token_hash)
+    if future is None:
+        if verify_executor is None:
+            verify_executor = ThreadPoolExecutor(
+                max_workers=verify_max_workers, thread_name_prefix="jwt-verify"
+            )
+        future = asyncio.get_running_loop().run_in_executor(
+            verify_executor, _decode_token, token, key
+        )
+        verify_inflight[token_hash] = future
+        future.add_done_callback(lambda _: verify_inflight.pop(token_hash, None))
+    return await asyncio.shield(future)
+
 
 # Validate the JWT token
 async def requires_auth(token: str = Depends(get_token_auth_header)) -> Dict:
@@ -205,6 +501,16 @@ async def requires_auth(token: str = Depends(get_token_auth_header)) -> Dict:
         token = token.strip()  # Remove any whitespace
         logger.debug("Token received for validation")
 
+        # Skip header parsing and signature verification for tokens we have
+        # already verified. The key is a hash so raw tokens are never retained.
+        token_hash = hashlib.sha256(token.encode()).hexdigest()
+        if token_cache is not None:
+            claims = token_cache.get(token_hash)
+            if claims is not None:
+                token_cache_stats.hits += 1
+                return {**claims, "raw_token": token}
+            token_cache_stats.misses += 1
+
         try:
             unverified_header = jwt.get_unverified_header(token)
             logger.debug(f"Unverified header: {unverified_header}")
@@ -230,22 +536,8 @@ async def requires_auth(token: str = Depends(get_token_auth_header)) -> Dict:
                 401,
             )
 
-        # Get JWKS
-        jwks = await get_jwks()
-        logger.debug("JWKS fetched successfully")
-
         # Find the matching key
-        rsa_key = None
-        for key in jwks.get("keys", []):
-            if key["kid"] == unverified_header["kid"]:
-                rsa_key = {
-                    "kty": key["kty"],
-                    "kid": key["kid"],
-                    "use": key["use"],
-                    "n": key["n"],
-                    "e": key["e"],
-                }
-                break
+        rsa_key = await jwks_keyring.get_key(unverified_header["kid"])
 
         if not rsa_key:
             logger.error("No matching key found in JWKS")
@@ -260,17 +552,12 @@ async def requires_auth(token: str = Depends(get_token_auth_header)) -> Dict:
         try:
             logger.debug("Attempting to decode token")
             # Verify the token
-            payload = jwt.decode(
-                token,
-                rsa_key,
-                algorithms=ALGORITHMS,
-                audience=API_AUDIENCE,
-                issuer=f"https://{AUTH0_DOMAIN}/",
-            )
+            payload = await _verify_token(token, token_hash, rsa_key)
             logger.debug("Token decoded successfully")
+            if token_cache is not None:
+                token_cache[token_hash] = payload
             # Store the raw token for userinfo requests
-            payload["raw_token"] = token
-            return payload
+            return {**payload, "raw_token": token}
 
         except jwt.ExpiredSignatureError as e:
             logger.error(f"Token expired: {e}")
@@ -304,18 +591,86 @@ async def requires_auth(token: str = Depends(get_token_auth_header)) -> Dict:
         )
 
 
-async def user_has_access_rights(
-    token: dict,
-    allowed_roles: list[UserRole],
-    session: AsyncSession = Depends(get_db_session),
-) -> bool:
-    """Check if the user has the required access permissions."""
+def _cookie_time(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+async def get_routed_db_session(
+    request: Request, response: Response, token: Dict = Depends(requires_auth)
+) -> AsyncSession:
+    """Session for the request: the read replica for GET/HEAD requests, unless
+    this user wrote within the read-your-writes window; the primary otherwise.
+
+    A commit sets the short-lived WROTE_AT_COOKIE, so reads stay on the
+    primary whichever worker serves them. Clients that don't send cookies
+    back, e.g. server-side proxies, only get read-your-writes from the
+    worker that took the write. The cookie isn't set by handlers that
+    return a Response object of their own.
+    """
+    read_only = request.method in ("GET", "HEAD")
+    wrote_at = _cookie_time(request.cookies.get(WROTE_AT_COOKIE))
+    async with routed_session(read_only, token.get("sub"), wrote_at) as session:
+        if async_read_session is not None:
+            session.info["on_commit"] = lambda at: response.set_cookie(
+                WROTE_AT_COOKIE,
+                f"{at:.3f}",
+                max_age=math.ceil(READ_YOUR_WRITES_WINDOW),
+                httponly=True,
+                samesite="lax",
+            )
+        yield session
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user, as resolved once per request."""
+
+    id: uuid.UUID
+    sub: str
+    email: str
+    role: UserRole
+
+
+async def get_current_principal(token: Dict = Depends(requires_auth)) -> Principal:
+    """Resolve the token's `sub` to a Principal, via a short-TTL cache.
+
+    The lookup uses its own short-lived primary session rather than a
+    request-scoped one, so its connection is back in the pool before the
+    handler runs; with a single SQLite writer connection, holding it would
+    deadlock the handler's own writes.
+    """
     sub = token.get("sub")
 
-    result = await session.execute(select(User).where(User.sub == sub))
-    user = result.scalar_one_or_none()
+    principal = principal_cache.get(sub)
+    if principal is not None:
+        principal_cache_stats.hits += 1
+        return principal
+    principal_cache_stats.misses += 1
+
+    async with async_session() as session:
+        result = await session.execute(
+            select(User.id, User.sub, User.email, User.role).where(User.sub == sub)
+        )
+        row = result.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    principal = Principal(id=row.id, sub=row.sub, email=row.email, role=row.role)
+    principal_cache[sub] = principal
+    return principal
 
-    if not user or user.role not in allowed_roles:
+
+def invalidate_principal(sub: str) -> None:
+    """Drop a cached principal, e.g. after the user's role changes."""
+    principal_cache.pop(sub, None)
+
+
+def user_has_access_rights(principal: Principal, allowed_roles: list[UserRole]) -> bool:
+    """Check if the user has the required access permissions."""
+    if principal.role not in allowed_roles:
         raise HTTPException(status_code=403, detail="Insufficient permissions.")
 
     return True
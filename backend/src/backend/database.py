@@ -1,25 +1,273 @@
-import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional
 
+from cachetools import TTLCache
 from dotenv import load_dotenv
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from pydantic_settings import BaseSettings
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 load_dotenv()
 
-SQLALCHEMY_DATABASE_URL = os.getenv(
-    "DATABASE_URL", "sqlite+aiosqlite:///./sales_training.db"
+
+class DatabaseSettings(BaseSettings):
+    """Engine and connection-pool settings, read from the environment."""
+
+    database_url: str = "sqlite+aiosqlite:///./sales_training.db"
+    database_read_url: Optional[str] = None  # optional read replica
+    # Seconds a writer's reads stay on primary; pinned by a cookie across
+    # workers, and in process for clients that drop it
+    db_read_your_writes_window: float = 5
+    db_echo: bool = False
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800  # seconds, -1 to disable
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100  # asyncpg prepared statements per connection
+    db_statement_timeout_ms: Optional[int] = None  # Postgres only
+    # SQLite files: funnel writes through one connection, read from the pool
+    db_sqlite_single_writer: bool = True
+    db_sqlite_busy_timeout_ms: int = 5000
+    db_sqlite_mmap_size: int = 256 * 1024 * 1024
+
+
+class PoolWaitStats:
+    """Time spent waiting for a pooled connection."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "mean_wait_ms": (
+                self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0
+            ),
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long checkouts wait."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_stats.checkouts += 1
+            self.wait_stats.total_wait += waited
+            self.wait_stats.max_wait = max(self.wait_stats.max_wait, waited)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+
+def is_sqlite_file(url: Any) -> bool:
+    url = make_url(url)
+    in_memory = url.database in (None, "", ":memory:")
+    return url.get_backend_name() == "sqlite" and not in_memory
+
+
+def _configure_sqlite(
+    engine: AsyncEngine, settings: DatabaseSettings, writer: bool
+) -> None:
+    """Apply WAL and tuned pragmas to every new SQLite connection. Writer
+    transactions start with BEGIN IMMEDIATE so they take the write lock up
+    front rather than failing on a lock upgrade mid-transaction."""
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, _connection_record):
+        if writer:
+            # Stop the driver from issuing its own BEGIN; see _on_begin
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={settings.db_sqlite_busy_timeout_ms}")
+        cursor.execute(f"PRAGMA mmap_size={settings.db_sqlite_mmap_size}")
+        cursor.close()
+
+    if writer:
+
+        @event.listens_for(engine.sync_engine, "begin")
+        def _on_begin(connection):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def create_engine(
+    settings: DatabaseSettings, url: Optional[str] = None, sqlite_writer: bool = False
+) -> AsyncEngine:
+    """Build an AsyncEngine with the pool and driver tuning from `settings`.
+
+    `sqlite_writer` gives a SQLite file engine a single pooled connection
+    that takes the write lock up front, so concurrent writers queue in the
+    pool instead of failing with "database is locked".
+    """
+    url = make_url(url or settings.database_url)
+    sqlite_file = is_sqlite_file(url)
+    kwargs: Dict[str, Any] = {
+        "echo": settings.db_echo,
+        # Local SQLite connections can't drop, so skip the per-checkout ping
+        "pool_pre_ping": settings.db_pool_pre_ping and not sqlite_file,
+    }
+    connect_args: Dict[str, Any] = {}
+
+    # In-memory SQLite keeps its single static connection
+    if sqlite_file or url.get_backend_name() != "sqlite":
+        kwargs.update(
+            poolclass=TimedAsyncQueuePool,
+            pool_size=1 if sqlite_writer else settings.db_pool_size,
+            max_overflow=0 if sqlite_writer else settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+
+    if url.get_driver_name() == "asyncpg":
+        connect_args["statement_cache_size"] = settings.db_statement_cache_size
+        if settings.db_statement_timeout_ms is not None:
+            connect_args["server_settings"] = {
+                "statement_timeout": str(settings.db_statement_timeout_ms)
+            }
+
+    engine = create_async_engine(url, connect_args=connect_args, **kwargs)
+    if sqlite_file:
+        _configure_sqlite(engine, settings, writer=sqlite_writer)
+    return engine
+
+
+def pool_stats(engine: AsyncEngine) -> Dict[str, Any]:
+    """Live connection-pool statistics for an engine."""
+    pool = engine.pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+        )
+    if isinstance(pool, TimedAsyncQueuePool):
+        stats.update(pool.wait_stats.as_dict())
+    return stats
+
+
+settings = DatabaseSettings()
+
+SQLALCHEMY_DATABASE_URL = settings.database_url
+
+# Single-writer SQLite mode: the primary engine is the lone writer
+# connection and reads go to a pool of reader connections on the same file,
+# which WAL lets run alongside the writer.
+sqlite_single_writer = (
+    settings.db_sqlite_single_writer
+    and is_sqlite_file(settings.database_url)
+    and not settings.database_read_url
 )
 
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=True)
+engine = create_engine(settings, sqlite_writer=sqlite_single_writer)
 
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+read_engine: Optional[AsyncEngine] = None
+if settings.database_read_url:
+    read_engine = create_engine(settings, settings.database_read_url)
+elif sqlite_single_writer:
+    read_engine = create_engine(settings)
+
+async_read_session = (
+    sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+    if read_engine is not None
+    else None
+)
+
+# Writers (e.g. user subs) that committed recently; their reads stay on the
+# primary until the replica has had time to catch up. This only covers the
+# worker process that took the write; WROTE_AT_COOKIE covers the others.
+READ_YOUR_WRITES_WINDOW = settings.db_read_your_writes_window
+recent_writers = TTLCache(maxsize=100_000, ttl=READ_YOUR_WRITES_WINDOW)
+
+# Cookie holding the client's last commit time, sent back to whichever
+# worker serves its next read
+WROTE_AT_COOKIE = "db_wrote_at"
+
+
+def wrote_recently(wrote_at: Optional[float]) -> bool:
+    return wrote_at is not None and time.time() - wrote_at < READ_YOUR_WRITES_WINDOW
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_writer(session: Session) -> None:
+    now = time.time()
+    writer_key = session.info.get("writer_key")
+    if writer_key is not None:
+        recent_writers[writer_key] = now
+    on_commit = session.info.get("on_commit")
+    if on_commit is not None:
+        on_commit(now)
+
+
+# Dialect-specific INSERT constructs, which support ON CONFLICT
+INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def dialect_insert(session: AsyncSession) -> Callable:
+    """The `insert()` of the session's dialect, for upserts."""
+    return INSERTS[session.get_bind().dialect.name]
+
 
 async def get_db_session() -> AsyncSession:
     async with async_session() as session:
         yield session
 
 
+@asynccontextmanager
+async def routed_session(
+    read_only: bool,
+    writer_key: Optional[str] = None,
+    wrote_at: Optional[float] = None,
+) -> AsyncIterator[AsyncSession]:
+    """Open a replica session for reads, or a primary session otherwise.
+
+    Commits made through a primary session mark `writer_key` as a recent
+    writer in this process, and its reads are sent to the primary for the
+    read-your-writes window; so are reads by a client whose last write,
+    `wrote_at`, falls within the window. A commit calls
+    `session.info["on_commit"]`, if set, with its time.
+    """
+    use_replica = (
+        read_only
+        and async_read_session is not None
+        and writer_key not in recent_writers
+        and not wrote_recently(wrote_at)
+    )
+    factory = async_read_session if use_replica else async_session
+    async with factory() as session:
+        session.info["writer_key"] = writer_key
+        yield session
+
+
 async def init_db():
     from .models import Base
 
@@ -0,0 +1,176 @@
+"""Resized image variants of media blobs.
+
+Each image blob gets a few downscaled, recompressed variants, rendered in
+a process pool so decoding and resampling never block the event loop or
+hold the GIL of the serving process. Variants are cached on disk next to
+the blob store, keyed by the source digest and their size,
+
+    MEDIA_ROOT/variants/ab/cd/abcd...-960.webp
+
+so they never go stale: a new image has a new digest, and resizing a
+variant gives it a new key. Rendering starts when an image is uploaded,
+or on the first request for a missing variant.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from cachetools import TTLCache
+
+from backend.media import DIGEST_PATTERN, blob_path, media_root
+
+logger = logging.getLogger(__name__)
+
+# Variant name -> longest side in pixels; images are never upscaled
+VARIANTS = {"thumbnail": 320, "mobile": 960, "desktop": 1920}
+VARIANT_MEDIA_TYPE = "image/webp"
+variant_quality = int(os.getenv("MEDIA_VARIANT_QUALITY", "80"))
+# Worker processes rendering variants
+derivative_max_workers = int(
+    os.getenv("MEDIA_DERIVATIVE_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+# Seconds a request for a missing variant waits for it before the original
+# is served instead
+variant_wait = float(os.getenv("MEDIA_VARIANT_WAIT", "2"))
+
+# Source formats Pillow decodes
+DERIVABLE_TYPES = frozenset(
+    {
+        "image/jpeg",
+        "image/png",
+        "image/webp",
+        "image/gif",
+        "image/bmp",
+        "image/tiff",
+    }
+)
+
+derivative_executor: Optional[ProcessPoolExecutor] = None
+# In-flight renders by source digest
+derivative_inflight: Dict[str, asyncio.Task] = {}
+# Sources that failed to render recently aren't retried on every request
+derivative_failures = TTLCache(maxsize=10_000, ttl=3600)
+
+
+def variant_path(digest: str, size: int) -> Path:
+    if not DIGEST_PATTERN.match(digest):
+        raise ValueError(f"Invalid digest: {digest!r}")
+    return media_root / "variants" / digest[:2] / digest[2:4] / f"{digest}-{size}.webp"
+
+
+def is_derivable(content_type: str) -> bool:
+    return content_type.lower() in DERIVABLE_TYPES
+
+
+def variant_urls(digest: str, content_type: str) -> Dict[str, str]:
+    """URLs of a blob's variants by name; none if it can't be rendered."""
+    if not is_derivable(content_type):
+        return {}
+    return {name: f"/api/v1/media/{digest}/variants/{name}" for name in VARIANTS}
+
+
+def render_variants(source: str, targets: List[Tuple[int, str]], quality: int) -> None:
+    """Render `targets`, (longest side, path) pairs, from an image file.
+
+    Runs in a worker process. The image is decoded once, at the smallest
+    scale JPEG allows for the largest target, and each variant is resized
+    from the next larger one. Files are renamed into place when complete.
+    """
+    from PIL import Image, ImageOps
+
+    largest = max(size for size, _ in targets)
+    with Image.open(source) as image:
+        image.draft("RGB", (largest, largest))
+        current = ImageOps.exif_transpose(image)
+        if current.mode not in ("RGB", "RGBA"):
+            alpha = "A" in current.getbands() or "transparency" in current.info
+            current = current.convert("RGBA" if alpha else "RGB")
+        for size, path in sorted(targets, reverse=True):
+            variant = current.copy()
+            variant.thumbnail((size, size), Image.Resampling.LANCZOS)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            variant.save(tmp_path, "WEBP", quality=quality, method=4)
+            os.replace(tmp_path, path)
+            current = variant
+
+
+def get_derivative_executor() -> ProcessPoolExecutor:
+    global derivative_executor
+    if derivative_executor is None:
+        # Spawned rather than forked: the server process runs threads and an
+        # event loop that a forked child would inherit mid-flight
+        derivative_executor = ProcessPoolExecutor(
+            max_workers=derivative_max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return derivative_executor
+
+
+def shutdown_derivative_executor() -> None:
+    """Stop the rendering processes, if any were started."""
+    global derivative_executor
+    if derivative_executor is not None:
+        derivative_executor.shutdown(wait=False, cancel_futures=True)
+        derivative_executor = None
+
+
+def missing_variants(digest: str) -> List[Tuple[int, str]]:
+    return [
+        (size, str(variant_path(digest, size)))
+        for size in VARIANTS.values()
+        if not variant_path(digest, size).exists()
+    ]
+
+
+async def _derive(digest: str) -> None:
+    targets = missing_variants(digest)
+    if not targets:
+        return
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(
+            get_derivative_executor(),
+            render_variants,
+            str(blob_path(digest)),
+            targets,
+            variant_quality,
+        )
+    except BrokenProcessPool:
+        # A worker died (e.g. out of memory on a huge image); start a fresh
+        # pool for the next render
+        shutdown_derivative_executor()
+        derivative_failures[digest] = True
+        raise
+    except Exception:
+        derivative_failures[digest] = True
+        raise
+
+
+def _derive_done(digest: str, task: asyncio.Task) -> None:
+    if derivative_inflight.get(digest) is task:
+        del derivative_inflight[digest]
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Error rendering variants of {digest}", exc_info=task.exception())
+
+
+def schedule_derivatives(digest: str, content_type: str) -> Optional[asyncio.Task]:
+    """Render an image's missing variants in the background, once at a time.
+
+    Returns the render task, or None for media without variants and images
+    that failed to render recently.
+    """
+    if not is_derivable(content_type) or digest in derivative_failures:
+        return None
+    task = derivative_inflight.get(digest)
+    if task is None or task.done():
+        task = asyncio.create_task(_derive(digest))
+        task.add_done_callback(lambda t: _derive_done(digest, t))
+        derivative_inflight[digest] = task
+    return task
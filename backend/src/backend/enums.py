@@ -24,3 +24,8 @@ class ProgressStatus(str, Enum):
     not_started = "not_started"
     in_progress = "in_progress"
     completed = "completed"
+
+
+class RollupGranularity(str, Enum):
+    day = "day"
+    week = "week"
@@ -0,0 +1,36 @@
+"""Entity tags for conditional GETs.
+
+Reads that support `If-None-Match` derive a strong ETag from a cheap
+validator query, such as a row's id and `last_modified`, and answer 304
+before fetching and serializing the full response.
+"""
+
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# Clients may store responses but must revalidate them before each use
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """A strong ETag over `parts`, e.g. an id and its last_modified."""
+    key = "\x1f".join(str(part) for part in parts).encode()
+    return f'"{hashlib.blake2b(key, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag` (weak comparison)."""
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag.removeprefix("W/") for tag in tags)
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Tag the response with `etag`, returning a 304 to send instead if the
+    client's copy is current."""
+    headers = {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -1,25 +1,26 @@
 import asyncio
 import uuid
 from datetime import datetime
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from .models import Base, User
+
 from .database import SQLALCHEMY_DATABASE_URL
+from .models import Base, User
+
 
 async def init_db():
     # Create async engine
     engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=True)
-    
+
     # Create all tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
-    
+
     # Create async session
-    async_session = sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
-    )
-    
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
     # Create test users
     test_users = [
         User(
@@ -27,24 +28,24 @@ async def init_db():
             auth0_id="auth0|admin",
             email="admin@example.com",
             role="admin",
-            created_at=datetime.utcnow()
+            created_at=datetime.utcnow(),
         ),
         User(
             id=uuid.uuid4(),
             auth0_id="auth0|teacher",
             email="teacher@example.com",
             role="teacher",
-            created_at=datetime.utcnow()
+            created_at=datetime.utcnow(),
         ),
         User(
             id=uuid.uuid4(),
             auth0_id="auth0|student",
             email="student@example.com",
             role="student",
-            created_at=datetime.utcnow()
-        )
+            created_at=datetime.utcnow(),
+        ),
     ]
-    
+
     async with async_session() as session:
         for user in test_users:
             session.add(user)
@@ -52,5 +53,6 @@ async def init_db():
 
     await engine.dispose()
 
+
 if __name__ == "__main__":
     asyncio.run(init_db())
@@ -1,17 +1,55 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager, suppress
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from backend.auth import (
+    Principal,
+    auth_cache_stats,
+    close_idp_client,
+    get_current_principal,
+    get_idp_client,
+    shutdown_verify_executor,
+    user_has_access_rights,
+)
 from backend.auth import app as auth_app
-from backend.database import init_db
-from backend.routes import courses, users
+from backend.database import engine, init_db, pool_stats, read_engine
+from backend.derivatives import shutdown_derivative_executor
+from backend.media import run_upload_sweeper
+from backend.models import UserRole
+from backend.rollups import run_rollup_job
+from backend.routes import analytics, cohorts, courses, media, progress, users
+from backend.stats import run_reconciliation
 
 # Configure logging
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Sales Training API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_db()
+    get_idp_client()
+    background = [
+        asyncio.create_task(run_reconciliation()),
+        asyncio.create_task(run_rollup_job()),
+        asyncio.create_task(run_upload_sweeper()),
+    ]
+    try:
+        yield
+    finally:
+        for task in background:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        await close_idp_client()
+        shutdown_verify_executor()
+        shutdown_derivative_executor()
+
+
+app = FastAPI(title="Sales Training API", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -29,6 +67,10 @@ app.mount("/auth", auth_app)
 # Include API routes
 app.include_router(courses.router, prefix="/api/v1/courses")
 app.include_router(users.router, prefix="/api/v1/users")
+app.include_router(cohorts.router, prefix="/api/v1/cohorts")
+app.include_router(media.router, prefix="/api/v1/media")
+app.include_router(progress.router, prefix="/api/v1/progress")
+app.include_router(analytics.router, prefix="/api/v1/analytics")
 
 
 @app.get("/")
@@ -37,6 +79,11 @@ async def healthz():
     return {"status": "ok"}
 
 
-@app.on_event("startup")
-async def startup_event():
-    await init_db()
+@app.get("/metrics")
+async def metrics(principal: Principal = Depends(get_current_principal)):
+    """Auth cache counters and live pool statistics; admins only."""
+    _ = user_has_access_rights(principal, [UserRole.admin])
+    stats = {"auth": auth_cache_stats(), "db_pool": pool_stats(engine)}
+    if read_engine is not None:
+        stats["db_read_pool"] = pool_stats(read_engine)
+    return stats
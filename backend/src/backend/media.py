@@ -0,0 +1,249 @@
+"""Content-addressed media store.
+
+Uploaded files are written once under their SHA-256 digest,
+
+    MEDIA_ROOT/blobs/ab/cd/abcd...
+
+so identical uploads share a file and a blob never changes once written.
+Uploads are streamed to a temporary file while they are hashed and then
+renamed into place, so a partial upload is never visible under a digest.
+
+Large files can instead be uploaded resumably, in fixed-size chunks sent
+in any order. Each chunk is verified against its checksum and renamed into
+place under its upload,
+
+    MEDIA_ROOT/uploads/<upload id>/<chunk index>
+
+before it is recorded as committed, so an interrupted upload resumes with
+the chunks it is missing. Once all are committed they are assembled into
+a blob, and the upload directory is removed.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import uuid
+from contextlib import suppress
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterable, BinaryIO, Tuple
+
+from sqlalchemy import delete, select
+
+from backend.database import async_session
+from backend.models import MediaUpload, MediaUploadChunk
+
+logger = logging.getLogger(__name__)
+
+# Root directory of the blob store; tmp/ under it must be on the same
+# filesystem as blobs/ so finished uploads can be renamed into place
+media_root = Path(os.getenv("MEDIA_ROOT", "media"))
+media_max_upload_bytes = int(os.getenv("MEDIA_MAX_UPLOAD_BYTES", str(2 * 2**30)))
+# Resumable uploads may be larger than single-request ones
+media_max_resumable_bytes = int(os.getenv("MEDIA_MAX_RESUMABLE_BYTES", str(20 * 2**30)))
+# Chunk size for resumable uploads that don't ask for one
+media_chunk_size = int(os.getenv("MEDIA_CHUNK_SIZE", str(8 * 2**20)))
+# Seconds without a new chunk before a resumable upload is discarded
+media_upload_ttl = float(os.getenv("MEDIA_UPLOAD_TTL", str(24 * 3600)))
+UPLOAD_SWEEP_INTERVAL = 3600
+# Uploads are written in chunks of at least this size, off the event loop
+MEDIA_WRITE_CHUNK = 2**20
+
+# Media types accepted for upload, by prefix
+MEDIA_TYPES = ("image/", "video/")
+
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class ChunkMismatch(Exception):
+    """A chunk's size or checksum is not the one declared for it."""
+
+
+def blob_path(digest: str) -> Path:
+    if not DIGEST_PATTERN.match(digest):
+        raise ValueError(f"Invalid digest: {digest!r}")
+    return media_root / "blobs" / digest[:2] / digest[2:4] / digest
+
+
+def _place(tmp_path: str, digest: str) -> None:
+    """Move a finished temporary file into the store under its digest."""
+    path = blob_path(digest)
+    if path.exists():
+        # Already stored: same digest, same bytes
+        os.unlink(tmp_path)
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, path)
+
+
+def _absorb(file: BinaryIO, digest, chunk: bytearray) -> None:
+    digest.update(chunk)
+    file.write(chunk)
+
+
+async def _spool(
+    file: BinaryIO, digest, chunks: AsyncIterable[bytes], max_bytes: int
+) -> int:
+    """Hash and write a byte stream to `file` in MEDIA_WRITE_CHUNK pieces, in
+    a worker thread. Returns its size; raises UploadTooLarge past `max_bytes`.
+    """
+    size = 0
+    pending = bytearray()
+    async for chunk in chunks:
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLarge(f"Body is limited to {max_bytes} bytes")
+        pending += chunk
+        if len(pending) >= MEDIA_WRITE_CHUNK:
+            full, pending = pending, bytearray()
+            await asyncio.to_thread(_absorb, file, digest, full)
+    if pending:
+        await asyncio.to_thread(_absorb, file, digest, pending)
+    return size
+
+
+async def store_stream(
+    chunks: AsyncIterable[bytes], max_bytes: int = media_max_upload_bytes
+) -> Tuple[str, int]:
+    """Store an uploaded byte stream, returning its digest and size.
+
+    Hashing and writing run in a worker thread, a chunk at a time, so the
+    event loop never blocks on disk and memory stays bounded by the chunk
+    size. Raises UploadTooLarge past `max_bytes`.
+    """
+    tmp_dir = media_root / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, "wb") as file:
+            size = await _spool(file, digest, chunks, max_bytes)
+        _place(tmp_path, digest.hexdigest())
+        return digest.hexdigest(), size
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+
+
+def upload_dir(upload_id: uuid.UUID) -> Path:
+    return media_root / "uploads" / str(upload_id)
+
+
+def chunk_count(size: int, chunk_size: int) -> int:
+    return -(-size // chunk_size)
+
+
+def chunk_length(size: int, chunk_size: int, index: int) -> int:
+    """Length of chunk `index` of an upload; only the last may be short."""
+    return min(chunk_size, size - index * chunk_size)
+
+
+def start_upload(upload_id: uuid.UUID) -> None:
+    upload_dir(upload_id).mkdir(parents=True, exist_ok=True)
+
+
+def _sync(file: BinaryIO) -> None:
+    file.flush()
+    os.fsync(file.fileno())
+
+
+async def store_chunk(
+    upload_id: uuid.UUID,
+    index: int,
+    chunks: AsyncIterable[bytes],
+    length: int,
+    sha256: str,
+) -> None:
+    """Store one chunk of a resumable upload.
+
+    The chunk is streamed to a temporary file and renamed into place only
+    once it is on disk and its length and SHA-256 match, so a chunk file is
+    always complete. Raises ChunkMismatch (or UploadTooLarge, past `length`)
+    otherwise, and FileNotFoundError if the upload has been discarded.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=upload_dir(upload_id), suffix=".part")
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, "wb") as file:
+            size = await _spool(file, digest, chunks, length)
+            await asyncio.to_thread(_sync, file)
+        if size != length:
+            raise ChunkMismatch(f"Chunk {index} must be {length} bytes, got {size}")
+        if digest.hexdigest() != sha256:
+            raise ChunkMismatch(f"Chunk {index} does not match its checksum")
+        os.replace(tmp_path, upload_dir(upload_id) / str(index))
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+
+
+def _assemble(upload_id: uuid.UUID, count: int) -> Tuple[str, int]:
+    tmp_dir = media_root / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as file:
+            for index in range(count):
+                with open(upload_dir(upload_id) / str(index), "rb") as chunk:
+                    while block := chunk.read(MEDIA_WRITE_CHUNK):
+                        digest.update(block)
+                        file.write(block)
+                        size += len(block)
+        _place(tmp_path, digest.hexdigest())
+        return digest.hexdigest(), size
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+
+
+async def assemble_upload(upload_id: uuid.UUID, count: int) -> Tuple[str, int]:
+    """Concatenate an upload's `count` chunks into a blob, returning its
+    digest and size. Runs in a worker thread, a piece at a time."""
+    return await asyncio.to_thread(_assemble, upload_id, count)
+
+
+async def discard_upload(upload_id: uuid.UUID) -> None:
+    await asyncio.to_thread(shutil.rmtree, upload_dir(upload_id), True)
+
+
+async def sweep_uploads(ttl: float = media_upload_ttl) -> int:
+    """Discard resumable uploads without a new chunk for `ttl` seconds.
+    Returns how many were discarded."""
+    cutoff = datetime.utcnow() - timedelta(seconds=ttl)
+    async with async_session() as session, session.begin():
+        stale = select(MediaUpload.id).where(MediaUpload.last_modified < cutoff)
+        await session.execute(
+            delete(MediaUploadChunk).where(MediaUploadChunk.upload_id.in_(stale))
+        )
+        result = await session.execute(
+            delete(MediaUpload)
+            .where(MediaUpload.last_modified < cutoff)
+            .returning(MediaUpload.id)
+        )
+        upload_ids = result.scalars().all()
+    for upload_id in upload_ids:
+        await discard_upload(upload_id)
+    return len(upload_ids)
+
+
+async def run_upload_sweeper(interval: float = UPLOAD_SWEEP_INTERVAL) -> None:
+    """Sweep stale resumable uploads now and then every `interval` seconds."""
+    while True:
+        try:
+            await sweep_uploads()
+        except Exception as e:
+            logger.error(f"Error sweeping media uploads: {str(e)}", exc_info=True)
+        await asyncio.sleep(interval)
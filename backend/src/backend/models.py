@@ -3,7 +3,19 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import JSON, Column, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    Date,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import declarative_base, relationship
 
@@ -24,6 +36,7 @@ class TimestampMixin:
 
 class User(Base, TimestampMixin):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     sub = Column(String, unique=True, nullable=False)
@@ -37,6 +50,11 @@ class User(Base, TimestampMixin):
 
 class Cohort(Base, TimestampMixin):
     __tablename__ = "cohorts"
+    __table_args__ = (
+        # Cohort listings, all and per teacher, in creation order
+        Index("ix_cohorts_created_at_id", "created_at", "id"),
+        Index("ix_cohorts_teacher_id_created_at", "teacher_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
@@ -51,6 +69,17 @@ class Cohort(Base, TimestampMixin):
 
 class CohortEnrollment(Base, TimestampMixin):
     __tablename__ = "cohort_enrollments"
+    __table_args__ = (
+        # One enrollment per student and cohort; also serves roster pages
+        Index(
+            "uq_cohort_enrollments_cohort_student",
+            "cohort_id",
+            "student_id",
+            unique=True,
+        ),
+        # Activity rollup bucket scans
+        Index("ix_cohort_enrollments_created_at", "created_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     cohort_id = Column(UUID(as_uuid=True), ForeignKey("cohorts.id"), nullable=False)
@@ -65,6 +94,10 @@ class CohortEnrollment(Base, TimestampMixin):
 
 class Course(Base, TimestampMixin):
     __tablename__ = "courses"
+    __table_args__ = (
+        # Owner's courses in creation order
+        Index("ix_courses_created_by_created_at", "created_by", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     cohort_id = Column(UUID(as_uuid=True), ForeignKey("cohorts.id"), nullable=False)
@@ -80,34 +113,98 @@ class Course(Base, TimestampMixin):
 
 class Lesson(Base, TimestampMixin):
     __tablename__ = "lessons"
+    __table_args__ = (Index("ix_lessons_course_id_order", "course_id", "order"),)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     course_id = Column(UUID(as_uuid=True), ForeignKey("courses.id"), nullable=False)
     title = Column(String, nullable=False)
+    description = Column(String)
+    content = Column(Text)
     order = Column(Integer, nullable=False)
     structure = Column(JSON)
 
     # Relationships
     course = relationship("Course", back_populates="lessons")
-    content_blocks = relationship("ContentBlock", back_populates="lesson")
+    content_blocks = relationship(
+        "ContentBlock", back_populates="lesson", order_by="ContentBlock.order"
+    )
     progress_records = relationship("Progress", back_populates="lesson")
 
 
 class ContentBlock(Base, TimestampMixin):
     __tablename__ = "content_blocks"
+    __table_args__ = (
+        Index("ix_content_blocks_lesson_id_order", "lesson_id", "order"),
+        Index("ix_content_blocks_blob_digest", "blob_digest"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     lesson_id = Column(UUID(as_uuid=True), ForeignKey("lessons.id"), nullable=False)
     order = Column(Integer, nullable=False)
     type = Column(Enum("video", "text", "image", "interactive", name="content_types"))
     content = Column(JSON)
+    # Media for video and image blocks, see backend.media
+    blob_digest = Column(String(64), ForeignKey("media_blobs.digest"))
 
     # Relationships
     lesson = relationship("Lesson", back_populates="content_blocks")
+    blob = relationship("MediaBlob")
+
+
+class MediaBlob(Base, TimestampMixin):
+    """An uploaded media file, stored once under its SHA-256 digest."""
+
+    __tablename__ = "media_blobs"
+
+    digest = Column(String(64), primary_key=True)
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String, nullable=False)
+
+
+class MediaUpload(Base, TimestampMixin):
+    """A resumable upload in progress; `last_modified` is its last chunk."""
+
+    __tablename__ = "media_uploads"
+    __table_args__ = (Index("ix_media_uploads_last_modified", "last_modified"),)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    content_type = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    # Content block to point at the blob once the upload completes
+    content_block_id = Column(UUID(as_uuid=True), ForeignKey("content_blocks.id"))
+
+
+class MediaUploadChunk(Base):
+    """A chunk of a resumable upload, committed once it is verified on disk."""
+
+    __tablename__ = "media_upload_chunks"
+
+    upload_id = Column(
+        UUID(as_uuid=True), ForeignKey("media_uploads.id"), primary_key=True
+    )
+    index = Column(Integer, primary_key=True)
+    sha256 = Column(String(64), nullable=False)
 
 
 class Progress(Base, TimestampMixin):
     __tablename__ = "progress"
+    __table_args__ = (
+        # One row per student and lesson, the conflict target for progress
+        # upserts; also covers status lookups without a heap fetch
+        Index(
+            "uq_progress_student_lesson",
+            "student_id",
+            "lesson_id",
+            unique=True,
+            postgresql_include=["status", "completed_at"],
+        ),
+        # Activity rollup bucket scans and the rollup job's change scan
+        Index("ix_progress_created_at", "created_at"),
+        Index("ix_progress_completed_at", "completed_at"),
+        Index("ix_progress_last_modified", "last_modified"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     student_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -119,3 +216,32 @@ class Progress(Base, TimestampMixin):
 
     # Relationships
     lesson = relationship("Lesson", back_populates="progress_records")
+
+
+class StatsCounter(Base):
+    """Incrementally maintained row count, see backend.stats."""
+
+    __tablename__ = "stats_counters"
+
+    name = Column(String, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+
+
+class ActivityRollup(Base):
+    """Pre-aggregated activity per time bucket, see backend.rollups."""
+
+    __tablename__ = "activity_rollups"
+
+    granularity = Column(String, primary_key=True)  # "day" or "week"
+    bucket_start = Column(Date, primary_key=True)
+    metric = Column(String, primary_key=True)
+    value = Column(BigInteger, nullable=False)
+
+
+class RollupState(Base):
+    """High-water mark of the incremental activity rollup job."""
+
+    __tablename__ = "rollup_state"
+
+    name = Column(String, primary_key=True)
+    processed_through = Column(DateTime, nullable=False)
@@ -0,0 +1,218 @@
+"""Sparse ordering keys for lessons and content blocks.
+
+Siblings are numbered ORDER_GAP apart, so moving an item writes only its
+own key: the midpoint between its new neighbours. Once a gap gets narrow
+the siblings are renumbered ("rebalanced") in the background; a move that
+finds no room at all rebalances inline first.
+
+Moves and rebalances of the same siblings are serialized by locking their
+parent row (the course or lesson) for the transaction.
+"""
+
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database import async_session
+from backend.models import ContentBlock, Course, Lesson
+
+logger = logging.getLogger(__name__)
+
+ORDER_GAP = 1024
+# A move leaving a gap narrower than this schedules a background rebalance
+REBALANCE_BELOW = 16
+
+
+@dataclass(frozen=True)
+class Siblings:
+    """An ordered model and the parent its items are ordered within."""
+
+    model: type
+    parent_model: type
+    parent_key: str
+
+
+LESSONS = Siblings(Lesson, Course, "course_id")
+CONTENT_BLOCKS = Siblings(ContentBlock, Lesson, "lesson_id")
+
+
+@dataclass(frozen=True)
+class Move:
+    order: int
+    rebalanced: bool = False
+    narrow: bool = False
+
+
+# In-flight background rebalances by (table, parent id)
+rebalance_inflight: Dict[Tuple[str, uuid.UUID], asyncio.Task] = {}
+
+
+def spaced(position: int) -> int:
+    """Key of the item at `position` (0-based) in a freshly spaced list."""
+    return (position + 1) * ORDER_GAP
+
+
+def key_between(before: Optional[int], after: Optional[int]) -> Optional[int]:
+    """A key strictly between two neighbours (None for the list's ends), or
+    None if they are adjacent integers."""
+    if before is None:
+        return ORDER_GAP if after is None else after - ORDER_GAP
+    if after is None:
+        return before + ORDER_GAP
+    if after - before < 2:
+        return None
+    return before + (after - before) // 2
+
+
+async def lock_parent(
+    session: AsyncSession, siblings: Siblings, parent_id: uuid.UUID
+) -> bool:
+    """Lock the parent row for the transaction; False if it doesn't exist."""
+    parent = siblings.parent_model
+    result = await session.execute(
+        select(parent.id).where(parent.id == parent_id).with_for_update()
+    )
+    return result.scalar_one_or_none() is not None
+
+
+async def append_key(
+    session: AsyncSession, siblings: Siblings, parent_id: uuid.UUID
+) -> int:
+    """Key placing a new item after the parent's last item.
+
+    The caller holds the parent lock, so concurrent appends can't pick the
+    same key.
+    """
+    model = siblings.model
+    parent_column = getattr(model, siblings.parent_key)
+    result = await session.execute(
+        select(func.max(model.order)).where(parent_column == parent_id)
+    )
+    return key_between(result.scalar(), None)
+
+
+async def rebalance(
+    session: AsyncSession, siblings: Siblings, parent_id: uuid.UUID
+) -> int:
+    """Respace a parent's items ORDER_GAP apart, keeping their order.
+
+    The caller holds the parent lock. Returns the number of items.
+    """
+    model = siblings.model
+    parent_column = getattr(model, siblings.parent_key)
+    result = await session.execute(
+        select(model.id)
+        .where(parent_column == parent_id)
+        .order_by(model.order, model.id)
+    )
+    ids = result.scalars().all()
+    if ids:
+        # Bulk UPDATE by primary key, one executemany
+        await session.execute(
+            update(model),
+            [{"id": id, "order": spaced(position)} for position, id in enumerate(ids)],
+        )
+    return len(ids)
+
+
+async def _neighbours(
+    session: AsyncSession,
+    siblings: Siblings,
+    parent_id: uuid.UUID,
+    item_id: uuid.UUID,
+    after_id: Optional[uuid.UUID],
+) -> Optional[Tuple[Optional[int], Optional[int]]]:
+    model = siblings.model
+    parent_column = getattr(model, siblings.parent_key)
+    before = None
+    if after_id is not None:
+        result = await session.execute(
+            select(model.order).where(model.id == after_id, parent_column == parent_id)
+        )
+        before = result.scalar_one_or_none()
+        if before is None:
+            return None
+    stmt = select(func.min(model.order)).where(
+        parent_column == parent_id, model.id != item_id
+    )
+    if before is not None:
+        stmt = stmt.where(model.order > before)
+    after = (await session.execute(stmt)).scalar()
+    return before, after
+
+
+async def move_item(
+    session: AsyncSession,
+    siblings: Siblings,
+    parent_id: uuid.UUID,
+    item_id: uuid.UUID,
+    after_id: Optional[uuid.UUID],
+) -> Optional[Move]:
+    """Place an item right after `after_id` among its siblings, or first if
+    `after_id` is None.
+
+    Only the item's key is written unless its new neighbours are adjacent,
+    in which case the siblings are rebalanced first. The caller holds the
+    parent lock and commits, then calls `schedule_rebalance` if the move
+    is `narrow`. Returns None if the item or `after_id` is not a sibling.
+    """
+    model = siblings.model
+    parent_column = getattr(model, siblings.parent_key)
+    result = await session.execute(
+        select(model.order).where(model.id == item_id, parent_column == parent_id)
+    )
+    current = result.scalar_one_or_none()
+    if current is None:
+        return None
+    if after_id == item_id:
+        return Move(order=current)
+
+    rebalanced = False
+    while True:
+        neighbours = await _neighbours(session, siblings, parent_id, item_id, after_id)
+        if neighbours is None:
+            return None
+        before, after = neighbours
+        if (before is None or current > before) and (after is None or current < after):
+            return Move(order=current)
+        key = key_between(before, after)
+        if key is not None:
+            break
+        # Keys are distinct after a rebalance, so the retry finds a gap
+        await rebalance(session, siblings, parent_id)
+        rebalanced = True
+
+    await session.execute(update(model).where(model.id == item_id).values(order=key))
+    gaps = [key - before if before is not None else ORDER_GAP]
+    gaps.append(after - key if after is not None else ORDER_GAP)
+    return Move(order=key, rebalanced=rebalanced, narrow=min(gaps) < REBALANCE_BELOW)
+
+
+async def _rebalance_later(siblings: Siblings, parent_id: uuid.UUID) -> None:
+    async with async_session() as session, session.begin():
+        if await lock_parent(session, siblings, parent_id):
+            await rebalance(session, siblings, parent_id)
+
+
+def _rebalance_done(key: Tuple[str, uuid.UUID], task: asyncio.Task) -> None:
+    if rebalance_inflight.get(key) is task:
+        del rebalance_inflight[key]
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(
+            f"Error rebalancing {key[0]} of {key[1]}", exc_info=task.exception()
+        )
+
+
+def schedule_rebalance(siblings: Siblings, parent_id: uuid.UUID) -> None:
+    """Rebalance a parent's items in the background, once at a time."""
+    key = (siblings.model.__tablename__, parent_id)
+    task = rebalance_inflight.get(key)
+    if task is None or task.done():
+        task = asyncio.create_task(_rebalance_later(siblings, parent_id))
+        task.add_done_callback(lambda t: _rebalance_done(key, t))
+        rebalance_inflight[key] = task
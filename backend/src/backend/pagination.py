@@ -0,0 +1,96 @@
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Response header carrying the cursor for the next page, absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """Query parameters for keyset-paginated list endpoints."""
+
+    def __init__(
+        self,
+        limit: int = Query(
+            DEFAULT_PAGE_SIZE,
+            ge=1,
+            le=MAX_PAGE_SIZE,
+            description="Maximum number of items to return",
+        ),
+        cursor: Optional[str] = Query(
+            None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} header"
+        ),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _load(value: Any, column: InstrumentedAttribute) -> Any:
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps([_dump(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[InstrumentedAttribute]) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match sort key")
+        return [_load(value, column) for value, column in zip(values, columns)]
+    except (ValueError, TypeError, AttributeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(
+    stmt: Select, columns: Sequence[InstrumentedAttribute], page: PageParams
+) -> Select:
+    """Order `stmt` by the unique sort key `columns`, start after the cursor,
+    and fetch one extra row to detect whether another page follows."""
+    if page.cursor:
+        after = decode_cursor(page.cursor, columns)
+        stmt = stmt.where(tuple_(*columns) > tuple_(*after))
+    return stmt.order_by(*columns).limit(page.limit + 1)
+
+
+def finish_page(
+    items: Sequence[Any],
+    columns: Sequence[InstrumentedAttribute],
+    page: PageParams,
+    response: Response,
+) -> Sequence[Any]:
+    """Trim the look-ahead row and set the next-page cursor header."""
+    if len(items) <= page.limit:
+        return items
+    items = items[: page.limit]
+    last = items[-1]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+        [getattr(last, column.key) for column in columns]
+    )
+    return items
@@ -0,0 +1,274 @@
+"""Time-bucketed activity rollups.
+
+Daily and weekly buckets of active students, lesson completions and new
+enrollments are kept in `activity_rollups`, so analytics range queries read
+bucket rows instead of scanning `progress` and `cohort_enrollments`.
+
+An incremental job recomputes the buckets touched since its high-water
+mark, including older buckets that received a late `completed_at`; a
+backfill recomputes any date range:
+
+    pdm run rollups backfill --start 2024-01-01
+    pdm run rollups update
+"""
+
+import asyncio
+import logging
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import click
+from sqlalchemy import Date, delete, func, insert, select, union
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database import async_session, dialect_insert, engine
+from backend.enums import RollupGranularity
+from backend.models import ActivityRollup, CohortEnrollment, Progress, RollupState
+
+logger = logging.getLogger(__name__)
+
+# Seconds between incremental rollup passes
+rollup_interval = float(os.getenv("ROLLUP_INTERVAL", "300"))
+# Rows committed up to this long after their timestamp are still picked up
+rollup_lag = timedelta(seconds=int(os.getenv("ROLLUP_LAG", "300")))
+
+METRICS = ("active_students", "completions", "new_enrollments")
+STATE_NAME = "activity"
+BACKFILL_CHUNK_DAYS = 31
+
+Bucket = Tuple[RollupGranularity, date]
+
+
+def bucket_start(day: date, granularity: RollupGranularity) -> date:
+    """First day of the bucket containing `day`; weeks start on Monday."""
+    if granularity == RollupGranularity.week:
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def bucket_bounds(bucket: Bucket) -> Tuple[datetime, datetime]:
+    granularity, start = bucket
+    days = 7 if granularity == RollupGranularity.week else 1
+    lower = datetime.combine(start, datetime.min.time())
+    return lower, lower + timedelta(days=days)
+
+
+def buckets_for(days: Iterable[date]) -> Set[Bucket]:
+    """Every day and week bucket containing one of `days`."""
+    return {
+        (granularity, bucket_start(day, granularity))
+        for day in days
+        for granularity in RollupGranularity
+    }
+
+
+def _date_range(first: date, last: date) -> List[date]:
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+def metric_queries(lower: datetime, upper: datetime) -> Dict[str, object]:
+    """Index range queries computing each metric for [lower, upper)."""
+    active = union(
+        select(Progress.student_id).where(
+            Progress.created_at >= lower, Progress.created_at < upper
+        ),
+        select(Progress.student_id).where(
+            Progress.completed_at >= lower, Progress.completed_at < upper
+        ),
+    ).subquery()
+    return {
+        "active_students": select(func.count()).select_from(active),
+        "completions": select(func.count())
+        .select_from(Progress)
+        .where(Progress.completed_at >= lower, Progress.completed_at < upper),
+        "new_enrollments": select(func.count())
+        .select_from(CohortEnrollment)
+        .where(
+            CohortEnrollment.created_at >= lower, CohortEnrollment.created_at < upper
+        ),
+    }
+
+
+async def recompute_buckets(session: AsyncSession, buckets: Iterable[Bucket]) -> int:
+    """Replace the rollup rows of `buckets` with fresh counts."""
+    rows = []
+    for bucket in sorted(set(buckets)):
+        granularity, start = bucket
+        for metric, query in metric_queries(*bucket_bounds(bucket)).items():
+            value = (await session.execute(query)).scalar_one()
+            rows.append(
+                {
+                    "granularity": granularity.value,
+                    "bucket_start": start,
+                    "metric": metric,
+                    "value": value,
+                }
+            )
+        await session.execute(
+            delete(ActivityRollup).where(
+                ActivityRollup.granularity == granularity.value,
+                ActivityRollup.bucket_start == start,
+            )
+        )
+    if rows:
+        await session.execute(insert(ActivityRollup), rows)
+    return len(rows) // len(METRICS)
+
+
+async def backfill(first: date, last: date) -> int:
+    """Recompute every bucket overlapping [first, last], a month per
+    transaction. Returns the number of buckets written."""
+    written = 0
+    days = _date_range(first, last)
+    for start in range(0, len(days), BACKFILL_CHUNK_DAYS):
+        chunk = days[start : start + BACKFILL_CHUNK_DAYS]
+        async with async_session() as session, session.begin():
+            written += await recompute_buckets(session, buckets_for(chunk))
+    return written
+
+
+async def _earliest_activity(session: AsyncSession) -> Optional[datetime]:
+    firsts = [
+        (await session.execute(select(func.min(column)))).scalar()
+        for column in (Progress.created_at, CohortEnrollment.created_at)
+    ]
+    firsts = [first for first in firsts if first is not None]
+    return min(firsts) if firsts else None
+
+
+async def _start_state(session: AsyncSession, now: datetime) -> None:
+    """Create the state row if missing, with the high-water mark at the
+    earliest activity so the first passes catch up on the whole history.
+
+    Concurrent first passes, e.g. one per worker, all try the insert; the
+    first wins and the rest do nothing.
+    """
+    result = await session.execute(
+        select(RollupState.name).where(RollupState.name == STATE_NAME)
+    )
+    if result.scalar_one_or_none() is not None:
+        return
+    earliest = await _earliest_activity(session)
+    insert = dialect_insert(session)
+    await session.execute(
+        insert(RollupState)
+        .values(name=STATE_NAME, processed_through=earliest or now)
+        .on_conflict_do_nothing(index_elements=[RollupState.name])
+    )
+
+
+async def run_incremental() -> int:
+    """Recompute the buckets touched since the last pass.
+
+    That is every bucket from the high-water mark (less `rollup_lag`) to
+    now, plus older buckets that progress written since then completed
+    into. A pass that is behind, like the first one, catches up
+    BACKFILL_CHUNK_DAYS at a time, committing the mark after each chunk.
+    The state row is locked for each chunk, so concurrent passes take
+    turns instead of repeating each other's work. Returns the number of
+    buckets written.
+    """
+    now = datetime.utcnow()
+    async with async_session() as session, session.begin():
+        await _start_state(session, now)
+
+    written = 0
+    through = None
+    while through is None or through < now:
+        async with async_session() as session, session.begin():
+            result = await session.execute(
+                select(RollupState)
+                .where(RollupState.name == STATE_NAME)
+                .with_for_update()
+            )
+            state = result.scalar_one()
+            if state.processed_through >= now:
+                break
+            since = state.processed_through - rollup_lag
+            through = min(
+                now, state.processed_through + timedelta(days=BACKFILL_CHUNK_DAYS)
+            )
+            days = set(_date_range(since.date(), through.date()))
+            late = await session.execute(
+                select(func.date(Progress.completed_at, type_=Date))
+                .where(Progress.last_modified >= since, Progress.completed_at < since)
+                .distinct()
+            )
+            days.update(late.scalars())
+            written += await recompute_buckets(session, buckets_for(days))
+            state.processed_through = through
+    return written
+
+
+async def read_rollups(
+    session: AsyncSession,
+    granularity: RollupGranularity,
+    first: date,
+    last: date,
+) -> List[Dict]:
+    """Bucket rows overlapping [first, last], one dict per bucket."""
+    result = await session.execute(
+        select(ActivityRollup.bucket_start, ActivityRollup.metric, ActivityRollup.value)
+        .where(
+            ActivityRollup.granularity == granularity.value,
+            ActivityRollup.bucket_start >= bucket_start(first, granularity),
+            ActivityRollup.bucket_start <= last,
+        )
+        .order_by(ActivityRollup.bucket_start)
+    )
+    buckets: Dict[date, Dict] = {}
+    for start, metric, value in result:
+        bucket = buckets.setdefault(
+            start, {"bucket_start": start, **dict.fromkeys(METRICS, 0)}
+        )
+        bucket[metric] = value
+    return list(buckets.values())
+
+
+async def run_rollup_job(interval: float = rollup_interval) -> None:
+    """Run an incremental rollup pass now and then every `interval` seconds."""
+    while True:
+        try:
+            await run_incremental()
+        except Exception as e:
+            logger.error(f"Error updating activity rollups: {str(e)}", exc_info=True)
+        await asyncio.sleep(interval)
+
+
+async def _run_and_dispose(coro):
+    try:
+        return await coro
+    finally:
+        await engine.dispose()
+
+
+@click.group()
+def cli():
+    """Maintain the activity rollup table."""
+
+
+@cli.command("backfill")
+@click.option("--start", type=click.DateTime(["%Y-%m-%d"]), required=True)
+@click.option(
+    "--end",
+    type=click.DateTime(["%Y-%m-%d"]),
+    default=None,
+    help="Last day to recompute (default: today)",
+)
+def backfill_command(start: datetime, end: Optional[datetime]):
+    """Recompute every bucket between START and END."""
+    last = end.date() if end else datetime.utcnow().date()
+    written = asyncio.run(_run_and_dispose(backfill(start.date(), last)))
+    click.echo(f"Recomputed {written} buckets")
+
+
+@cli.command("update")
+def update_command():
+    """Run one incremental pass."""
+    written = asyncio.run(_run_and_dispose(run_incremental()))
+    click.echo(f"Recomputed {written} buckets")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,95 @@
+import logging
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.analytics import cohort_report
+from backend.auth import (
+    Principal,
+    get_current_principal,
+    get_routed_db_session,
+    user_has_access_rights,
+)
+from backend.enums import RollupGranularity
+from backend.models import Cohort, UserRole
+from backend.rollups import read_rollups
+from backend.schemas import ActivityReport, CohortAnalytics
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+DEFAULT_ACTIVITY_DAYS = 30
+MAX_ACTIVITY_DAYS = 731
+
+
+@router.get("/cohorts/{cohort_id}", response_model=CohortAnalytics)
+async def get_cohort_analytics(
+    cohort_id: uuid.UUID,
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
+):
+    """Completion analytics for a cohort and each of its courses.
+
+    Reports are cached per worker and served stale-while-revalidate: after
+    a progress write, or once a report is ANALYTICS_CACHE_TTL seconds old,
+    the cached report is still returned while a rebuild runs in the
+    background. A read right after a write can therefore lag it by one
+    rebuild, and by up to ANALYTICS_CACHE_TTL on other workers; no report
+    is older than ANALYTICS_STALE_TTL. `generated_at` says when the report
+    was built.
+    """
+    _ = user_has_access_rights(principal, [UserRole.admin, UserRole.teacher])
+    try:
+        result = await session.execute(
+            select(Cohort.teacher_id).where(Cohort.id == cohort_id)
+        )
+        teacher_id = result.scalar_one_or_none()
+        if teacher_id is None:
+            raise HTTPException(status_code=404, detail="Cohort not found")
+        if principal.role != UserRole.admin and teacher_id != principal.id:
+            raise HTTPException(status_code=403, detail="Insufficient permissions.")
+
+        return await cohort_report(cohort_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_cohort_analytics: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/activity", response_model=ActivityReport)
+async def get_activity(
+    granularity: RollupGranularity = RollupGranularity.day,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
+):
+    """Active students, completions and new enrollments per day or week.
+
+    Served from the activity rollup table; the current buckets trail live
+    data by up to ROLLUP_INTERVAL seconds.
+    """
+    _ = user_has_access_rights(principal, [UserRole.admin])
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=DEFAULT_ACTIVITY_DAYS - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days >= MAX_ACTIVITY_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Date range is limited to {MAX_ACTIVITY_DAYS} days",
+        )
+    try:
+        buckets = await read_rollups(session, granularity, start, end)
+        return ActivityReport(
+            granularity=granularity, start=start, end=end, buckets=buckets
+        )
+    except Exception as e:
+        logger.error(f"Error in get_activity: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,346 @@
+import logging
+import uuid
+from datetime import datetime
+from typing import Iterable, List
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.analytics import invalidate_cohorts
+from backend.auth import (
+    Principal,
+    get_current_principal,
+    get_routed_db_session,
+    user_has_access_rights,
+)
+from backend.database import dialect_insert
+from backend.models import Cohort, CohortEnrollment, Course, User, UserRole
+from backend.pagination import PageParams, finish_page, paginate
+from backend.schemas import (
+    BulkEnroll,
+    BulkEnrollResult,
+    CohortCreate,
+    CohortRead,
+    CohortUpdate,
+    RosterEntry,
+)
+from backend.stats import bump_counters
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Unique sort keys for keyset pagination; student_id is unique per cohort
+COHORT_SORT = (Cohort.created_at, Cohort.id)
+ROSTER_SORT = (CohortEnrollment.student_id,)
+
+COHORT_ROLES = [UserRole.admin, UserRole.teacher]
+
+
+async def get_cohort(
+    session: AsyncSession, cohort_id: uuid.UUID, principal: Principal
+) -> Cohort:
+    """The cohort, if the principal is an admin or the cohort's teacher."""
+    result = await session.execute(select(Cohort).where(Cohort.id == cohort_id))
+    cohort = result.scalar_one_or_none()
+    if cohort is None:
+        raise HTTPException(status_code=404, detail="Cohort not found")
+    if principal.role != UserRole.admin and cohort.teacher_id != principal.id:
+        raise HTTPException(status_code=403, detail="Insufficient permissions.")
+    return cohort
+
+
+async def check_teacher(
+    session: AsyncSession, teacher_id: uuid.UUID, principal: Principal
+) -> None:
+    """Only admins may assign a cohort to someone else, and only to a teacher
+    or admin."""
+    if teacher_id == principal.id:
+        return
+    if principal.role != UserRole.admin:
+        raise HTTPException(status_code=403, detail="Insufficient permissions.")
+    result = await session.execute(select(User.role).where(User.id == teacher_id))
+    if result.scalar_one_or_none() not in COHORT_ROLES:
+        raise HTTPException(status_code=400, detail="Teacher not found")
+
+
+async def enroll_emails(
+    session: AsyncSession, cohort_id: uuid.UUID, emails: Iterable[str]
+) -> BulkEnrollResult:
+    """Enroll the users with `emails` in a cohort.
+
+    Emails are resolved in one query and enrollments inserted with
+    multi-row statements that skip students already enrolled. The caller
+    commits.
+    """
+    wanted = list(dict.fromkeys(emails))
+    result = await session.execute(
+        select(User.email, User.id).where(User.email.in_(wanted))
+    )
+    students = dict(result.all())
+
+    student_ids = list(students.values())
+    enrolled = 0
+    if student_ids:
+        insert = dialect_insert(session)
+        stmt = (
+            insert(CohortEnrollment)
+            .on_conflict_do_nothing(
+                index_elements=[CohortEnrollment.cohort_id, CohortEnrollment.student_id]
+            )
+            .returning(CohortEnrollment.id)
+        )
+        now = datetime.utcnow()
+        rows = [
+            {
+                "cohort_id": cohort_id,
+                "student_id": student_id,
+                "status": "active",
+                "enrolled_at": now,
+            }
+            for student_id in student_ids
+        ]
+        # Executed as "insertmanyvalues": the statement is compiled once and
+        # sent as multi-row INSERTs sized to the driver's parameter limit
+        connection = await session.connection()
+        result = await connection.execute(stmt, rows)
+        enrolled = len(result.all())
+    # Core inserts bypass the counters' flush hook
+    await bump_counters(session, active_enrollments=enrolled)
+
+    return BulkEnrollResult(
+        requested=len(wanted),
+        enrolled=enrolled,
+        already_enrolled=len(student_ids) - enrolled,
+        unknown_emails=[email for email in wanted if email not in students],
+    )
+
+
+@router.get("", response_model=List[CohortRead])
+async def get_cohorts(
+    response: Response,
+    page: PageParams = Depends(),
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
+):
+    """Get a page of cohorts, oldest first; teachers see their own."""
+    _ = user_has_access_rights(principal, COHORT_ROLES)
+    try:
+        stmt = select(Cohort)
+        if principal.role != UserRole.admin:
+            stmt = stmt.where(Cohort.teacher_id == principal.id)
+        result = await session.execute(paginate(stmt, COHORT_SORT, page))
+        cohorts = result.scalars().all()
+        return finish_page(cohorts, COHORT_SORT, page, response)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_cohorts: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("", response_model=CohortRead)
+async def create_cohort(
+    cohort: CohortCreate,
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
+):
+    """Create a new cohort."""
+    _ = user_has_access_rights(principal, COHORT_ROLES)
+    try:
+        teacher_id = cohort.teacher_id or principal.id
+        await check_teacher(session, teacher_id, principal)
+
+        db_cohort = Cohort(
+            **cohort.model_dump(exclude={"teacher_id"}), teacher_id=teacher_id
+        )
+        session.add(db_cohort)
+        await session.commit()
+        await session.refresh(db_cohort)
+        return db_cohort
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in create_cohort: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{cohort_id}", response_model=CohortRead)
+async def get_cohort_by_id(
+    cohort_id: uuid.UUID,
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
+):
+    """Get a specific cohort."""
+    _ = user_has_access_rights(principal, COHORT_ROLES)
+    try:
+        return await get_cohort(session, cohort_id, principal)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_cohort_by_id: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/{cohort_id}", response_model=CohortRead)
+async def update_cohort(
+    cohort_id: uuid.UUID,
+    cohort_update: CohortUpdate,
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
+):
+    """Update a cohort."""
+    _ = user_has_access_rights(principal, COHORT_ROLES)
+    try:
+        cohort = await get_cohort(session, cohort_id, principal)
+
+        update_data = cohort_update.model_dump(exclude_unset=True)
+        if update_data.get("teacher_id") is not None:
+            await check_teacher(session, update_data["teacher_id"], principal)
+        else:
+            update_data.pop("teacher_id", None)
+        for field, value in update_data.items():
+            setattr(cohort, field, value)
+
+        await session.commit()
+        await session.refresh(cohort)
+        return cohort
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in update_cohort: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/{cohort_id}")
+async def delete_cohort(
+    cohort_id: uuid.UUID,
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
+):
+    """Delete a cohort and its enrollments. Cohorts with courses are kept."""
+    _ = user_has_access_rights(principal, COHORT_ROLES)
+    try:
+        cohort = await get_cohort(session, cohort_id, principal)
+
+        result = await session.execute(
+            select(Course.id).where(Course.cohort_id == cohort_id).limit(1)
+        )
+        if result.first() is not None:
+            raise HTTPException(status_code=409, detail="Cohort still has courses")
+
+        result = await session.execute(
+            select(func.count())
+            .select_from(CohortEnrollment)
+            .where(
+                CohortEnrollment.cohort_id == cohort_id,
+                CohortEnrollment.status == "active",
+            )
+        )
+        active = result.scalar_one()
+        await session.execute(
+            delete(CohortEnrollment).where(CohortEnrollment.cohort_id == cohort_id)
+        )
+        await bump_counters(session, active_enrollments=-active)
+        await session.delete(cohort)
+        await session.commit()
+        return {"message": "Cohort deleted"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in delete_cohort: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{cohort_id}/enrollments", response_model=List[RosterEntry])
+async def get_roster(
+    cohort_id: uuid.UUID,
+    response: Response,
+    page: PageParams = Depends(),
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
+):
+    """Get a page of a cohort's enrolled students, each joined to their user."""
+    _ = user_has_access_rights(principal, COHORT_ROLES)
+    try:
+        await get_cohort(session, cohort_id, principal)
+
+        stmt = (
+            select(
+                CohortEnrollment.id,
+                CohortEnrollment.student_id,
+                CohortEnrollment.status,
+                CohortEnrollment.enrolled_at,
+                User.email,
+                User.role,
+            )
+            .join(User, User.id == CohortEnrollment.student_id)
+            .where(CohortEnrollment.cohort_id == cohort_id)
+        )
+        result = await session.execute(paginate(stmt, ROSTER_SORT, page))
+        return finish_page(result.all(), ROSTER_SORT, page, response)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_roster: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{cohort_id}/enrollments", response_model=BulkEnrollResult)
+async def bulk_enroll(
+    cohort_id: uuid.UUID,
+    enrollment: BulkEnroll,
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
+):
+    """Enroll users by email, skipping those already enrolled.
+
+    Unknown emails are reported back rather than failing the request.
+    """
+    _ = user_has_access_rights(principal, COHORT_ROLES)
+    try:
+        await get_cohort(session, cohort_id, principal)
+        result = await enroll_emails(session, cohort_id, enrollment.emails)
+        await session.commit()
+        if result.enrolled:
+            invalidate_cohorts([cohort_id])
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in bulk_enroll: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/{cohort_id}/enrollments/{student_id}")
+async def unenroll(
+    cohort_id: uuid.UUID,
+    student_id: uuid.UUID,
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
+):
+    """Remove a student from a cohort."""
+    _ = user_has_access_rights(principal, COHORT_ROLES)
+    try:
+        await get_cohort(session, cohort_id, principal)
+
+        result = await session.execute(
+            select(CohortEnrollment).where(
+                CohortEnrollment.cohort_id == cohort_id,
+                CohortEnrollment.student_id == student_id,
+            )
+        )
+        enrollment = result.scalar_one_or_none()
+        if enrollment is None:
+            raise HTTPException(status_code=404, detail="Enrollment not found")
+
+        await session.delete(enrollment)
+        await session.commit()
+        invalidate_cohorts([cohort_id])
+        return {"message": "Student unenrolled"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in unenroll: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,45 +1,168 @@
-from typing import List
+import uuid
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload, selectinload
 
-from backend.auth import requires_auth, user_has_access_rights
-from backend.database import get_db_session
-from backend.models import Course, Lesson, User, UserRole
+from backend.auth import (
+    Principal,
+    get_current_principal,
+    get_routed_db_session,
+    user_has_access_rights,
+)
+from backend.derivatives import variant_urls
+from backend.enums import ContentType
+from backend.etags import make_etag, not_modified
+from backend.models import ContentBlock, Course, Lesson, MediaBlob, UserRole
+from backend.ordering import (
+    CONTENT_BLOCKS,
+    LESSONS,
+    append_key,
+    lock_parent,
+    move_item,
+    schedule_rebalance,
+    spaced,
+)
+from backend.pagination import PageParams, finish_page, paginate
+from backend.routes.cohorts import get_cohort
 from backend.schemas import (
     CourseCreate,
+    CourseImport,
+    CourseImportResult,
     CourseRead,
     CourseUpdate,
     LessonCreate,
+    LessonDetail,
     LessonRead,
     LessonUpdate,
+    MoveRequest,
+    MoveResult,
 )
+from backend.stats import bump_counters
 
 router = APIRouter()
 
+# Unique sort keys for keyset pagination
+COURSE_SORT = (Course.created_at, Course.id)
+LESSON_SORT = (Lesson.order, Lesson.id)
+
+INCLUDE_DESCRIPTION = "Comma-separated relations to embed; supports 'lessons'"
+
+
+def includes_lessons(include: Optional[str]) -> bool:
+    return bool(include) and "lessons" in include.split(",")
+
+
+def course_load_options(include: Optional[str]) -> list:
+    """Loader options for course reads.
+
+    Lessons are fetched for every course on the page in one batched
+    SELECT ... IN query when `include=lessons` is passed. Otherwise they
+    are never loaded, and `CourseRead.lessons` is null rather than empty.
+    """
+    if includes_lessons(include):
+        return [selectinload(Course.lessons)]
+    return [raiseload(Course.lessons)]
+
+
+def child_validators(model: type, parent_column, parent_id: uuid.UUID) -> list:
+    """ETag validators for a parent's children: their latest `last_modified`
+    and their count, which between them change on any insert, update or
+    delete among the children."""
+    return [
+        select(func.max(model.last_modified))
+        .where(parent_column == parent_id)
+        .scalar_subquery(),
+        select(func.count())
+        .select_from(model)
+        .where(parent_column == parent_id)
+        .scalar_subquery(),
+    ]
+
+
+async def import_course(
+    session: AsyncSession, document: CourseImport, created_by: uuid.UUID
+) -> CourseImportResult:
+    """Insert a course document: the course row, then all of its lessons and
+    all of their content blocks, each as one batched statement.
+
+    Ids are generated here so no row has to be read back. Lessons and
+    blocks get sparse ordering keys in document order. The caller commits.
+    """
+    course_id = uuid.uuid4()
+    lesson_rows, block_rows = [], []
+    for position, lesson in enumerate(document.lessons):
+        lesson_id = uuid.uuid4()
+        lesson_rows.append(
+            {
+                "id": lesson_id,
+                "course_id": course_id,
+                "title": lesson.title,
+                "order": spaced(position),
+                "structure": lesson.structure,
+            }
+        )
+        block_rows.extend(
+            {
+                "lesson_id": lesson_id,
+                "order": spaced(position),
+                "type": block.type.value,
+                "content": block.content,
+                "blob_digest": block.blob_digest,
+            }
+            for position, block in enumerate(lesson.content_blocks)
+        )
+
+    connection = await session.connection()
+    await connection.execute(
+        insert(Course).values(
+            id=course_id,
+            cohort_id=document.cohort_id,
+            name=document.name,
+            description=document.description,
+            structure=document.structure,
+            created_by=created_by,
+        )
+    )
+    if lesson_rows:
+        await connection.execute(insert(Lesson), lesson_rows)
+    if block_rows:
+        await connection.execute(insert(ContentBlock), block_rows)
+    # Core inserts bypass the counters' flush hook
+    await bump_counters(session, courses=1)
+
+    return CourseImportResult(
+        id=course_id,
+        cohort_id=document.cohort_id,
+        name=document.name,
+        lesson_ids=[row["id"] for row in lesson_rows],
+        content_blocks=len(block_rows),
+    )
+
 
 @router.get("", response_model=List[CourseRead])
 async def get_courses(
-    token: dict = Depends(requires_auth),
-    db_session: AsyncSession = Depends(get_db_session),
+    response: Response,
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    page: PageParams = Depends(),
+    principal: Principal = Depends(get_current_principal),
+    db_session: AsyncSession = Depends(get_routed_db_session),
 ):
-    """Get all courses for the current user."""
+    """Get a page of the current user's courses, oldest first."""
     try:
-        # Get user from token
-        sub = token.get("sub")
-        result = await db_session.execute(select(User).where(User.sub == sub))
-        user = result.scalar_one_or_none()
-
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
         # Get courses
-        result = await db_session.execute(
-            select(Course).where(Course.created_by == user.id)
+        stmt = (
+            select(Course)
+            .where(Course.created_by == principal.id)
+            .options(*course_load_options(include))
         )
+        result = await db_session.execute(paginate(stmt, COURSE_SORT, page))
         courses = result.scalars().all()
-        return courses
+        return finish_page(courses, COURSE_SORT, page, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -47,49 +170,99 @@ async def get_courses(
 @router.post("", response_model=CourseRead)
 async def create_course(
     course: CourseCreate,
-    token: dict = Depends(requires_auth),
-    session: AsyncSession = Depends(get_db_session),
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
 ):
     """Create a new course."""
-    _ = await user_has_access_rights(token, [UserRole.admin], session)
+    _ = user_has_access_rights(principal, [UserRole.admin])
     try:
-        # Get user from token
-        sub = token.get("sub")
-        result = await session.execute(select(User).where(User.sub == sub))
-        user = result.scalar_one_or_none()
-
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
         # Create course
-        db_course = Course(**course.model_dump(), created_by=user.id)
+        db_course = Course(**course.model_dump(), created_by=principal.id)
         session.add(db_course)
         await session.commit()
         await session.refresh(db_course)
         return db_course
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/import", response_model=CourseImportResult)
+async def import_course_document(
+    document: CourseImport,
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
+):
+    """Create a course with its lessons and content blocks in one transaction."""
+    _ = user_has_access_rights(principal, [UserRole.admin, UserRole.teacher])
+    try:
+        await get_cohort(session, document.cohort_id, principal)
+
+        digests = {
+            block.blob_digest
+            for lesson in document.lessons
+            for block in lesson.content_blocks
+            if block.blob_digest
+        }
+        if digests:
+            result = await session.execute(
+                select(MediaBlob.digest).where(MediaBlob.digest.in_(digests))
+            )
+            missing = digests - set(result.scalars())
+            if missing:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Media not found: {', '.join(sorted(missing))}",
+                )
+
+        result = await import_course(session, document, principal.id)
+        await session.commit()
+        return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/{course_id}", response_model=CourseRead)
 async def get_course(
-    course_id: str,
-    token: dict = Depends(requires_auth),
-    session: AsyncSession = Depends(get_db_session),
+    course_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
 ):
-    """Get a specific course."""
-    try:
-        # Get user from token
-        sub = token.get("sub")
-        result = await session.execute(select(User).where(User.sub == sub))
-        user = result.scalar_one_or_none()
+    """Get a specific course.
 
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
+    Supports If-None-Match; with `include=lessons` the ETag covers the
+    lessons too.
+    """
+    try:
+        # Validators first, so a 304 skips fetching and serializing the course
+        embed = includes_lessons(include)
+        stmt = select(Course.last_modified).where(
+            Course.id == course_id, Course.created_by == principal.id
+        )
+        if embed:
+            stmt = stmt.add_columns(
+                *child_validators(Lesson, Lesson.course_id, course_id)
+            )
+        validators = (await session.execute(stmt)).one_or_none()
+        if validators is None:
+            raise HTTPException(status_code=404, detail="Course not found")
+        cached = not_modified(
+            request, response, make_etag(course_id, embed, *validators)
+        )
+        if cached is not None:
+            return cached
 
         # Get course
         result = await session.execute(
-            select(Course).where(Course.id == course_id, Course.created_by == user.id)
+            select(Course)
+            .where(Course.id == course_id, Course.created_by == principal.id)
+            .options(*course_load_options(include))
         )
         course = result.scalar_one_or_none()
 
@@ -97,6 +270,8 @@ async def get_course(
             raise HTTPException(status_code=404, detail="Course not found")
 
         return course
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -105,22 +280,16 @@ async def get_course(
 async def update_course(
     course_id: str,
     course_update: CourseUpdate,
-    token: dict = Depends(requires_auth),
-    session: AsyncSession = Depends(get_db_session),
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
 ):
     """Update a course."""
     try:
-        # Get user from token
-        sub = token.get("sub")
-        result = await session.execute(select(User).where(User.sub == sub))
-        user = result.scalar_one_or_none()
-
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
         # Get course
         result = await session.execute(
-            select(Course).where(Course.id == course_id, Course.created_by == user.id)
+            select(Course).where(
+                Course.id == course_id, Course.created_by == principal.id
+            )
         )
         course = result.scalar_one_or_none()
 
@@ -135,6 +304,8 @@ async def update_course(
         await session.commit()
         await session.refresh(course)
         return course
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -142,22 +313,16 @@ async def update_course(
 @router.delete("/{course_id}")
 async def delete_course(
     course_id: str,
-    token: dict = Depends(requires_auth),
-    session: AsyncSession = Depends(get_db_session),
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
 ):
     """Delete a course."""
     try:
-        # Get user from token
-        sub = token.get("sub")
-        result = await session.execute(select(User).where(User.sub == sub))
-        user = result.scalar_one_or_none()
-
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
         # Get course
         result = await session.execute(
-            select(Course).where(Course.id == course_id, Course.created_by == user.id)
+            select(Course).where(
+                Course.id == course_id, Course.created_by == principal.id
+            )
         )
         course = result.scalar_one_or_none()
 
@@ -168,136 +333,164 @@ async def delete_course(
         await session.delete(course)
         await session.commit()
         return {"message": "Course deleted"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/{course_id}/lessons", response_model=List[LessonRead])
 async def get_lessons(
-    course_id: str,
-    token: dict = Depends(requires_auth),
-    session: AsyncSession = Depends(get_db_session),
+    course_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
 ):
-    """Get all lessons for a course."""
-    try:
-        # Get user from token
-        sub = token.get("sub")
-        result = await session.execute(select(User).where(User.sub == sub))
-        user = result.scalar_one_or_none()
-
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
+    """Get a page of a course's lessons, in lesson order.
 
-        # Get course
+    Supports If-None-Match. The ETag covers all of the course's lessons, so
+    a lesson moving between pages changes every page's tag.
+    """
+    try:
+        # Check the course and compute validators in one query
         result = await session.execute(
-            select(Course).where(Course.id == course_id, Course.created_by == user.id)
+            select(
+                Course.id, *child_validators(Lesson, Lesson.course_id, course_id)
+            ).where(Course.id == course_id, Course.created_by == principal.id)
         )
-        course = result.scalar_one_or_none()
-
-        if not course:
+        validators = result.one_or_none()
+        if validators is None:
             raise HTTPException(status_code=404, detail="Course not found")
+        cached = not_modified(
+            request, response, make_etag(*validators, page.limit, page.cursor)
+        )
+        if cached is not None:
+            return cached
 
         # Get lessons
-        result = await session.execute(
-            select(Lesson).where(Lesson.course_id == course_id)
-        )
+        stmt = select(Lesson).where(Lesson.course_id == course_id)
+        result = await session.execute(paginate(stmt, LESSON_SORT, page))
         lessons = result.scalars().all()
-        return lessons
+        return finish_page(lessons, LESSON_SORT, page, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/{course_id}/lessons", response_model=LessonRead)
 async def create_lesson(
-    course_id: str,
+    course_id: uuid.UUID,
     lesson: LessonCreate,
-    token: dict = Depends(requires_auth),
-    session: AsyncSession = Depends(get_db_session),
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
 ):
-    """Create a new lesson."""
+    """Create a new lesson, after the course's last lesson."""
     try:
-        # Get user from token
-        sub = token.get("sub")
-        result = await session.execute(select(User).where(User.sub == sub))
-        user = result.scalar_one_or_none()
-
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
         # Get course
         result = await session.execute(
-            select(Course).where(Course.id == course_id, Course.created_by == user.id)
+            select(Course).where(
+                Course.id == course_id, Course.created_by == principal.id
+            )
         )
         course = result.scalar_one_or_none()
 
         if not course:
             raise HTTPException(status_code=404, detail="Course not found")
 
-        # Create lesson
-        db_lesson = Lesson(**lesson.model_dump(), course_id=course_id)
+        # Create lesson, keyed after the last one while the course is locked
+        await lock_parent(session, LESSONS, course_id)
+        db_lesson = Lesson(
+            **lesson.model_dump(),
+            course_id=course_id,
+            order=await append_key(session, LESSONS, course_id),
+        )
         session.add(db_lesson)
         await session.commit()
         await session.refresh(db_lesson)
         return db_lesson
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{course_id}/lessons/{lesson_id}", response_model=LessonRead)
+@router.get("/{course_id}/lessons/{lesson_id}", response_model=LessonDetail)
 async def get_lesson(
-    course_id: str,
-    lesson_id: str,
-    token: dict = Depends(requires_auth),
-    session: AsyncSession = Depends(get_db_session),
+    course_id: uuid.UUID,
+    lesson_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
 ):
-    """Get a specific lesson."""
-    try:
-        # Get user from token
-        sub = token.get("sub")
-        result = await session.execute(select(User).where(User.sub == sub))
-        user = result.scalar_one_or_none()
+    """Get a specific lesson with its content blocks.
 
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
+    Image blocks list URLs of their resized variants, so clients can fetch
+    the size they display. Supports If-None-Match.
+    """
+    try:
+        result = await session.execute(
+            select(
+                Lesson.last_modified,
+                *child_validators(ContentBlock, ContentBlock.lesson_id, lesson_id),
+            )
+            .join(Course)
+            .where(
+                Course.id == course_id,
+                Lesson.id == lesson_id,
+                Course.created_by == principal.id,
+            )
+        )
+        validators = result.one_or_none()
+        if validators is None:
+            raise HTTPException(status_code=404, detail="Lesson not found")
+        cached = not_modified(request, response, make_etag(lesson_id, *validators))
+        if cached is not None:
+            return cached
 
-        # Get course and lesson
+        # Get course and lesson, and its blocks and their media in one more
+        # query
         result = await session.execute(
             select(Lesson)
             .join(Course)
             .where(
                 Course.id == course_id,
                 Lesson.id == lesson_id,
-                Course.created_by == user.id,
+                Course.created_by == principal.id,
             )
+            .options(selectinload(Lesson.content_blocks).joinedload(ContentBlock.blob))
         )
         lesson = result.scalar_one_or_none()
 
         if not lesson:
             raise HTTPException(status_code=404, detail="Lesson not found")
 
-        return lesson
+        detail = LessonDetail.model_validate(lesson)
+        for block, block_read in zip(lesson.content_blocks, detail.content_blocks):
+            if block.type == ContentType.image and block.blob is not None:
+                block_read.variants = variant_urls(
+                    block.blob.digest, block.blob.content_type
+                )
+        return detail
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.put("/{course_id}/lessons/{lesson_id}", response_model=LessonRead)
 async def update_lesson(
-    course_id: str,
-    lesson_id: str,
+    course_id: uuid.UUID,
+    lesson_id: uuid.UUID,
     lesson_update: LessonUpdate,
-    token: dict = Depends(requires_auth),
-    session: AsyncSession = Depends(get_db_session),
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
 ):
     """Update a lesson."""
     try:
-        # Get user from token
-        sub = token.get("sub")
-        result = await session.execute(select(User).where(User.sub == sub))
-        user = result.scalar_one_or_none()
-
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
         # Get course and lesson
         result = await session.execute(
             select(Lesson)
@@ -305,7 +498,7 @@ async def update_lesson(
             .where(
                 Course.id == course_id,
                 Lesson.id == lesson_id,
-                Course.created_by == user.id,
+                Course.created_by == principal.id,
             )
         )
         lesson = result.scalar_one_or_none()
@@ -321,6 +514,8 @@ async def update_lesson(
         await session.commit()
         await session.refresh(lesson)
         return lesson
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -329,19 +524,11 @@ async def update_lesson(
 async def delete_lesson(
     course_id: str,
     lesson_id: str,
-    token: dict = Depends(requires_auth),
-    session: AsyncSession = Depends(get_db_session),
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
 ):
     """Delete a lesson."""
     try:
-        # Get user from token
-        sub = token.get("sub")
-        result = await session.execute(select(User).where(User.sub == sub))
-        user = result.scalar_one_or_none()
-
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
         # Get course and lesson
         result = await session.execute(
             select(Lesson)
@@ -349,7 +536,7 @@ async def delete_lesson(
             .where(
                 Course.id == course_id,
                 Lesson.id == lesson_id,
-                Course.created_by == user.id,
+                Course.created_by == principal.id,
             )
         )
         lesson = result.scalar_one_or_none()
@@ -361,5 +548,84 @@ async def delete_lesson(
         await session.delete(lesson)
         await session.commit()
         return {"message": "Lesson deleted"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{course_id}/lessons/{lesson_id}/move", response_model=MoveResult)
+async def move_lesson(
+    course_id: uuid.UUID,
+    lesson_id: uuid.UUID,
+    move: MoveRequest,
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
+):
+    """Move a lesson after another one, or first; only its own key changes."""
+    try:
+        # Locking the course serializes moves among its lessons
+        result = await session.execute(
+            select(Course.id)
+            .where(Course.id == course_id, Course.created_by == principal.id)
+            .with_for_update()
+        )
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Course not found")
+
+        moved = await move_item(session, LESSONS, course_id, lesson_id, move.after_id)
+        if moved is None:
+            raise HTTPException(status_code=404, detail="Lesson not found")
+
+        await session.commit()
+        if moved.narrow:
+            schedule_rebalance(LESSONS, course_id)
+        return MoveResult(id=lesson_id, order=moved.order, rebalanced=moved.rebalanced)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post(
+    "/{course_id}/lessons/{lesson_id}/blocks/{block_id}/move",
+    response_model=MoveResult,
+)
+async def move_content_block(
+    course_id: uuid.UUID,
+    lesson_id: uuid.UUID,
+    block_id: uuid.UUID,
+    move: MoveRequest,
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
+):
+    """Move a content block after another one in its lesson, or first."""
+    try:
+        # Locking the lesson serializes moves among its blocks
+        result = await session.execute(
+            select(Lesson.id)
+            .join(Course)
+            .where(
+                Lesson.id == lesson_id,
+                Course.id == course_id,
+                Course.created_by == principal.id,
+            )
+            .with_for_update(of=Lesson)
+        )
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Lesson not found")
+
+        moved = await move_item(
+            session, CONTENT_BLOCKS, lesson_id, block_id, move.after_id
+        )
+        if moved is None:
+            raise HTTPException(status_code=404, detail="Content block not found")
+
+        await session.commit()
+        if moved.narrow:
+            schedule_rebalance(CONTENT_BLOCKS, lesson_id)
+        return MoveResult(id=block_id, order=moved.order, rebalanced=moved.rebalanced)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,526 @@
+import asyncio
+import base64
+import binascii
+import logging
+import re
+import uuid
+from contextlib import suppress
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from sqlalchemy import delete, exists, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.auth import (
+    Principal,
+    get_current_principal,
+    get_routed_db_session,
+    user_has_access_rights,
+)
+from backend.database import dialect_insert, routed_session
+from backend.derivatives import (
+    VARIANT_MEDIA_TYPE,
+    VARIANTS,
+    is_derivable,
+    schedule_derivatives,
+    variant_path,
+    variant_wait,
+)
+from backend.etags import etag_matches
+from backend.media import (
+    DIGEST_PATTERN,
+    MEDIA_TYPES,
+    ChunkMismatch,
+    UploadTooLarge,
+    assemble_upload,
+    blob_path,
+    chunk_count,
+    chunk_length,
+    discard_upload,
+    media_chunk_size,
+    media_max_resumable_bytes,
+    media_max_upload_bytes,
+    start_upload,
+    store_chunk,
+    store_stream,
+)
+from backend.models import (
+    Cohort,
+    CohortEnrollment,
+    ContentBlock,
+    Course,
+    Lesson,
+    MediaBlob,
+    MediaUpload,
+    MediaUploadChunk,
+    UserRole,
+)
+from backend.schemas import (
+    MediaBlobRead,
+    MediaUploadChunkRead,
+    MediaUploadCreate,
+    MediaUploadRead,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Blobs never change under a digest
+BLOB_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+# The SHA-256 entry of a Content-Digest header (RFC 9530)
+CONTENT_DIGEST_SHA256 = re.compile(r"(?:^|,)\s*sha-256=:([A-Za-z0-9+/]+={0,2}):")
+
+
+@router.post("", response_model=MediaBlobRead)
+async def upload_media(
+    request: Request,
+    principal: Principal = Depends(get_current_principal),
+):
+    """Upload a media file as the raw request body.
+
+    The body is streamed to disk, never held in memory, and identical files
+    are stored once. Reference the returned digest from content blocks.
+    """
+    _ = user_has_access_rights(principal, [UserRole.admin, UserRole.teacher])
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if not content_type.lower().startswith(MEDIA_TYPES):
+        raise HTTPException(
+            status_code=415, detail="Only image and video uploads are supported"
+        )
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > media_max_upload_bytes:
+        raise HTTPException(status_code=413, detail="Upload too large")
+
+    try:
+        digest, size = await store_stream(request.stream())
+
+        # The session is opened only once the upload is on disk, so a slow
+        # client never holds a database connection
+        async with routed_session(False, principal.sub) as session:
+            insert = dialect_insert(session)
+            await session.execute(
+                insert(MediaBlob)
+                .values(digest=digest, size=size, content_type=content_type)
+                .on_conflict_do_nothing(index_elements=[MediaBlob.digest])
+            )
+            await session.commit()
+            result = await session.execute(
+                select(MediaBlob).where(MediaBlob.digest == digest)
+            )
+            blob = MediaBlobRead.model_validate(result.scalar_one())
+        schedule_derivatives(blob.digest, blob.content_type)
+        return blob
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in upload_media: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def chunk_checksum(content_digest: str) -> Optional[str]:
+    """The hex SHA-256 declared by a Content-Digest header, if any."""
+    match = CONTENT_DIGEST_SHA256.search(content_digest)
+    if match is None:
+        return None
+    try:
+        raw = base64.b64decode(match.group(1), validate=True)
+    except binascii.Error:
+        return None
+    return raw.hex() if len(raw) == 32 else None
+
+
+async def get_upload(
+    session: AsyncSession, upload_id: uuid.UUID, principal: Principal
+) -> MediaUpload:
+    """The principal's resumable upload, or 404."""
+    result = await session.execute(
+        select(MediaUpload).where(
+            MediaUpload.id == upload_id, MediaUpload.created_by == principal.id
+        )
+    )
+    upload = result.scalar_one_or_none()
+    if upload is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return upload
+
+
+def upload_read(upload: MediaUpload, received: List[int]) -> MediaUploadRead:
+    return MediaUploadRead(
+        id=upload.id,
+        content_type=upload.content_type,
+        size=upload.size,
+        chunk_size=upload.chunk_size,
+        chunk_count=chunk_count(upload.size, upload.chunk_size),
+        content_block_id=upload.content_block_id,
+        received=received,
+    )
+
+
+@router.post("/uploads", response_model=MediaUploadRead)
+async def create_upload(
+    upload: MediaUploadCreate,
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
+):
+    """Start a resumable upload of a large media file.
+
+    Send its chunks with `PUT /uploads/{id}/chunks/{index}`, in any order,
+    then `POST /uploads/{id}/complete`. `GET /uploads/{id}` lists the
+    committed chunks, so an interrupted upload sends only the rest.
+    """
+    _ = user_has_access_rights(principal, [UserRole.admin, UserRole.teacher])
+    if not upload.content_type.lower().startswith(MEDIA_TYPES):
+        raise HTTPException(
+            status_code=415, detail="Only image and video uploads are supported"
+        )
+    if upload.size > media_max_resumable_bytes:
+        raise HTTPException(status_code=413, detail="Upload too large")
+
+    try:
+        if upload.content_block_id is not None:
+            result = await session.execute(
+                select(ContentBlock.id)
+                .join(Lesson)
+                .join(Course)
+                .where(
+                    ContentBlock.id == upload.content_block_id,
+                    Course.created_by == principal.id,
+                )
+            )
+            if result.scalar_one_or_none() is None:
+                raise HTTPException(status_code=404, detail="Content block not found")
+
+        media_upload = MediaUpload(
+            created_by=principal.id,
+            content_type=upload.content_type,
+            size=upload.size,
+            chunk_size=upload.chunk_size or media_chunk_size,
+            content_block_id=upload.content_block_id,
+        )
+        session.add(media_upload)
+        await session.flush()
+        start_upload(media_upload.id)
+        await session.commit()
+        return upload_read(media_upload, [])
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in create_upload: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/uploads/{upload_id}", response_model=MediaUploadRead)
+async def get_upload_status(
+    upload_id: uuid.UUID,
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
+):
+    """Get a resumable upload and the chunks committed so far."""
+    try:
+        upload = await get_upload(session, upload_id, principal)
+        result = await session.execute(
+            select(MediaUploadChunk.index)
+            .where(MediaUploadChunk.upload_id == upload_id)
+            .order_by(MediaUploadChunk.index)
+        )
+        return upload_read(upload, list(result.scalars()))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_upload_status: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/uploads/{upload_id}/chunks/{index}", response_model=MediaUploadChunkRead)
+async def put_upload_chunk(
+    upload_id: uuid.UUID,
+    index: int,
+    request: Request,
+    principal: Principal = Depends(get_current_principal),
+):
+    """Upload one chunk of a resumable upload as the raw request body.
+
+    The request must carry a `Content-Digest: sha-256=:<base64>:` header.
+    Chunks may be sent in any order, concurrently or again, and each is
+    committed once it is verified on disk.
+    """
+    sha256 = chunk_checksum(request.headers.get("content-digest", ""))
+    if sha256 is None:
+        raise HTTPException(
+            status_code=400, detail="A sha-256 Content-Digest header is required"
+        )
+    try:
+        # As with single uploads, no session is held while the body streams in
+        async with routed_session(True, principal.sub) as session:
+            upload = await get_upload(session, upload_id, principal)
+        if not 0 <= index < chunk_count(upload.size, upload.chunk_size):
+            raise HTTPException(status_code=404, detail="Chunk not found")
+        length = chunk_length(upload.size, upload.chunk_size, index)
+        declared = request.headers.get("content-length")
+        if declared and declared.isdigit() and int(declared) > length:
+            raise HTTPException(status_code=413, detail="Chunk too large")
+
+        await store_chunk(upload_id, index, request.stream(), length, sha256)
+
+        async with routed_session(False, principal.sub) as session:
+            result = await session.execute(
+                update(MediaUpload)
+                .where(
+                    MediaUpload.id == upload_id,
+                    MediaUpload.created_by == principal.id,
+                )
+                .values(last_modified=datetime.utcnow())
+            )
+            if result.rowcount == 0:
+                # Completed or discarded while the chunk was in flight
+                raise HTTPException(status_code=404, detail="Upload not found")
+            insert = dialect_insert(session)
+            stmt = insert(MediaUploadChunk).values(
+                upload_id=upload_id, index=index, sha256=sha256
+            )
+            await session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[MediaUploadChunk.upload_id, MediaUploadChunk.index],
+                    set_={"sha256": stmt.excluded.sha256},
+                )
+            )
+            await session.commit()
+        return MediaUploadChunkRead(index=index, size=length, sha256=sha256)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except ChunkMismatch as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail="Chunk too large")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in put_upload_chunk: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=MediaBlobRead)
+async def complete_upload(
+    upload_id: uuid.UUID,
+    principal: Principal = Depends(get_current_principal),
+):
+    """Assemble a resumable upload's chunks into a media blob.
+
+    Fails with 409 while chunks are missing. An upload started for a content
+    block attaches the blob to it.
+    """
+    try:
+        async with routed_session(False, principal.sub) as session:
+            upload = await get_upload(session, upload_id, principal)
+            count = chunk_count(upload.size, upload.chunk_size)
+            result = await session.execute(
+                select(func.count())
+                .select_from(MediaUploadChunk)
+                .where(MediaUploadChunk.upload_id == upload_id)
+            )
+            received = result.scalar_one()
+        if received < count:
+            raise HTTPException(
+                status_code=409,
+                detail=f"{count - received} of {count} chunks are missing",
+            )
+
+        # Assembly copies the whole file, so it runs without a session
+        digest, size = await assemble_upload(upload_id, count)
+
+        async with routed_session(False, principal.sub) as session:
+            await session.execute(
+                delete(MediaUploadChunk).where(MediaUploadChunk.upload_id == upload_id)
+            )
+            result = await session.execute(
+                delete(MediaUpload).where(
+                    MediaUpload.id == upload_id,
+                    MediaUpload.created_by == principal.id,
+                )
+            )
+            if result.rowcount == 0:
+                raise HTTPException(status_code=404, detail="Upload not found")
+            insert = dialect_insert(session)
+            await session.execute(
+                insert(MediaBlob)
+                .values(digest=digest, size=size, content_type=upload.content_type)
+                .on_conflict_do_nothing(index_elements=[MediaBlob.digest])
+            )
+            if upload.content_block_id is not None:
+                await session.execute(
+                    update(ContentBlock)
+                    .where(ContentBlock.id == upload.content_block_id)
+                    .values(blob_digest=digest)
+                )
+            await session.commit()
+            result = await session.execute(
+                select(MediaBlob).where(MediaBlob.digest == digest)
+            )
+            blob = MediaBlobRead.model_validate(result.scalar_one())
+        await discard_upload(upload_id)
+        schedule_derivatives(blob.digest, blob.content_type)
+        return blob
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in complete_upload: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/uploads/{upload_id}")
+async def delete_upload(
+    upload_id: uuid.UUID,
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
+):
+    """Abandon a resumable upload and discard its chunks."""
+    try:
+        await get_upload(session, upload_id, principal)
+        await session.execute(
+            delete(MediaUploadChunk).where(MediaUploadChunk.upload_id == upload_id)
+        )
+        await session.execute(delete(MediaUpload).where(MediaUpload.id == upload_id))
+        await session.commit()
+        await discard_upload(upload_id)
+        return {"message": "Upload deleted"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in delete_upload: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def blob_visible_to(digest: str, user_id: uuid.UUID):
+    """Whether a content block in a course the user can see uses the blob:
+    one they created, or of a cohort they teach or are enrolled in."""
+    return exists(
+        select(ContentBlock.id)
+        .join(Lesson, ContentBlock.lesson_id == Lesson.id)
+        .join(Course, Lesson.course_id == Course.id)
+        .where(
+            ContentBlock.blob_digest == digest,
+            or_(
+                Course.created_by == user_id,
+                exists().where(
+                    Cohort.id == Course.cohort_id, Cohort.teacher_id == user_id
+                ),
+                exists().where(
+                    CohortEnrollment.cohort_id == Course.cohort_id,
+                    CohortEnrollment.student_id == user_id,
+                    CohortEnrollment.status == "active",
+                ),
+            ),
+        )
+    )
+
+
+async def blob_content_type(digest: str, principal: Principal) -> str:
+    """The stored media type of a blob the principal may see, or 404.
+
+    Admins see every blob, anyone else only the blobs `blob_visible_to`
+    them.
+    """
+    if not DIGEST_PATTERN.match(digest):
+        raise HTTPException(status_code=404, detail="Media not found")
+    stmt = select(MediaBlob.content_type).where(MediaBlob.digest == digest)
+    if principal.role != UserRole.admin:
+        stmt = stmt.where(blob_visible_to(digest, principal.id))
+    async with routed_session(True, principal.sub) as session:
+        result = await session.execute(stmt)
+        content_type = result.scalar_one_or_none()
+    if content_type is None:
+        raise HTTPException(status_code=404, detail="Media not found")
+    return content_type
+
+
+def blob_file(digest: str) -> Path:
+    path = blob_path(digest)
+    if not path.is_file():
+        logger.error(f"Media blob {digest} is missing from {path}")
+        raise HTTPException(status_code=404, detail="Media not found")
+    return path
+
+
+@router.api_route("/{digest}", methods=["GET", "HEAD"])
+async def get_media(
+    digest: str,
+    request: Request,
+    principal: Principal = Depends(get_current_principal),
+):
+    """Serve a media file, honouring Range requests.
+
+    The file is sent by Starlette's FileResponse: with the ASGI pathsend
+    extension the server sends it zero-copy, otherwise it is read in small
+    chunks, and a Range request only reads the requested bytes.
+    """
+    try:
+        content_type = await blob_content_type(digest, principal)
+
+        etag = f'"{digest}"'
+        headers = {"ETag": etag, "Cache-Control": BLOB_CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match", ""), etag):
+            return Response(status_code=304, headers=headers)
+
+        return FileResponse(blob_file(digest), media_type=content_type, headers=headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_media: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.api_route("/{digest}/variants/{name}", methods=["GET", "HEAD"])
+async def get_media_variant(
+    digest: str,
+    name: str,
+    request: Request,
+    principal: Principal = Depends(get_current_principal),
+):
+    """Serve a resized variant of an image: thumbnail, mobile or desktop.
+
+    A variant that is still being rendered is waited for briefly; past
+    that, the original is served uncached so the variant is picked up once
+    it is ready.
+    """
+    if name not in VARIANTS:
+        raise HTTPException(status_code=404, detail="Variant not found")
+    try:
+        content_type = await blob_content_type(digest, principal)
+        if not is_derivable(content_type):
+            raise HTTPException(status_code=404, detail="Variant not found")
+
+        size = VARIANTS[name]
+        etag = f'"{digest}-{size}"'
+        headers = {"ETag": etag, "Cache-Control": BLOB_CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match", ""), etag):
+            return Response(status_code=304, headers=headers)
+
+        path = variant_path(digest, size)
+        if not path.is_file():
+            task = schedule_derivatives(digest, content_type)
+            if task is not None:
+                # Render errors are logged by the task itself
+                with suppress(Exception):
+                    await asyncio.wait_for(asyncio.shield(task), variant_wait)
+        if path.is_file():
+            return FileResponse(path, media_type=VARIANT_MEDIA_TYPE, headers=headers)
+        return FileResponse(
+            blob_file(digest),
+            media_type=content_type,
+            headers={"Cache-Control": "no-cache"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_media_variant: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
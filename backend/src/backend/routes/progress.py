@@ -0,0 +1,150 @@
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import and_, case, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.analytics import invalidate_cohorts
+from backend.auth import Principal, get_current_principal, get_routed_db_session
+from backend.database import dialect_insert
+from backend.enums import ProgressStatus
+from backend.models import CohortEnrollment, Course, Lesson, Progress
+from backend.schemas import ProgressBatch, ProgressBatchResult, ProgressEvent
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Statuses in the only order they may move
+STATUS_RANK = {
+    ProgressStatus.not_started: 0,
+    ProgressStatus.in_progress: 1,
+    ProgressStatus.completed: 2,
+}
+
+
+def status_rank(column):
+    """SQL rank of a status column; unknown or NULL ranks below everything."""
+    return case(
+        {status.value: rank for status, rank in STATUS_RANK.items()},
+        value=column,
+        else_=-1,
+    )
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def dedupe_events(events: Iterable[ProgressEvent]) -> Dict[uuid.UUID, ProgressEvent]:
+    """Keep the furthest-along event per lesson, latest completion first."""
+    latest: Dict[uuid.UUID, ProgressEvent] = {}
+    for event in events:
+        current = latest.get(event.lesson_id)
+        if current is None or _event_key(event) > _event_key(current):
+            latest[event.lesson_id] = event
+    return latest
+
+
+def _event_key(event: ProgressEvent):
+    completed_at = _naive_utc(event.completed_at) if event.completed_at else None
+    return STATUS_RANK[event.status], completed_at or datetime.min
+
+
+async def upsert_progress(
+    session: AsyncSession, student_id: uuid.UUID, events: Iterable[ProgressEvent]
+) -> int:
+    """Write a student's progress events as one multi-row upsert.
+
+    An existing row is only overwritten by a further-along status, so
+    replayed or out-of-order events never move progress backwards. Returns
+    the number of distinct lessons written. The caller commits.
+    """
+    now = datetime.utcnow()
+    rows: List[dict] = []
+    for lesson_id, event in dedupe_events(events).items():
+        completed_at = None
+        if event.status == ProgressStatus.completed:
+            completed_at = _naive_utc(event.completed_at) if event.completed_at else now
+        rows.append(
+            {
+                "student_id": student_id,
+                "lesson_id": lesson_id,
+                "status": event.status.value,
+                "completed_at": completed_at,
+            }
+        )
+    if not rows:
+        return 0
+
+    insert = dialect_insert(session)
+    stmt = insert(Progress).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Progress.student_id, Progress.lesson_id],
+        set_={
+            "status": stmt.excluded.status,
+            "completed_at": stmt.excluded.completed_at,
+            "last_modified": stmt.excluded.last_modified,
+        },
+        where=status_rank(stmt.excluded.status) > status_rank(Progress.status),
+    )
+    await session.execute(stmt)
+    return len(rows)
+
+
+@router.post("", response_model=ProgressBatchResult)
+async def record_progress(
+    batch: ProgressBatch,
+    principal: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_routed_db_session),
+):
+    """Record a batch of the current user's lesson progress events.
+
+    Every lesson must belong to a course of a cohort the user is actively
+    enrolled in; otherwise the whole batch is rejected.
+    """
+    try:
+        lesson_ids = {event.lesson_id for event in batch.events}
+        result = await session.execute(
+            select(Lesson.id, Course.cohort_id, CohortEnrollment.id)
+            .join(Course, Lesson.course_id == Course.id)
+            .outerjoin(
+                CohortEnrollment,
+                and_(
+                    CohortEnrollment.cohort_id == Course.cohort_id,
+                    CohortEnrollment.student_id == principal.id,
+                    CohortEnrollment.status == "active",
+                ),
+            )
+            .where(Lesson.id.in_(lesson_ids))
+        )
+        rows = result.all()
+        missing = lesson_ids - {row[0] for row in rows}
+        if missing:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Lessons not found: {', '.join(sorted(map(str, missing)))}",
+            )
+        not_enrolled = {row[0] for row in rows if row[2] is None}
+        if not_enrolled:
+            raise HTTPException(
+                status_code=403,
+                detail="Not actively enrolled in the courses of lessons: "
+                + ", ".join(sorted(map(str, not_enrolled))),
+            )
+        cohorts = {row[1] for row in rows}
+
+        lessons = await upsert_progress(session, principal.id, batch.events)
+        await session.commit()
+        invalidate_cohorts(cohorts)
+        return ProgressBatchResult(received=len(batch.events), lessons=lessons)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in record_progress: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
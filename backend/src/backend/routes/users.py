@@ -1,13 +1,30 @@
+import csv
+import io
+import json
 import logging
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import AsyncIterator
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.auth import get_user_info, requires_auth, user_has_access_rights
-from backend.database import get_db_session
+from backend.auth import (
+    Principal,
+    get_current_principal,
+    get_routed_db_session,
+    get_user_info,
+    invalidate_principal,
+    requires_auth,
+    user_has_access_rights,
+)
+from backend.database import async_session, routed_session
 from backend.models import User, UserRole
+from backend.pagination import PageParams, finish_page, paginate
 from backend.schemas import UserRead
+from backend.stats import read_counters
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -15,23 +32,69 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# How long a stored email is trusted before /me re-syncs it from Auth0
+EMAIL_REFRESH_INTERVAL = timedelta(hours=24)
+
+# Unique sort key for keyset pagination
+USER_SORT = (User.created_at, User.id)
+
+# Columns and batch size for the streaming user export
+EXPORT_COLUMNS = (User.id, User.sub, User.email, User.role, User.created_at)
+EXPORT_CHUNK_SIZE = 1000
+
+# Subs with an email refresh already scheduled
+email_refreshes: set[str] = set()
+
+
+async def refresh_user_email(token: dict) -> None:
+    """Re-sync a user's email from Auth0 outside the request path."""
+    sub = token.get("sub")
+    try:
+        user_info = await get_user_info(token)
+        values = {"last_modified": datetime.utcnow()}
+        if user_info.get("email"):
+            values["email"] = user_info["email"]
+
+        async with async_session() as session:
+            await session.execute(update(User).where(User.sub == sub).values(**values))
+            await session.commit()
+        invalidate_principal(sub)
+    except Exception as e:
+        logger.warning(f"Failed to refresh email for {sub}: {str(e)}")
+    finally:
+        email_refreshes.discard(sub)
+
 
 @router.get("/me")
 async def get_current_user_info(
+    background_tasks: BackgroundTasks,
     token: dict = Depends(requires_auth),
-    db_session: AsyncSession = Depends(get_db_session),
+    db_session: AsyncSession = Depends(get_routed_db_session),
 ):
-    """Get the current user's info, including email and role."""
-    try:
-        user_info = await get_user_info(token)
+    """Get the current user's info, including email and role.
 
+    Known users are answered from the database alone, on a read session;
+    Auth0's userinfo endpoint is only called inline for first-time users,
+    whose insert takes the primary.
+    """
+    try:
         sub = token.get("sub")
-        email = user_info.get("email")
 
         result = await db_session.execute(select(User).where(User.sub == sub))
         user = result.scalar_one_or_none()
 
-        if not user:
+        if user:
+            stale = datetime.utcnow() - user.last_modified > EMAIL_REFRESH_INTERVAL
+            if stale and sub not in email_refreshes:
+                email_refreshes.add(sub)
+                background_tasks.add_task(refresh_user_email, token)
+        else:
+            # Release the connection before calling Auth0, so a slow
+            # userinfo response doesn't hold it
+            await db_session.close()
+            user_info = await get_user_info(token)
+            email = user_info.get("email")
+
             if not email:
                 logger.error("New User missing require email.")
                 raise HTTPException(
@@ -45,10 +108,13 @@ async def get_current_user_info(
                 email=email,
                 role=UserRole.student,
             )
-            db_session.add(user)
-            await db_session.commit()
+            async with routed_session(False, sub) as session:
+                session.add(user)
+                await session.commit()
 
         return {"id": str(user.id), "email": user.email, "role": user.role}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in get_current_user_info: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -56,38 +122,104 @@ async def get_current_user_info(
 
 @router.get("/all", response_model=list[UserRead])
 async def get_all_users(
-    token: dict = Depends(requires_auth),
-    db_session: AsyncSession = Depends(get_db_session),
+    response: Response,
+    page: PageParams = Depends(),
+    principal: Principal = Depends(get_current_principal),
+    db_session: AsyncSession = Depends(get_routed_db_session),
 ):
     try:
-        _ = await user_has_access_rights(token, [UserRole.admin], db_session)
+        _ = user_has_access_rights(principal, [UserRole.admin])
 
-        result = await db_session.execute(select(User))
-        users = result.scalars().all()
+        result = await db_session.execute(paginate(select(User), USER_SORT, page))
+        users = finish_page(result.scalars().all(), USER_SORT, page, response)
 
         return [UserRead.from_orm(user) for user in users]
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in get_all_users: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+async def _export_chunks(writer_key: str) -> AsyncIterator[list]:
+    """Yield user rows in chunks from a server-side cursor."""
+    async with routed_session(True, writer_key) as session:
+        result = await session.stream(
+            select(*EXPORT_COLUMNS)
+            .order_by(*USER_SORT)
+            .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        async for chunk in result.partitions():
+            yield chunk
+
+
+def _export_values(row) -> list:
+    return [str(row.id), row.sub, row.email, row.role.value, row.created_at.isoformat()]
+
+
+async def _ndjson_lines(writer_key: str) -> AsyncIterator[str]:
+    keys = [column.key for column in EXPORT_COLUMNS]
+    async for chunk in _export_chunks(writer_key):
+        yield "".join(
+            json.dumps(dict(zip(keys, _export_values(row)))) + "\n" for row in chunk
+        )
+
+
+async def _csv_lines(writer_key: str) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in EXPORT_COLUMNS])
+    async for chunk in _export_chunks(writer_key):
+        writer.writerows(_export_values(row) for row in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+@router.get("/export")
+async def export_users(
+    format: ExportFormat = Query(ExportFormat.ndjson),
+    principal: Principal = Depends(get_current_principal),
+):
+    """Stream every user as NDJSON or CSV without materializing the table."""
+    _ = user_has_access_rights(principal, [UserRole.admin])
+
+    if format == ExportFormat.csv:
+        return StreamingResponse(
+            _csv_lines(principal.sub),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="users.csv"'},
+        )
+    return StreamingResponse(
+        _ndjson_lines(principal.sub), media_type="application/x-ndjson"
+    )
+
+
 @router.get("/admin/stats")
 async def get_admin_stats(
-    token: dict = Depends(requires_auth),
-    db_session: AsyncSession = Depends(get_db_session),
+    principal: Principal = Depends(get_current_principal),
+    db_session: AsyncSession = Depends(get_routed_db_session),
 ):
     try:
-        _ = await user_has_access_rights(token, [UserRole.admin], db_session)
+        _ = user_has_access_rights(principal, [UserRole.admin])
 
-        # Return dummy data for now
+        counters = await read_counters(db_session)
         return {
-            "totalUsers": 42,
-            "totalCourses": 15,
-            "totalClasses": 8,
-            "activeStudents": 156,
+            "totalUsers": counters["users"],
+            "totalCourses": counters["courses"],
+            "totalClasses": counters["cohorts"],
+            "activeStudents": counters["active_enrollments"],
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in get_admin_stats: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -96,11 +228,11 @@ async def get_admin_stats(
 @router.put("/role")
 async def update_user_role(
     user_update: dict,
-    token: dict = Depends(requires_auth),
-    db_session: AsyncSession = Depends(get_db_session),
+    principal: Principal = Depends(get_current_principal),
+    db_session: AsyncSession = Depends(get_routed_db_session),
 ):
     try:
-        _ = await user_has_access_rights(token, [UserRole.admin], db_session)
+        _ = user_has_access_rights(principal, [UserRole.admin])
 
         # Get the target user
         target_user_id = user_update.get("userId")
@@ -115,7 +247,8 @@ async def update_user_role(
         except ValueError:
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid role. Must be one of: {', '.join(UserRole.__members__)}",
+                detail="Invalid role. Must be one of: "
+                + ", ".join(UserRole.__members__),
             )
 
         # Get and update the target user
@@ -129,6 +262,7 @@ async def update_user_role(
 
         target_user.role = role
         await db_session.commit()
+        invalidate_principal(target_user.sub)
 
         return {
             "message": "Role updated successfully",
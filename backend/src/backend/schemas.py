@@ -1,10 +1,24 @@
 # src/backend/schemas.py
-from datetime import datetime
-from typing import List, Optional
-
-from pydantic import UUID4, BaseModel, EmailStr, Field
-
-from backend.enums import UserRole
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from pydantic import (
+    UUID4,
+    AliasChoices,
+    BaseModel,
+    EmailStr,
+    Field,
+    model_validator,
+)
+from sqlalchemy import inspect
+
+from backend.enums import (
+    ContentType,
+    EnrollmentStatus,
+    ProgressStatus,
+    RollupGranularity,
+    UserRole,
+)
 from backend.models import Lesson, User
 
 
@@ -60,7 +74,6 @@ class UserUpdate(BaseModel):
 class LessonBase(BaseModel):
     title: str
     description: str
-    order: int
     content: str
 
     def to_orm(self):
@@ -68,19 +81,25 @@ class LessonBase(BaseModel):
 
 
 class LessonCreate(LessonBase):
-    pass
+    """New lessons go last; move them with the lesson move endpoint."""
 
 
 class LessonUpdate(BaseModel):
+    """Lessons are reordered with the lesson move endpoint, not updates."""
+
     title: Optional[str] = None
     description: Optional[str] = None
-    order: Optional[int] = None
     content: Optional[str] = None
 
 
 class LessonRead(LessonBase):
     id: UUID4
     course_id: UUID4
+    order: int
+    # Lessons created by a course import have neither
+    description: Optional[str] = None
+    content: Optional[str] = None
+    structure: Optional[dict] = None
     created_at: datetime
     last_modified: datetime
 
@@ -88,6 +107,141 @@ class LessonRead(LessonBase):
         from_attributes = True
 
 
+class ContentBlockRead(BaseModel):
+    id: UUID4
+    lesson_id: UUID4
+    order: int
+    type: Optional[ContentType] = None
+    content: Optional[dict] = None
+    blob_digest: Optional[str] = None
+    variants: Dict[str, str] = Field(
+        default_factory=dict,
+        description="URLs of the resized variants of an image block's media",
+    )
+
+    class Config:
+        from_attributes = True
+
+
+class LessonDetail(LessonRead):
+    content_blocks: List[ContentBlockRead] = Field(
+        default_factory=list, description="Content blocks in display order"
+    )
+
+
+# Upper bound on emails per bulk enrollment, keeping the email lookup one
+# statement under the drivers' bind-parameter limits
+MAX_BULK_ENROLL = 5000
+
+
+class CohortBase(BaseModel):
+    name: str = Field(description="Name of the cohort")
+    description: Optional[str] = Field(None, description="Description of the cohort")
+
+
+class CohortCreate(CohortBase):
+    teacher_id: Optional[UUID4] = Field(
+        None, description="Teacher running the cohort; admins only, defaults to you"
+    )
+
+
+class CohortUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    teacher_id: Optional[UUID4] = None
+
+
+class CohortRead(CohortBase):
+    id: UUID4
+    teacher_id: UUID4
+    created_at: datetime
+    last_modified: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class BulkEnroll(BaseModel):
+    emails: List[EmailStr] = Field(min_length=1, max_length=MAX_BULK_ENROLL)
+
+
+class BulkEnrollResult(BaseModel):
+    requested: int = Field(description="Distinct emails in the request")
+    enrolled: int = Field(description="Enrollments created")
+    already_enrolled: int
+    unknown_emails: List[str] = []
+
+
+class RosterEntry(BaseModel):
+    id: UUID4 = Field(description="Enrollment id")
+    student_id: UUID4
+    email: EmailStr
+    role: UserRole
+    status: Optional[EnrollmentStatus] = None
+    enrolled_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class MediaBlobRead(BaseModel):
+    digest: str = Field(description="SHA-256 of the file, hex encoded")
+    size: int
+    content_type: str
+
+    class Config:
+        from_attributes = True
+
+
+# Bounds on resumable upload chunks; every chunk but the last is full size
+MIN_CHUNK_SIZE = 2**20
+MAX_CHUNK_SIZE = 64 * 2**20
+
+
+class MediaUploadCreate(BaseModel):
+    content_type: str = Field(description="An image/ or video/ media type")
+    size: int = Field(gt=0, description="Total size of the file in bytes")
+    chunk_size: Optional[int] = Field(
+        None,
+        ge=MIN_CHUNK_SIZE,
+        le=MAX_CHUNK_SIZE,
+        description="Bytes per chunk; the server's default if omitted",
+    )
+    content_block_id: Optional[UUID4] = Field(
+        None, description="Content block to attach the file to once complete"
+    )
+
+
+class MediaUploadRead(BaseModel):
+    id: UUID4
+    content_type: str
+    size: int
+    chunk_size: int
+    chunk_count: int
+    content_block_id: Optional[UUID4] = None
+    received: List[int] = Field(
+        description="Indexes of the committed chunks; resume with the rest"
+    )
+
+
+class MediaUploadChunkRead(BaseModel):
+    index: int
+    size: int
+    sha256: str
+
+
+class MoveRequest(BaseModel):
+    after_id: Optional[UUID4] = Field(
+        None, description="Sibling to place the item after; null moves it first"
+    )
+
+
+class MoveResult(BaseModel):
+    id: UUID4
+    order: int = Field(description="The item's new ordering key")
+    rebalanced: bool = Field(description="Whether the siblings were respaced")
+
+
 class CourseBase(BaseModel):
     title: str = Field(description="Title of the course")
     description: str = Field(description="Description of the course")
@@ -115,9 +269,155 @@ class CourseUpdate(BaseModel):
 
 class CourseRead(CourseBase):
     id: UUID4
+    cohort_id: UUID4
+    # Courses store their title as `name`
+    title: str = Field(
+        validation_alias=AliasChoices("name", "title"),
+        description="Title of the course",
+    )
+    description: Optional[str] = Field(None, description="Description of the course")
     created_at: datetime
     last_modified: datetime
-    lessons: List[LessonRead] = []
+    lessons: Optional[List[LessonRead]] = Field(
+        None, description="The course's lessons; only with include=lessons"
+    )
+
+    @model_validator(mode="before")
+    @classmethod
+    def skip_unloaded_lessons(cls, data):
+        # Read loaded attributes only, so lessons that weren't requested are
+        # left out rather than lazy loaded
+        state = inspect(data, raiseerr=False)
+        if state is None or "lessons" not in state.unloaded:
+            return data
+        return {key: value for key, value in state.dict.items() if key != "lessons"}
 
     class Config:
         from_attributes = True
+
+
+# Upper bounds on a course import, keeping the request one bounded transaction
+MAX_IMPORT_LESSONS = 500
+MAX_IMPORT_BLOCKS = 5000
+
+
+class ContentBlockImport(BaseModel):
+    type: ContentType
+    content: dict = Field(default_factory=dict)
+    blob_digest: Optional[str] = Field(
+        None,
+        pattern="^[0-9a-f]{64}$",
+        description="Digest of uploaded media from POST /api/v1/media",
+    )
+
+
+class LessonImport(BaseModel):
+    title: str = Field(min_length=1)
+    structure: Optional[dict] = None
+    content_blocks: List[ContentBlockImport] = Field(
+        default_factory=list,
+        max_length=MAX_IMPORT_BLOCKS,
+        description="Content blocks in display order",
+    )
+
+
+class CourseImport(BaseModel):
+    cohort_id: UUID4
+    name: str = Field(min_length=1)
+    description: Optional[str] = None
+    structure: Optional[dict] = None
+    lessons: List[LessonImport] = Field(
+        default_factory=list,
+        max_length=MAX_IMPORT_LESSONS,
+        description="Lessons in course order",
+    )
+
+    @model_validator(mode="after")
+    def check_block_count(self):
+        blocks = sum(len(lesson.content_blocks) for lesson in self.lessons)
+        if blocks > MAX_IMPORT_BLOCKS:
+            raise ValueError(
+                "A course import may contain at most "
+                f"{MAX_IMPORT_BLOCKS} content blocks"
+            )
+        return self
+
+
+class CourseImportResult(BaseModel):
+    id: UUID4
+    cohort_id: UUID4
+    name: str
+    lesson_ids: List[UUID4] = Field(description="Created lessons in course order")
+    content_blocks: int
+
+
+# Upper bound on events per progress batch, keeping one upsert statement well
+# under the drivers' bind-parameter limits
+MAX_PROGRESS_EVENTS = 1000
+
+
+class ProgressEvent(BaseModel):
+    lesson_id: UUID4 = Field(description="Lesson the progress applies to")
+    status: ProgressStatus = Field(description="Progress status for the lesson")
+    completed_at: Optional[datetime] = Field(
+        None, description="When the lesson was completed; defaults to now"
+    )
+
+
+class ProgressBatch(BaseModel):
+    events: List[ProgressEvent] = Field(
+        min_length=1,
+        max_length=MAX_PROGRESS_EVENTS,
+        description="Progress events for the current user",
+    )
+
+
+class ProgressBatchResult(BaseModel):
+    received: int = Field(description="Events in the request")
+    lessons: int = Field(description="Distinct lessons after deduplication")
+
+
+class DropOffLesson(BaseModel):
+    lesson_id: UUID4
+    title: str
+    order: int
+    students: int = Field(description="Unfinished students stopped at this lesson")
+
+
+class CompletionStats(BaseModel):
+    students: int = Field(description="Enrolled students")
+    lessons: int
+    completed: int = Field(description="Students who completed every lesson")
+    completion_rate: Optional[float] = None
+    median_hours_to_complete: Optional[float] = Field(
+        None, description="Hours from enrollment to the last lesson completed"
+    )
+    p90_hours_to_complete: Optional[float] = None
+    drop_off_lesson: Optional[DropOffLesson] = Field(
+        None, description="Lesson where most unfinished students stopped"
+    )
+
+
+class CourseAnalytics(CompletionStats):
+    course_id: UUID4
+    name: str
+
+
+class CohortAnalytics(CompletionStats):
+    cohort_id: UUID4
+    generated_at: datetime
+    courses: List[CourseAnalytics] = []
+
+
+class ActivityBucket(BaseModel):
+    bucket_start: date
+    active_students: int = 0
+    completions: int = 0
+    new_enrollments: int = 0
+
+
+class ActivityReport(BaseModel):
+    granularity: RollupGranularity
+    start: date
+    end: date
+    buckets: List[ActivityBucket] = []
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import os
+from collections import Counter
+from typing import Dict, Iterable
+
+from sqlalchemy import event, func, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.database import async_session
+from backend.models import Cohort, CohortEnrollment, Course, StatsCounter, User
+
+logger = logging.getLogger(__name__)
+
+# Seconds between reconciliation passes that recount every counter
+reconcile_interval = float(os.getenv("STATS_RECONCILE_INTERVAL", "600"))
+
+# Models counted one row per instance
+COUNTED_MODELS = {User: "users", Course: "courses", Cohort: "cohorts"}
+ACTIVE_ENROLLMENTS = "active_enrollments"
+
+COUNT_QUERIES = {
+    "users": select(func.count()).select_from(User),
+    "courses": select(func.count()).select_from(Course),
+    "cohorts": select(func.count()).select_from(Cohort),
+    ACTIVE_ENROLLMENTS: select(func.count())
+    .select_from(CohortEnrollment)
+    .where(CohortEnrollment.status == "active"),
+}
+
+
+def _is_active(enrollment: CohortEnrollment) -> bool:
+    return enrollment.status == "active"
+
+
+def _was_active(enrollment: CohortEnrollment) -> bool:
+    history = inspect(enrollment).attrs.status.history
+    if not history.has_changes():
+        return _is_active(enrollment)
+    return "active" in history.deleted
+
+
+def flush_deltas(session: Session) -> Counter:
+    """Counter changes made by the objects in the current flush."""
+    deltas: Counter = Counter()
+    for obj in session.new:
+        if type(obj) in COUNTED_MODELS:
+            deltas[COUNTED_MODELS[type(obj)]] += 1
+        elif isinstance(obj, CohortEnrollment) and _is_active(obj):
+            deltas[ACTIVE_ENROLLMENTS] += 1
+    for obj in session.deleted:
+        if type(obj) in COUNTED_MODELS:
+            deltas[COUNTED_MODELS[type(obj)]] -= 1
+        elif isinstance(obj, CohortEnrollment) and _was_active(obj):
+            deltas[ACTIVE_ENROLLMENTS] -= 1
+    for obj in session.dirty:
+        if isinstance(obj, CohortEnrollment):
+            deltas[ACTIVE_ENROLLMENTS] += _is_active(obj) - _was_active(obj)
+    return deltas
+
+
+def increment_statements(deltas: Dict[str, int]) -> Iterable:
+    # A fixed lock order keeps concurrent writers from deadlocking on the rows
+    for name in sorted(deltas):
+        if deltas[name]:
+            yield (
+                update(StatsCounter)
+                .where(StatsCounter.name == name)
+                .values(value=StatsCounter.value + deltas[name])
+            )
+
+
+@event.listens_for(Session, "after_flush")
+def _count_flushed_rows(session: Session, _flush_context) -> None:
+    # Applied in the writer's own transaction, so counters commit or roll
+    # back together with the rows they count
+    deltas = flush_deltas(session)
+    if deltas:
+        connection = session.connection()
+        for statement in increment_statements(deltas):
+            connection.execute(statement)
+
+
+async def bump_counters(session: AsyncSession, **deltas: int) -> None:
+    """Adjust counters for rows written with Core statements, which bypass
+    the flush hook. Call it in the same transaction as the write."""
+    for statement in increment_statements(deltas):
+        await session.execute(statement)
+
+
+async def read_counters(session: AsyncSession) -> Dict[str, int]:
+    result = await session.execute(select(StatsCounter.name, StatsCounter.value))
+    counters = dict.fromkeys(COUNT_QUERIES, 0)
+    counters.update(result.all())
+    return counters
+
+
+async def reconcile_counters() -> Dict[str, int]:
+    """Recount every counter and correct any drift.
+
+    The counter rows are locked before counting, so writers that already
+    bumped them have committed and writers that haven't wait until the
+    recount is stored.
+    """
+    async with async_session() as session, session.begin():
+        result = await session.execute(
+            select(StatsCounter.name, StatsCounter.value)
+            .order_by(StatsCounter.name)
+            .with_for_update()
+        )
+        stored = dict(result.all())
+        counts = {}
+        for name, query in COUNT_QUERIES.items():
+            counts[name] = (await session.execute(query)).scalar_one()
+            if name not in stored:
+                session.add(StatsCounter(name=name, value=counts[name]))
+            elif stored[name] != counts[name]:
+                logger.warning(
+                    f"Stats counter {name} drifted: {stored[name]} -> {counts[name]}"
+                )
+                await session.execute(
+                    update(StatsCounter)
+                    .where(StatsCounter.name == name)
+                    .values(value=counts[name])
+                )
+    return counts
+
+
+async def run_reconciliation(interval: float = reconcile_interval) -> None:
+    """Reconcile the counters now and then every `interval` seconds."""
+    while True:
+        try:
+            await reconcile_counters()
+        except Exception as e:
+            logger.error(f"Error reconciling stats counters: {str(e)}", exc_info=True)
+        await asyncio.sleep(interval)
@@ -0,0 +1,35 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+# Point the app at a throwaway SQLite file before backend.database is imported
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.db"
+)
+
+from backend.database import engine, init_db, read_engine  # noqa: E402
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine against a freshly created schema on its own event loop.
+
+    The engines are disposed afterwards, since pooled connections can't
+    move between event loops.
+    """
+
+    def _run(coro):
+        async def main():
+            try:
+                await init_db()
+                return await coro
+            finally:
+                await engine.dispose()
+                if read_engine is not None:
+                    await read_engine.dispose()
+
+        return asyncio.run(main())
+
+    return _run
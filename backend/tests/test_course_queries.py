@@ -0,0 +1,97 @@
+"""GET /api/v1/courses issues a fixed number of queries however many courses
+are on the page."""
+
+import uuid
+from contextlib import contextmanager
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from backend.auth import invalidate_principal, requires_auth
+from backend.database import async_session, engine, read_engine
+from backend.main import app
+from backend.models import Cohort, Course, Lesson, User, UserRole
+
+COURSES = 5
+LESSONS_PER_COURSE = 3
+
+
+@contextmanager
+def count_selects():
+    """Collect the SELECT statements sent to the database, on any engine."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    engines = [e.sync_engine for e in (engine, read_engine) if e is not None]
+    for sync_engine in engines:
+        event.listen(sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        for sync_engine in engines:
+            event.remove(sync_engine, "before_cursor_execute", record)
+
+
+async def add_courses(sub: str) -> None:
+    """Add an owner with COURSES courses of LESSONS_PER_COURSE lessons each."""
+    owner_id = uuid.uuid4()
+    async with async_session() as session:
+        session.add(
+            User(
+                id=owner_id,
+                sub=sub,
+                email=f"{owner_id}@example.com",
+                role=UserRole.admin,
+            )
+        )
+        cohort = Cohort(name="Cohort", teacher_id=owner_id)
+        session.add(cohort)
+        await session.flush()
+        for c in range(COURSES):
+            course = Course(
+                name=f"Course {c}", cohort_id=cohort.id, created_by=owner_id
+            )
+            course.lessons = [
+                Lesson(title=f"Lesson {n}", order=n) for n in range(LESSONS_PER_COURSE)
+            ]
+            session.add(course)
+        await session.commit()
+
+
+@pytest.mark.parametrize("include", ["lessons", None])
+def test_course_list_query_count_is_independent_of_page_size(run, include):
+    sub = f"auth0|{uuid.uuid4()}"
+
+    async def pages():
+        await add_courses(sub)
+        transport = httpx.ASGITransport(app=app)
+        pages = []
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            for limit in (1, COURSES):
+                params = {"limit": limit}
+                if include:
+                    params["include"] = include
+                # Count the principal lookup on every request
+                invalidate_principal(sub)
+                with count_selects() as statements:
+                    response = await c.get("/api/v1/courses", params=params)
+                assert response.status_code == 200, response.text
+                pages.append((response.json(), len(statements)))
+        return pages
+
+    app.dependency_overrides[requires_auth] = lambda: {"sub": sub}
+    try:
+        (one, one_count), (many, many_count) = run(pages())
+    finally:
+        app.dependency_overrides.pop(requires_auth)
+
+    assert (len(one), len(many)) == (1, COURSES)
+    if include:
+        assert all(len(c["lessons"]) == LESSONS_PER_COURSE for c in one + many)
+    else:
+        assert all(c["lessons"] is None for c in one + many)
+    assert one_count == many_count
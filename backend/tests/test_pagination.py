@@ -0,0 +1,41 @@
+"""Malformed keyset cursors are rejected with a 400."""
+
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from backend.models import User
+from backend.pagination import decode_cursor, encode_cursor
+
+USER_SORT = (User.created_at, User.id)
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        raw_cursor({"created_at": "2026-01-01T00:00:00"}),
+        raw_cursor(["2026-01-01T00:00:00"]),
+        raw_cursor(["2026-01-01T00:00:00", 5]),
+        raw_cursor([5, "00000000-0000-0000-0000-000000000001"]),
+        raw_cursor(["2026-01-01T00:00:00", None]),
+    ],
+)
+def test_malformed_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as excinfo:
+        decode_cursor(cursor, USER_SORT)
+    assert excinfo.value.status_code == 400
+
+
+def test_cursor_round_trips():
+    values = decode_cursor(
+        raw_cursor(["2026-01-01T00:00:00", "00000000-0000-0000-0000-000000000001"]),
+        USER_SORT,
+    )
+    assert decode_cursor(encode_cursor(values), USER_SORT) == values
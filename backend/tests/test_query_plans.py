@@ -0,0 +1,22 @@
+"""Hot-path queries must use an index; see benchmarks/query_plans.py."""
+
+import pytest
+
+from backend.database import engine
+from benchmarks.query_plans import HOT_QUERIES, table_scans
+
+
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_hot_query_uses_an_index(run, name):
+    async def scans():
+        async with engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                await conn.exec_driver_sql("SET enable_seqscan = off")
+            sql = str(
+                HOT_QUERIES[name].compile(
+                    dialect=conn.dialect, compile_kwargs={"literal_binds": True}
+                )
+            )
+            return await table_scans(conn, sql)
+
+    assert run(scans()) == []
@@ -0,0 +1,26 @@
+"""Reads stay on the primary for a client that wrote recently."""
+
+import time
+
+import pytest
+
+from backend.database import engine, read_engine, routed_session
+
+
+@pytest.mark.skipif(read_engine is None, reason="no read engine configured")
+def test_recent_write_time_pins_reads_to_the_primary(run):
+    async def engines():
+        commits = []
+        async with routed_session(False) as session:
+            session.info["on_commit"] = commits.append
+            await session.commit()
+        binds = []
+        for wrote_at in (commits[0], time.time() - 60, None):
+            async with routed_session(True, wrote_at=wrote_at) as session:
+                binds.append(session.bind)
+        return commits, binds
+
+    commits, binds = run(engines())
+
+    assert len(commits) == 1
+    assert binds == [engine, read_engine, read_engine]
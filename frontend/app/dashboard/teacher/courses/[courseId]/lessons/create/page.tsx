@@ -11,7 +11,6 @@ import Image from '@tiptap/extension-image';
 interface LessonForm {
   title: string;
   content: string;
-  order: number;
   resources: {
     type: 'video' | 'document' | 'link';
     url: string;
@@ -44,7 +43,6 @@ export default function CreateLesson() {
   const [form, setForm] = useState<LessonForm>({
     title: '',
     content: '',
-    order: 1,
     resources: [],
     isDraft: true,
   });
@@ -162,20 +160,6 @@ export default function CreateLesson() {
             </label>
           </div>
 
-          <div>
-            <label className="block text-sm font-medium text-gray-700">
-              Lesson Order
-              <input
-                type="number"
-                value={form.order}
-                onChange={(e) => setForm(prev => ({ ...prev, order: parseInt(e.target.value) }))}
-                className="mt-1 block w-32 rounded-md border-gray-300 shadow-sm focus:border-indigo-500 focus:ring-indigo-500"
-                min="1"
-                required
-              />
-            </label>
-          </div>
-
           <div>
             <label className="block text-sm font-medium text-gray-700 mb-2">
               Lesson Content